@@ -0,0 +1,182 @@
+"""
+Benchmark the analytics service against the offline SQLite backend.
+
+Seeds one synthetic user per dataset size and times the dashboard hot paths,
+recording wall time, backend round trips, rows transferred and peak Python
+memory for each.
+
+    python -m benchmarks.bench_analytics --sizes 1000 100000
+    python -m benchmarks.bench_analytics --sizes 1000 --update-baseline
+    python -m benchmarks.bench_analytics --sizes 1000 --check
+
+`--check` compares against the baseline JSON and exits non-zero when a
+function got slower than `--threshold` (relative) or started doing more
+round trips / moving more rows.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List
+
+os.environ.setdefault("DATA_BACKEND", "memory")
+
+from benchmarks.seed import seed_scans, seed_user
+from db.instrumentation import InstrumentedRepository, QueryStats
+from db.repository import set_repository
+from db.sqlite_repository import SQLiteRepository
+from services import analytics_service
+from services.contact_search import contact_index_cache
+from utils.cache import analytics_cache, industry_day_cache, scan_day_cache
+
+UTC = timezone.utc
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+SEARCH_QUERY = "an"
+
+
+def _cases(user_id: uuid.UUID) -> Dict[str, Callable[[], object]]:
+    today = datetime.now(UTC).date()
+    start = (today - timedelta(days=90)).isoformat()
+    end = today.isoformat()
+    return {
+        "get_dashboard_summary": lambda: analytics_service.get_dashboard_summary(user_id, start, end),
+        "get_funnel_view": lambda: analytics_service.get_funnel_view(user_id, start, end),
+        "search_global": lambda: analytics_service.search_global(SEARCH_QUERY, user_id),
+        "get_industry_distribution": lambda: analytics_service.get_industry_distribution(start, end),
+        "get_daily_scans": lambda: analytics_service.get_daily_scans(start, end),
+        "get_contacts_list": lambda: analytics_service.get_contacts_list(user_id),
+        "get_contacts_page": lambda: analytics_service.get_contacts_list(user_id, limit=100),
+        "stream_contacts": lambda: sum(map(len, analytics_service.stream_contacts(user_id))),
+    }
+
+
+def clear_caches() -> None:
+    analytics_cache.clear()
+    industry_day_cache.clear()
+    scan_day_cache.clear()
+    contact_index_cache.clear()
+
+
+def measure(fn: Callable[[], object], stats: QueryStats, repeat: int) -> Dict[str, float]:
+    # Every run starts from empty caches: time the computation, not cache hits
+    clear_caches()
+    fn()  # warm-up
+    timings = []
+    for _ in range(repeat):
+        clear_caches()
+        stats.reset()
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    round_trips, rows = stats.round_trips, stats.rows
+
+    clear_caches()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "wall_ms": round(statistics.median(timings) * 1000, 3),
+        "round_trips": round_trips,
+        "rows": rows,
+        "peak_kb": round(peak / 1024, 1),
+    }
+
+
+def run(sizes: List[int], repeat: int, scans: int, seed: int,
+        rollups: bool = False) -> Dict[str, Dict[str, Dict[str, float]]]:
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for size in sizes:
+        backend = SQLiteRepository(daily_rollups=rollups)
+        user_id = uuid.UUID(int=size)
+        started = time.perf_counter()
+        counts = seed_user(backend, str(user_id), size, seed=seed)
+        counts["customer_scanned_data"] = seed_scans(backend, scans or size, seed=seed)
+        print(f"[{size}] seeded {counts} in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+        repo = InstrumentedRepository(backend)
+        stats = QueryStats()
+        repo.add_listener(stats)
+        set_repository(repo)
+        try:
+            results[str(size)] = {}
+            for name, fn in _cases(user_id).items():
+                results[str(size)][name] = measure(fn, stats, repeat)
+                print(f"[{size}] {name}: {results[str(size)][name]}", file=sys.stderr)
+        finally:
+            set_repository(None)
+    return results
+
+
+def compare(results: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Return human-readable regressions of `results` against `baseline`."""
+    regressions = []
+    for size, functions in results.items():
+        for name, current in functions.items():
+            base = baseline.get(size, {}).get(name)
+            if not base:
+                continue
+            if current["wall_ms"] > base["wall_ms"] * (1 + threshold):
+                regressions.append(
+                    f"{name}@{size}: wall {base['wall_ms']}ms -> {current['wall_ms']}ms"
+                )
+            for key in ("round_trips", "rows"):
+                if current[key] > base[key]:
+                    regressions.append(f"{name}@{size}: {key} {base[key]} -> {current[key]}")
+    return regressions
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="contacts per user")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--scans", type=int, default=0, help="scan rows (defaults to the contact count)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--rollups", action="store_true", help="serve summary / funnel from daily rollups")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--output", help="write this run's results to a JSON file")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--check", action="store_true", help="fail on regressions against the baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative wall-time slowdown")
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.repeat, args.scans, args.seed, args.rollups)
+    report = {"generated_at": datetime.now(UTC).isoformat(), "results": results}
+    print(json.dumps(report, indent=2))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f).get("results", {})
+        baseline.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump({"generated_at": report["generated_at"], "results": baseline}, f, indent=2)
+        print(f"Baseline written to {args.baseline}", file=sys.stderr)
+
+    if args.check:
+        if not os.path.exists(args.baseline):
+            print(f"No baseline at {args.baseline}", file=sys.stderr)
+            return 2
+        with open(args.baseline) as f:
+            baseline = json.load(f).get("results", {})
+        regressions = compare(results, baseline, args.threshold)
+        for r in regressions:
+            print(f"REGRESSION {r}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""
+Per-row cost of serializing a contact list response, model path vs fast path.
+
+The model path is what FastAPI does for `response_model=List[Contact]`: a
+Contact per row, validation against the response model, jsonable encoding
+and stdlib json. The fast path is utils.fast_json.RowSerializer. Both
+outputs are checked to be the same JSON.
+
+    python -m benchmarks.bench_serialization --rows 20000
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+import uuid
+from typing import Callable, Dict, List
+
+os.environ.setdefault("DATA_BACKEND", "memory")
+
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from benchmarks.seed import seed_user
+from db.sqlite_repository import SQLiteRepository
+from models.dashboard_model import Contact
+from utils.fast_json import RowSerializer
+
+
+def model_path(rows: List[dict]) -> bytes:
+    field = create_model_field(name="Response", type_=List[Contact], mode="serialization")
+    items = [Contact(**c) for c in rows]
+    content = asyncio.run(serialize_response(field=field, response_content=items, is_coroutine=False))
+    # starlette.responses.JSONResponse.render
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+
+
+def fast_path(rows: List[dict]) -> bytes:
+    return RowSerializer(Contact).dumps(rows)
+
+
+def per_row_us(fn: Callable[[List[dict]], bytes], rows: List[dict], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(rows)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) / len(rows) * 1e6
+
+
+def run(count: int, repeat: int, seed: int) -> Dict[str, float]:
+    repo = SQLiteRepository()
+    user_id = str(uuid.UUID(int=count))
+    seed_user(repo, user_id, count, seed=seed)
+    rows = repo.list_contacts(user_id, newest_first=True)
+    if json.loads(model_path(rows)) != json.loads(fast_path(rows)):
+        raise SystemExit("fast path output differs from the model path")
+
+    before = per_row_us(model_path, rows, repeat)
+    after = per_row_us(fast_path, rows, repeat)
+    return {"rows": len(rows), "model_us_per_row": round(before, 2), "fast_us_per_row": round(after, 2),
+            "speedup": round(before / after, 1)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20_000, help="contacts to seed")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    print(json.dumps(run(args.rows, args.repeat, args.seed), indent=2))
+
+
+if __name__ == "__main__":
+    main()
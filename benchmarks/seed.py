@@ -0,0 +1,130 @@
+"""
+Synthetic dataset generation for the offline SQLite backend.
+
+Names, companies and industries come from Faker; they are drawn once into
+small pools and then sampled, which keeps seeding a million contacts in the
+tens of seconds while still producing realistic, repeated values (search
+hits, industry histograms). Meetings and emails per contact follow a Pareto
+distribution so a few contacts carry most of the activity, as in production.
+"""
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List
+
+from faker import Faker
+
+from db.sqlite_repository import SQLiteRepository
+
+UTC = timezone.utc
+
+MEETING_STATUSES = ["SCHEDULED", "COMPLETED", "COMPLETED", "COMPLETED", "CANCELLED", "NO_SHOW"]
+EMAIL_STATUSES = ["DRAFTED", "DRAFTED", "SENT"]
+OUTCOMES = [None, None, "COLD", "WARM", "HOT", "LOST", "WON"]
+HISTORY_DAYS = 365
+CHUNK = 50_000
+
+
+class Pools:
+    def __init__(self, fake: Faker, size: int = 2000):
+        self.first_names = [fake.first_name() for _ in range(size)]
+        self.last_names = [fake.last_name() for _ in range(size)]
+        self.companies = [fake.company() for _ in range(size // 4)]
+        self.domains = [fake.domain_name() for _ in range(size // 4)]
+        self.industries = [fake.bs().split()[-1].title() for _ in range(40)]
+
+
+def _skewed_count(rng: random.Random, alpha: float, cap: int) -> int:
+    # Pareto(alpha) - 1 gives mostly 0/1 with a long tail of busy contacts
+    return min(int(rng.paretovariate(alpha)) - 1, cap)
+
+
+def _chunks(rows: Iterator[Dict], size: int = CHUNK) -> Iterator[List[Dict]]:
+    chunk: List[Dict] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def seed_user(repo: SQLiteRepository, user_id: str, contacts: int, seed: int = 42,
+              now: datetime = None) -> Dict[str, int]:
+    """Seed one user's contacts, meetings and emails. Returns row counts per table."""
+    rng = random.Random(seed)
+    fake = Faker()
+    Faker.seed(seed)
+    pools = Pools(fake)
+    now = now or datetime.now(UTC)
+    counts = {"contacts": 0, "meetings": 0, "emails": 0}
+
+    def ts(days_back: float) -> str:
+        return (now - timedelta(days=days_back)).isoformat()
+
+    def generate():
+        for _ in range(contacts):
+            first = rng.choice(pools.first_names)
+            last = rng.choice(pools.last_names)
+            contact_id = str(uuid.UUID(int=rng.getrandbits(128)))
+            age = rng.uniform(0, HISTORY_DAYS)
+            due = ts(rng.uniform(-30, 30)) if rng.random() < 0.3 else None
+            contact = {
+                "contact_id": contact_id, "user_id": user_id,
+                "first_name": first, "last_name": last,
+                "company_name": rng.choice(pools.companies),
+                "email": f"{first}.{last}@{rng.choice(pools.domains)}".lower(),
+                "created_at": ts(age), "next_follow_up_due_at": due,
+                "outcome": rng.choice(OUTCOMES), "last_outcome_status": rng.choice(OUTCOMES),
+            }
+            meetings = [{
+                "meeting_id": str(uuid.UUID(int=rng.getrandbits(128))), "user_id": user_id,
+                "contact_id": contact_id, "scheduled_at": ts(rng.uniform(-14, age)),
+                "status": rng.choice(MEETING_STATUSES), "mom_exists": rng.random() < 0.6,
+                "duration_seconds": rng.randint(300, 3600),
+            } for _ in range(_skewed_count(rng, 1.6, 40))]
+            emails = [{
+                "email_id": str(uuid.UUID(int=rng.getrandbits(128))), "user_id": user_id,
+                "contact_id": contact_id, "drafted_at": ts(rng.uniform(0, age)),
+                "status": rng.choice(EMAIL_STATUSES), "subject": "Follow up",
+                "recipient_email": contact["email"],
+            } for _ in range(_skewed_count(rng, 1.4, 60))]
+            yield contact, meetings, emails
+
+    buffers = {"contacts": [], "meetings": [], "emails": []}
+
+    def flush(force: bool = False):
+        for table, rows in buffers.items():
+            if rows and (force or len(rows) >= CHUNK):
+                counts[table] += repo.insert_rows(table, rows)
+                buffers[table] = []
+
+    for contact, meetings, emails in generate():
+        buffers["contacts"].append(contact)
+        buffers["meetings"].extend(meetings)
+        buffers["emails"].extend(emails)
+        flush()
+    flush(force=True)
+    return counts
+
+
+def seed_scans(repo: SQLiteRepository, rows: int, seed: int = 42, now: datetime = None) -> int:
+    """Seed customer_scanned_data with a Zipf-like industry mix over the last year."""
+    rng = random.Random(seed)
+    fake = Faker()
+    Faker.seed(seed)
+    industries = Pools(fake, size=40).industries
+    weights = [1 / (i + 1) for i in range(len(industries))]
+    now = now or datetime.now(UTC)
+
+    def generate():
+        for _ in range(rows):
+            yield {
+                "id": str(uuid.UUID(int=rng.getrandbits(128))),
+                "user_id": None,
+                "industry": rng.choices(industries, weights)[0],
+                "created_at": (now - timedelta(days=rng.uniform(0, HISTORY_DAYS))).isoformat(),
+            }
+
+    return sum(repo.insert_rows("customer_scanned_data", chunk) for chunk in _chunks(generate()))
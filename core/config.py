@@ -1,6 +1,6 @@
 import os
+import tempfile
 from dotenv import load_dotenv
-from supabase import create_client, Client
 
 load_dotenv()
 
@@ -8,7 +8,128 @@ SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
+# Data-access backend used by the service layer.
+# "supabase" talks to the live project; "sqlite" / "memory" use a local
+# in-process SQLite database (":memory:" unless SQLITE_PATH is set) so the
+# analytics code can be profiled and tested without credentials.
+# "postgres" connects straight to the project's database with asyncpg.
+DATA_BACKEND = os.getenv("DATA_BACKEND", "supabase").lower()
+SQLITE_PATH = os.getenv("SQLITE_PATH", ":memory:")
 
-if not SUPABASE_URL or not SUPABASE_KEY:
+# Use the grouped-count SQL functions in db/sql/analytics_functions.sql via
+# supabase.rpc. Falls back to shipping rows if the functions are not deployed.
+SUPABASE_AGGREGATE_RPC = os.getenv("SUPABASE_AGGREGATE_RPC", "true").lower() in ("1", "true", "yes")
+# PostgREST max-rows for the project: queries that can return more are paged.
+SUPABASE_MAX_ROWS = int(os.getenv("SUPABASE_MAX_ROWS", "1000"))
+
+DATABASE_URL = os.getenv("DATABASE_URL")
+PG_POOL_MIN_SIZE = int(os.getenv("PG_POOL_MIN_SIZE", "2"))
+PG_POOL_MAX_SIZE = int(os.getenv("PG_POOL_MAX_SIZE", "10"))
+PG_COMMAND_TIMEOUT = float(os.getenv("PG_COMMAND_TIMEOUT", "10"))
+
+# Independent backend queries within one request run concurrently on a
+# shared bounded pool. 0 workers disables fan-out (queries run inline).
+QUERY_FANOUT_WORKERS = int(os.getenv("QUERY_FANOUT_WORKERS", "16"))
+QUERY_TIMEOUT_SECONDS = float(os.getenv("QUERY_TIMEOUT_SECONDS", "10"))
+
+# Per-user analytics results (summary, funnel, upcoming meetings) are cached
+# in-process for this many seconds; 0 disables the cache.
+ANALYTICS_CACHE_TTL_SECONDS = float(os.getenv("ANALYTICS_CACHE_TTL_SECONDS", "30"))
+ANALYTICS_CACHE_MAX_ENTRIES = int(os.getenv("ANALYTICS_CACHE_MAX_ENTRIES", "1024"))
+# Per-day industry histograms of closed (past) days, shared by all ranges.
+INDUSTRY_DAY_CACHE_TTL_SECONDS = float(os.getenv("INDUSTRY_DAY_CACHE_TTL_SECONDS", "3600"))
+INDUSTRY_DAY_CACHE_MAX_DAYS = int(os.getenv("INDUSTRY_DAY_CACHE_MAX_DAYS", "3660"))
+# Daily scan totals of closed days; past days only change through backfills.
+SCAN_DAY_CACHE_TTL_SECONDS = float(os.getenv("SCAN_DAY_CACHE_TTL_SECONDS", "86400"))
+SCAN_DAY_CACHE_MAX_DAYS = int(os.getenv("SCAN_DAY_CACHE_MAX_DAYS", "3660"))
+# Trend series (GET /api/v1/analytics/trends): most periods one request may ask for.
+TREND_MAX_BUCKETS = int(os.getenv("TREND_MAX_BUCKETS", "1000"))
+# Rows read per keyset page while bucketing (Supabase splits pages at max-rows).
+TREND_CHUNK_SIZE = int(os.getenv("TREND_CHUNK_SIZE", "5000"))
+# Analytics GETs carry ETags: a client revalidating with If-None-Match gets
+# a 304 without any backend work unless the user wrote through this process
+# since, or this many seconds passed (defaults to the analytics cache TTL,
+# the staleness already accepted there); 0 disables ETags.
+ETAG_WINDOW_SECONDS = float(os.getenv("ETAG_WINDOW_SECONDS", str(ANALYTICS_CACHE_TTL_SECONDS)))
+# In-memory contact search indexes: total contacts kept across users (LRU)
+# and how long an index is reused before it is rebuilt from the database.
+CONTACT_INDEX_MAX_CONTACTS = int(os.getenv("CONTACT_INDEX_MAX_CONTACTS", "500000"))
+CONTACT_INDEX_TTL_SECONDS = float(os.getenv("CONTACT_INDEX_TTL_SECONDS", "600"))
+# Contacts fetched per keyset page while building an index.
+CONTACT_INDEX_CHUNK_SIZE = int(os.getenv("CONTACT_INDEX_CHUNK_SIZE", "1000"))
+
+# List endpoints: rows fetched per keyset page when streaming NDJSON.
+STREAM_CHUNK_SIZE = int(os.getenv("STREAM_CHUNK_SIZE", "500"))
+# Bulk exports: rows fetched and written per chunk.
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "1000"))
+
+# Contact list and search responses are serialized straight from rows with
+# orjson instead of through per-row pydantic models; same JSON, less CPU.
+FAST_JSON_RESPONSES = os.getenv("FAST_JSON_RESPONSES", "true").lower() in ("1", "true", "yes")
+
+# Background MoM analysis (POST /api/v1/meetings/mom?async=true): dedicated
+# worker threads, queued jobs beyond which submissions get a 503, attempts
+# per job (retries back off exponentially) and how long results are kept.
+MOM_JOB_WORKERS = int(os.getenv("MOM_JOB_WORKERS", "4"))
+MOM_JOB_MAX_PENDING = int(os.getenv("MOM_JOB_MAX_PENDING", "1000"))
+MOM_JOB_MAX_ATTEMPTS = int(os.getenv("MOM_JOB_MAX_ATTEMPTS", "3"))
+MOM_JOB_RETRY_BACKOFF_SECONDS = float(os.getenv("MOM_JOB_RETRY_BACKOFF_SECONDS", "1"))
+MOM_JOB_RETENTION_SECONDS = float(os.getenv("MOM_JOB_RETENTION_SECONDS", "3600"))
+# Batch MoM analysis: MoMs packed into one Gemini request, and concurrent requests.
+MOM_BATCH_PACK_SIZE = int(os.getenv("MOM_BATCH_PACK_SIZE", "10"))
+MOM_BATCH_CONCURRENCY = int(os.getenv("MOM_BATCH_CONCURRENCY", "4"))
+# Gemini calls (utils/llm_gateway.py): concurrent calls per process, call
+# starts per second and burst, deadline per call, and consecutive failures
+# that open the circuit (calls go straight to the fallback) for
+# LLM_BREAKER_RESET_SECONDS.
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_RATE_PER_SECOND = float(os.getenv("LLM_RATE_PER_SECOND", "5"))
+LLM_BURST = int(os.getenv("LLM_BURST", "10"))
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "20"))
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+LLM_BREAKER_RESET_SECONDS = float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30"))
+# Gemini MoM analyses are cached on disk by normalized MoM text, prompt and
+# model, in a SQLite file shared by the workers on this host. An empty path
+# disables the cache.
+MOM_CACHE_PATH = os.getenv("MOM_CACHE_PATH", os.path.join(tempfile.gettempdir(), "mom_analysis_cache.sqlite3"))
+MOM_CACHE_MAX_ENTRIES = int(os.getenv("MOM_CACHE_MAX_ENTRIES", "100000"))
+MOM_CACHE_MAX_AGE_SECONDS = float(os.getenv("MOM_CACHE_MAX_AGE_SECONDS", str(30 * 86400)))
+
+# Export request and backend query metrics at /metrics (Prometheus text).
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Request tracing (utils/tracing.py): backend calls of each request, sent
+# back as Server-Timing on `X-Trace: 1` / `?trace=1`. Requests slower than
+# TRACE_SLOW_MS or over their round-trip budget are kept (the last
+# TRACE_LOG_SIZE of them). Kept traces carry user ids and query filters,
+# so GET /debug/traces only serves them when TRACE_DEBUG_ENDPOINT opts in;
+# it has no auth and is meant for local or internal-network deployments.
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "true").lower() in ("1", "true", "yes")
+TRACE_DEBUG_ENDPOINT = os.getenv("TRACE_DEBUG_ENDPOINT", "false").lower() in ("1", "true", "yes")
+TRACE_SLOW_MS = float(os.getenv("TRACE_SLOW_MS", "500"))
+TRACE_LOG_SIZE = int(os.getenv("TRACE_LOG_SIZE", "100"))
+# Backend calls a request may make before a violation is logged: the
+# default, and per-route overrides (None: no budget, e.g. streamed lists
+# whose call count grows with the data).
+ROUND_TRIP_BUDGET = int(os.getenv("ROUND_TRIP_BUDGET", "4"))
+ROUND_TRIP_BUDGETS = {
+    "/api/v1/contacts": None,
+    "/api/v1/meetings/completed": None,
+    "/api/v1/emails/drafted": None,
+    "/api/v1/export/{entity}": None,
+    # every section: 8 distinct queries
+    "/api/v1/dashboard": 8,
+    "/api/v1/analytics/trends": None,
+}
+
+# Serve whole-day summary / funnel ranges from the per-user daily rollups
+# (db/sql/daily_rollups.sql). Enable only once the triggers are installed
+# and `python -m db.rebuild_rollups` has backfilled existing rows.
+DAILY_ROLLUPS = os.getenv("DAILY_ROLLUPS", "false").lower() in ("1", "true", "yes")
+
+
+if DATA_BACKEND == "supabase" and (not SUPABASE_URL or not SUPABASE_KEY):
     raise RuntimeError("Supabase credentials missing")
 
+if DATA_BACKEND == "postgres" and not DATABASE_URL:
+    raise RuntimeError("DATABASE_URL missing for the postgres backend")
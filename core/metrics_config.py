@@ -0,0 +1,48 @@
+from utils.metrics import registry
+
+
+def _cache_samples():
+    from services.contact_search import contact_index_cache
+    from utils.cache import analytics_cache, industry_day_cache, scan_day_cache
+
+    caches = {"analytics": analytics_cache, "industry_day": industry_day_cache,
+              "scan_day": scan_day_cache, "contact_index": contact_index_cache}
+    for name, cache in caches.items():
+        stats = cache.stats()
+        for key in ("entries", "weight", "hits", "misses", "evictions", "invalidations",
+                    "coalesced", "coalesce_ratio", "in_flight"):
+            yield key, {"cache": name}, stats[key]
+
+
+def _flight_samples():
+    from services.analytics_service import shared_flights
+
+    for key, value in shared_flights.stats().items():
+        yield key, {"flights": "shared"}, value
+
+
+def _mom_job_samples():
+    from services.mom_jobs import mom_queue
+
+    for key, value in mom_queue.stats().items():
+        yield key, {}, value
+
+
+def _llm_samples():
+    from services.analytics_service import gemini, mom_cache
+
+    stats = gemini.stats()
+    circuit = stats.pop("circuit")
+    for key, value in stats.items():
+        yield key, {"provider": gemini.name}, value
+    yield "circuit_open", {"provider": gemini.name}, int(circuit != "closed")
+    for key in ("entries", "hits", "misses", "errors"):
+        yield f"cache_{key}", {"provider": gemini.name}, mom_cache.stats()[key]
+
+
+def setup_metrics():
+    """Export the counters our caches, flights, job queue and LLM gateway keep themselves."""
+    registry.collector("cache", "In-process result caches.", _cache_samples)
+    registry.collector("singleflight", "Coalesced computations not owned by a user.", _flight_samples)
+    registry.collector("mom_jobs", "MoM analysis job queue.", _mom_job_samples)
+    registry.collector("llm", "LLM gateway calls and MoM analysis cache.", _llm_samples)
@@ -0,0 +1,160 @@
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from core.config import METRICS_ENABLED, TRACING_ENABLED
+from db.repository import Repository
+from utils.metrics import Registry, registry as default_registry
+
+# Table each repository method reads or writes, for per-table reporting.
+QUERY_TABLES: Dict[str, str] = {
+    "list_contacts": "contacts",
+    "list_page": "",  # the table is the first argument
+    "list_contacts_page": "contacts",
+    "search_contacts": "contacts",
+    "list_overdue_contacts": "contacts",
+    "update_contact": "contacts",
+    "update_contacts": "contacts",
+    "list_meetings": "meetings",
+    "list_upcoming_meetings": "meetings",
+    "list_completed_meetings": "meetings",
+    "get_meeting": "meetings",
+    "list_meetings_by_id": "meetings",
+    "update_meeting": "meetings",
+    "update_meetings": "meetings",
+    "list_contact_ai_scores": "meetings",
+    "list_ai_scores": "meetings",
+    "list_emails": "emails",
+    "search_emails": "emails",
+    "list_recent_emails": "emails",
+    "list_scan_industries": "customer_scanned_data",
+    "daily_scan_counts": "customer_scanned_data",
+    "contact_outcome_histogram": "contacts",
+    "count_overdue_contacts": "contacts",
+    "team_contact_counts": "contacts",
+    "team_meeting_counts": "meetings",
+    "meeting_status_histogram": "meetings",
+    "email_status_histogram": "emails",
+    "industry_histogram": "customer_scanned_data",
+    "industry_daily_histogram": "customer_scanned_data",
+    "rollup_histogram": "daily_rollups",
+    "rebuild_daily_rollups": "daily_rollups",
+}
+
+
+class QueryEvent:
+    __slots__ = ("method", "table", "args", "kwargs", "duration", "rows", "error")
+
+    def __init__(self, method: str, table: str, args: tuple, kwargs: dict,
+                 duration: float, rows: int, error: Optional[BaseException]):
+        self.method = method
+        self.table = table
+        self.args = args
+        self.kwargs = kwargs
+        self.duration = duration
+        self.rows = rows
+        self.error = error
+
+
+QueryListener = Callable[[QueryEvent], None]
+
+
+def row_count(result: Any) -> int:
+    if result is None:
+        return 0
+    if isinstance(result, dict):
+        return 1
+    if isinstance(result, (list, tuple)):
+        return len(result)
+    return 0
+
+
+class InstrumentedRepository:
+    """
+    Transparent proxy around a Repository that reports every backend call
+    to registered listeners. A call is counted as one round trip; backends
+    that split one call into several requests (supabase pages past its row
+    cap, RPC fallbacks) report the extra ones with `tracing.note`.
+    """
+
+    def __init__(self, inner: Repository):
+        self.inner = inner
+        self.listeners: List[QueryListener] = []
+
+    def add_listener(self, listener: QueryListener) -> None:
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener: QueryListener) -> None:
+        self.listeners.remove(listener)
+
+    def __getattr__(self, name: str):
+        attr = getattr(self.inner, name)
+        if name not in QUERY_TABLES:
+            return attr
+        table = QUERY_TABLES[name]
+
+        def call(*args, **kwargs):
+            started = time.perf_counter()
+            result = None
+            error = None
+            try:
+                result = attr(*args, **kwargs)
+                return result
+            except BaseException as e:
+                error = e
+                raise
+            finally:
+                if self.listeners:
+                    event = QueryEvent(name, table or (args[0] if args else kwargs["table"]), args, kwargs,
+                                       time.perf_counter() - started, row_count(result), error)
+                    for listener in list(self.listeners):
+                        listener(event)
+
+        call.__name__ = name
+        return call
+
+
+class QueryStats:
+    """Listener accumulating round trips and rows transferred."""
+
+    def __init__(self):
+        self.round_trips = 0
+        self.rows = 0
+        self.by_table: Dict[str, int] = {}
+
+    def __call__(self, event: QueryEvent) -> None:
+        self.round_trips += 1
+        self.rows += event.rows
+        self.by_table[event.table] = self.by_table.get(event.table, 0) + 1
+
+    def reset(self) -> None:
+        self.round_trips = 0
+        self.rows = 0
+        self.by_table = {}
+
+
+class QueryMetrics:
+    """Listener exporting per-table, per-method latency, rows and errors."""
+
+    def __init__(self, registry: Registry = default_registry):
+        labels = ("table", "method")
+        self.duration = registry.histogram("db_query_duration_seconds", "Backend query latency.", labels)
+        self.rows = registry.counter("db_query_rows_total", "Rows returned by backend queries.", labels)
+        self.errors = registry.counter("db_query_errors_total", "Backend queries that raised.", labels)
+
+    def __call__(self, event: QueryEvent) -> None:
+        self.duration.observe(event.duration, event.table, event.method)
+        self.rows.inc(event.table, event.method, amount=event.rows)
+        if event.error is not None:
+            self.errors.inc(event.table, event.method)
+
+
+def instrumented(inner: Repository) -> InstrumentedRepository:
+    """`inner` with its queries exported as metrics and added to request traces."""
+    from utils.tracing import record_query
+
+    repository = InstrumentedRepository(inner)
+    if METRICS_ENABLED:
+        repository.add_listener(QueryMetrics())
+    if TRACING_ENABLED:
+        repository.add_listener(record_query)
+    return repository
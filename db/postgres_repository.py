@@ -0,0 +1,472 @@
+import asyncio
+import threading
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence
+
+import asyncpg
+
+from core.config import DAILY_ROLLUPS, DATABASE_URL, PG_COMMAND_TIMEOUT, PG_POOL_MAX_SIZE, PG_POOL_MIN_SIZE
+from db.repository import KEYSET_COLUMNS, Cursor, Repository, Row, day_end, group_by_columns, rollup_rows, sql_columns
+
+UTC = timezone.utc
+
+# Aggregate queries behind the dashboard summary, funnel and industry
+# endpoints. asyncpg keeps a per-connection cache of server-side prepared
+# statements keyed by query text; these are warmed when a pooled connection
+# is opened, so each call is a single Bind/Execute on a warm connection.
+# Optional range bounds are passed as NULL so one statement serves every
+# filter combination.
+AGGREGATE_STATEMENTS: Dict[str, str] = {
+    "contact_outcome_histogram": """
+        SELECT lower(coalesce(nullif(outcome, ''), nullif(last_outcome_status::text, ''), '')) AS outcome,
+               last_outcome_status::text AS last_outcome_status,
+               created_at < $4 AS before_cutoff,
+               count(*) AS count
+        FROM contacts
+        WHERE user_id = $1
+          AND ($2::timestamptz IS NULL OR created_at >= $2)
+          AND ($3::timestamptz IS NULL OR created_at <= $3)
+        GROUP BY 1, 2, 3
+    """,
+    "meeting_status_histogram": """
+        SELECT status::text AS status, coalesce(mom_exists, false) AS mom_exists, count(*) AS count
+        FROM meetings
+        WHERE user_id = $1
+          AND ($2::timestamptz IS NULL OR scheduled_at >= $2)
+          AND ($3::timestamptz IS NULL OR scheduled_at <= $3)
+        GROUP BY 1, 2
+    """,
+    "email_status_histogram": """
+        SELECT status::text AS status, count(*) AS count
+        FROM emails
+        WHERE user_id = $1
+          AND ($2::timestamptz IS NULL OR drafted_at >= $2)
+          AND ($3::timestamptz IS NULL OR drafted_at <= $3)
+        GROUP BY 1
+    """,
+    "count_overdue_contacts": """
+        SELECT count(*) FROM contacts
+        WHERE user_id = $1 AND next_follow_up_due_at IS NOT NULL AND next_follow_up_due_at < $2
+    """,
+    "team_contact_counts": """
+        SELECT user_id::text AS user_id,
+               count(*) FILTER (WHERE ($2::timestamptz IS NULL OR created_at >= $2)
+                                  AND ($3::timestamptz IS NULL OR created_at <= $3)) AS contacts,
+               count(*) FILTER (WHERE next_follow_up_due_at < $4) AS overdue
+        FROM contacts
+        WHERE user_id = ANY($1::uuid[])
+        GROUP BY 1
+    """,
+    "team_meeting_counts": """
+        SELECT user_id::text AS user_id, count(*) AS completed
+        FROM meetings
+        WHERE user_id = ANY($1::uuid[]) AND status::text = 'COMPLETED'
+          AND ($2::timestamptz IS NULL OR scheduled_at >= $2)
+          AND ($3::timestamptz IS NULL OR scheduled_at <= $3)
+        GROUP BY 1
+    """,
+    "industry_histogram": """
+        SELECT industry, count(*) AS count
+        FROM customer_scanned_data
+        WHERE created_at >= $1 AND created_at <= $2
+        GROUP BY 1
+    """,
+    "daily_scan_counts": """
+        SELECT (created_at AT TIME ZONE 'utc')::date AS date, count(*) AS count
+        FROM customer_scanned_data
+        WHERE ($1::timestamptz IS NULL OR created_at >= $1)
+          AND ($2::timestamptz IS NULL OR created_at <= $2)
+        GROUP BY 1
+        ORDER BY 1
+    """,
+    "industry_daily_histogram": """
+        SELECT (created_at AT TIME ZONE 'utc')::date AS day, industry, count(*) AS count
+        FROM customer_scanned_data
+        WHERE created_at >= $1 AND created_at <= $2
+        GROUP BY 1, 2
+    """,
+}
+
+
+AGGREGATE_ARITY = {
+    "contact_outcome_histogram": 4,
+    "meeting_status_histogram": 3,
+    "email_status_histogram": 3,
+    "count_overdue_contacts": 2,
+    "team_contact_counts": 4,
+    "team_meeting_counts": 3,
+    "industry_histogram": 2,
+    "industry_daily_histogram": 2,
+    "daily_scan_counts": 2,
+}
+
+# Warm-up arguments for statements where all-NULL would match rows: NULL
+# bounds on daily_scan_counts mean the whole history, so pass an empty range.
+WARMUP_ARGS: Dict[str, Sequence[Any]] = {
+    "daily_scan_counts": (datetime.max.replace(tzinfo=UTC), datetime.min.replace(tzinfo=UTC)),
+}
+
+
+async def prepare_aggregates(conn: asyncpg.Connection) -> None:
+    """
+    Pool `init` hook: run every aggregate once with arguments that match no
+    rows (NULL, or WARMUP_ARGS) so its prepared statement is in the
+    connection's cache before the first request uses it.
+    """
+    for name, sql in AGGREGATE_STATEMENTS.items():
+        await conn.fetch(sql, *WARMUP_ARGS.get(name, [None] * AGGREGATE_ARITY[name]))
+
+
+# Not warmed in `prepare_aggregates`: daily_rollups only exists once
+# db/sql/daily_rollups.sql has been applied.
+ROLLUP_HISTOGRAM = """
+    SELECT status, outcome, flag, day < $5 AS before_cutoff, sum(count)::bigint AS count
+    FROM daily_rollups
+    WHERE user_id = $1 AND source = $2
+      AND ($3::date IS NULL OR day >= $3)
+      AND ($4::date IS NULL OR day <= $4)
+    GROUP BY 1, 2, 3, 4
+    HAVING sum(count) <> 0
+"""
+
+
+def _day(value: Optional[str]) -> Optional[date]:
+    return date.fromisoformat(value) if value else None
+
+
+def _ts(value: Optional[str]) -> Optional[datetime]:
+    # asyncpg binds timestamptz from datetimes only; bare dates mean midnight UTC
+    # which is how PostgREST casts them too.
+    if value is None or isinstance(value, datetime):
+        return value
+    dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return dt if dt.tzinfo else dt.replace(tzinfo=UTC)
+
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def _row(record: asyncpg.Record) -> Row:
+    # Same shape PostgREST returns: JSON scalars, not driver types
+    return {k: _json_value(v) for k, v in record.items()}
+
+
+def _with_contact(rows: List[Row], fields: Sequence[str]) -> List[Row]:
+    for r in rows:
+        contact = {f: r.pop(f"c_{f}") for f in fields}
+        r["contacts"] = contact if r.pop("c_contact_id") else None
+    return rows
+
+
+class PostgresRepository(Repository):
+    """
+    Direct Postgres backend over an asyncpg connection pool.
+
+    Prepared statements need a session-level connection: point DATABASE_URL
+    at the direct database host (or the session pooler), not the
+    transaction-mode pooler.
+
+    The service layer is synchronous, so the pool lives on a private event
+    loop thread and each call is submitted to it. `open` / `close` are driven
+    by the FastAPI lifespan.
+    """
+
+    def __init__(self, dsn: str = DATABASE_URL, min_size: int = PG_POOL_MIN_SIZE,
+                 max_size: int = PG_POOL_MAX_SIZE, command_timeout: float = PG_COMMAND_TIMEOUT,
+                 daily_rollups: bool = DAILY_ROLLUPS):
+        self.dsn = dsn
+        self.daily_rollups = daily_rollups
+        self.min_size = min_size
+        self.max_size = max_size
+        self.command_timeout = command_timeout
+        self.pool: Optional[asyncpg.Pool] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.thread: Optional[threading.Thread] = None
+        self.lock = threading.Lock()
+
+    def open(self) -> None:
+        with self.lock:
+            if self.pool is not None:
+                return
+            self.loop = asyncio.new_event_loop()
+            self.thread = threading.Thread(target=self.loop.run_forever, name="asyncpg-pool", daemon=True)
+            self.thread.start()
+            try:
+                self.pool = self._submit(self._create_pool())
+            except BaseException:
+                self._stop_loop()
+                raise
+
+    async def _create_pool(self) -> asyncpg.Pool:
+        # The pool binds to the running loop, so it must be built on the pool thread
+        return await asyncpg.create_pool(
+            self.dsn,
+            min_size=self.min_size,
+            max_size=self.max_size,
+            command_timeout=self.command_timeout,
+            init=prepare_aggregates,
+        )
+
+    def close(self) -> None:
+        with self.lock:
+            if self.pool is not None:
+                self._submit(self.pool.close())
+                self.pool = None
+            self._stop_loop()
+
+    def _stop_loop(self) -> None:
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join(timeout=5)
+            self.loop.close()
+            self.loop = None
+            self.thread = None
+
+    def _submit(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    def _run(self, coro_fn):
+        if self.pool is None:
+            self.open()
+
+        async def task():
+            async with self.pool.acquire() as conn:
+                return await coro_fn(conn)
+
+        return self._submit(task())
+
+    def _fetch(self, sql: str, *params: Any) -> List[Row]:
+        return self._run(lambda conn: self._records(conn.fetch(sql, *params)))
+
+    async def _records(self, awaitable) -> List[Row]:
+        return [_row(r) for r in await awaitable]
+
+    def _prepared(self, name: str, *params: Any) -> List[Row]:
+        return self._fetch(AGGREGATE_STATEMENTS[name], *params)
+
+    def _execute(self, sql: str, *params: Any) -> None:
+        self._run(lambda conn: conn.execute(sql, *params))
+
+    def _update(self, table: str, values: Row, where: Row) -> None:
+        params = [*values.values(), *where.values()]
+        sets = ", ".join(f"{sql_columns(k)} = ${i}" for i, k in enumerate(values, 1))
+        conds = " AND ".join(f"{sql_columns(k)} = ${i}" for i, k in enumerate(where, len(values) + 1))
+        self._execute(f"UPDATE {table} SET {sets} WHERE {conds}", *params)
+
+    def _update_many(self, table: str, key: str, user_id: str, rows: List[Row]) -> None:
+        # One transaction; one pipelined executemany per distinct set of columns
+        groups = group_by_columns(rows, key)
+
+        async def run(conn):
+            async with conn.transaction():
+                for columns, group in groups.items():
+                    sets = ", ".join(f"{sql_columns(c)} = ${i}" for i, c in enumerate(columns, 1))
+                    await conn.executemany(
+                        f"UPDATE {table} SET {sets} WHERE {key} = ${len(columns) + 1} AND user_id = ${len(columns) + 2}",
+                        [(*(r[c] for c in columns), r[key], user_id) for r in group],
+                    )
+
+        self._run(run)
+
+    def _range(self, column: str, start: Optional[str], end: Optional[str], params: List[Any]) -> str:
+        sql = ""
+        if start:
+            params.append(_ts(start))
+            sql += f" AND {column} >= ${len(params)}"
+        if end:
+            params.append(_ts(end))
+            sql += f" AND {column} <= ${len(params)}"
+        return sql
+
+    def _after(self, column: str, key: str, after: Optional[Cursor], params: List[Any]) -> str:
+        # Rows past `after` in ORDER BY column DESC NULLS FIRST, key DESC. The
+        # row comparison is one index seek; it is never true for NULLs.
+        if after is None:
+            return ""
+        value, last_key = after
+        if value is None:
+            params.append(last_key)
+            return f" AND ({column} IS NOT NULL OR {key} < ${len(params)})"
+        params.extend([_ts(value), last_key])
+        return f" AND ({column}, {key}) < (${len(params) - 1}, ${len(params)})"
+
+    def list_page(self, table: str, user_id: str, limit: int, after: Optional[Cursor] = None,
+                  start: Optional[str] = None, end: Optional[str] = None, columns: str = "*") -> List[Row]:
+        column, key = KEYSET_COLUMNS[table]
+        params: List[Any] = [user_id]
+        where = self._range(column, start, end, params) + self._after(column, key, after, params)
+        params.append(limit)
+        return self._fetch(
+            f"SELECT {sql_columns(columns)} FROM {table} WHERE user_id = $1" + where
+            + f" ORDER BY {column} DESC, {key} DESC LIMIT ${len(params)}",
+            *params,
+        )
+
+    # Contacts
+    def list_contacts(self, user_id: str, columns: str = "*",
+                      created_from: Optional[str] = None, created_to: Optional[str] = None,
+                      newest_first: bool = False) -> List[Row]:
+        params: List[Any] = [user_id]
+        sql = f"SELECT {sql_columns(columns)} FROM contacts WHERE user_id = $1"
+        sql += self._range("created_at", created_from, created_to, params)
+        if newest_first:
+            sql += " ORDER BY created_at DESC"
+        return self._fetch(sql, *params)
+
+    def list_contacts_page(self, user_id: str, limit: int, after: Optional[Cursor] = None) -> List[Row]:
+        return self.list_page("contacts", user_id, limit, after)
+
+    def search_contacts(self, user_id: str, query: str) -> List[Row]:
+        return self._fetch(
+            "SELECT * FROM contacts WHERE user_id = $1 "
+            "AND (first_name ILIKE $2 OR last_name ILIKE $2 OR email ILIKE $2)",
+            user_id, f"%{query}%",
+        )
+
+    def list_overdue_contacts(self, user_id: str, now: str, columns: str = "contact_id") -> List[Row]:
+        return self._fetch(
+            f"SELECT {sql_columns(columns)} FROM contacts WHERE user_id = $1 "
+            "AND next_follow_up_due_at IS NOT NULL AND next_follow_up_due_at < $2",
+            user_id, _ts(now),
+        )
+
+    def update_contact(self, contact_id: str, values: Row) -> None:
+        self._update("contacts", values, {"contact_id": contact_id})
+
+    def update_contacts(self, user_id: str, rows: List[Row]) -> None:
+        self._update_many("contacts", "contact_id", user_id, rows)
+
+    # Meetings
+    def list_meetings(self, user_id: str, columns: str = "*",
+                      scheduled_from: Optional[str] = None, scheduled_to: Optional[str] = None) -> List[Row]:
+        params: List[Any] = [user_id]
+        sql = f"SELECT {sql_columns(columns)} FROM meetings WHERE user_id = $1"
+        sql += self._range("scheduled_at", scheduled_from, scheduled_to, params)
+        return self._fetch(sql, *params)
+
+    def list_upcoming_meetings(self, user_id: str, now: str, limit: int) -> List[Row]:
+        rows = self._fetch(
+            "SELECT m.meeting_id, m.scheduled_at, m.status::text AS status, m.mom_exists, "
+            "c.contact_id AS c_contact_id, c.first_name AS c_first_name, c.last_name AS c_last_name "
+            "FROM meetings m LEFT JOIN contacts c ON c.contact_id = m.contact_id "
+            "WHERE m.user_id = $1 AND m.scheduled_at >= $2 ORDER BY m.scheduled_at LIMIT $3",
+            user_id, _ts(now), limit,
+        )
+        return _with_contact(rows, ("first_name", "last_name"))
+
+    def list_completed_meetings(self, user_id: str, limit: int, after: Optional[Cursor] = None) -> List[Row]:
+        params: List[Any] = [user_id]
+        where = self._after("m.scheduled_at", "m.meeting_id", after, params)
+        params.append(limit)
+        rows = self._fetch(
+            "SELECT m.*, c.contact_id AS c_contact_id, c.first_name AS c_first_name, "
+            "c.last_name AS c_last_name, c.company_name AS c_company_name "
+            "FROM meetings m LEFT JOIN contacts c ON c.contact_id = m.contact_id "
+            "WHERE m.user_id = $1 AND m.status = 'COMPLETED'" + where
+            + f" ORDER BY m.scheduled_at DESC, m.meeting_id DESC LIMIT ${len(params)}",
+            *params,
+        )
+        return _with_contact(rows, ("first_name", "last_name", "company_name"))
+
+    def get_meeting(self, meeting_id: str, columns: str = "*") -> Optional[Row]:
+        rows = self._fetch(f"SELECT {sql_columns(columns)} FROM meetings WHERE meeting_id = $1", meeting_id)
+        return rows[0] if rows else None
+
+    def update_meeting(self, meeting_id: str, user_id: str, values: Row) -> None:
+        self._update("meetings", values, {"meeting_id": meeting_id, "user_id": user_id})
+
+    def list_meetings_by_id(self, user_id: str, meeting_ids: List[str], columns: str = "*") -> List[Row]:
+        return self._fetch(
+            f"SELECT {sql_columns(columns)} FROM meetings WHERE user_id = $1 AND meeting_id = ANY($2::uuid[])",
+            user_id, list(meeting_ids),
+        )
+
+    def update_meetings(self, user_id: str, rows: List[Row]) -> None:
+        self._update_many("meetings", "meeting_id", user_id, rows)
+
+    def list_contact_ai_scores(self, contact_id: str) -> List[Row]:
+        return self._fetch(
+            "SELECT ai_score FROM meetings WHERE contact_id = $1 AND ai_score IS NOT NULL",
+            contact_id,
+        )
+
+    def list_ai_scores(self, contact_ids: List[str]) -> List[Row]:
+        return self._fetch(
+            "SELECT contact_id, ai_score FROM meetings WHERE contact_id = ANY($1::uuid[]) AND ai_score IS NOT NULL",
+            list(contact_ids),
+        )
+
+    # Emails
+    def list_emails(self, user_id: str, columns: str = "*",
+                    drafted_from: Optional[str] = None, drafted_to: Optional[str] = None) -> List[Row]:
+        params: List[Any] = [user_id]
+        sql = f"SELECT {sql_columns(columns)} FROM emails WHERE user_id = $1"
+        sql += self._range("drafted_at", drafted_from, drafted_to, params)
+        return self._fetch(sql, *params)
+
+    def search_emails(self, user_id: str, query: str) -> List[Row]:
+        return self._fetch(
+            "SELECT * FROM emails WHERE user_id = $1 AND status::text ILIKE $2",
+            user_id, f"%{query}%",
+        )
+
+    def list_recent_emails(self, user_id: str, limit: int, after: Optional[Cursor] = None) -> List[Row]:
+        return self.list_page("emails", user_id, limit, after)
+
+    # Scans
+    def list_scan_industries(self, start: str, end: str, columns: str = "industry") -> List[Row]:
+        return self._fetch(
+            f"SELECT {sql_columns(columns)} FROM customer_scanned_data WHERE created_at >= $1 AND created_at <= $2",
+            _ts(start), _ts(end),
+        )
+
+    def daily_scan_counts(self, start: Optional[str] = None, end: Optional[str] = None) -> List[Row]:
+        return self._prepared("daily_scan_counts", _ts(start), _ts(end))
+
+    # Aggregates
+    def contact_outcome_histogram(self, user_id: str, created_from: Optional[str] = None,
+                                  created_to: Optional[str] = None, cutoff: Optional[str] = None) -> List[Row]:
+        return self._prepared("contact_outcome_histogram", user_id, _ts(created_from), _ts(created_to), _ts(cutoff))
+
+    def meeting_status_histogram(self, user_id: str, scheduled_from: Optional[str] = None,
+                                 scheduled_to: Optional[str] = None) -> List[Row]:
+        return self._prepared("meeting_status_histogram", user_id, _ts(scheduled_from), _ts(scheduled_to))
+
+    def email_status_histogram(self, user_id: str, drafted_from: Optional[str] = None,
+                               drafted_to: Optional[str] = None) -> List[Row]:
+        return self._prepared("email_status_histogram", user_id, _ts(drafted_from), _ts(drafted_to))
+
+    def count_overdue_contacts(self, user_id: str, now: str) -> int:
+        return self._prepared("count_overdue_contacts", user_id, _ts(now))[0]["count"]
+
+    def team_contact_counts(self, user_ids: List[str], created_from: Optional[str] = None,
+                            created_to: Optional[str] = None, now: Optional[str] = None) -> List[Row]:
+        return self._prepared("team_contact_counts", list(user_ids), _ts(created_from), _ts(created_to), _ts(now))
+
+    def team_meeting_counts(self, user_ids: List[str], scheduled_from: Optional[str] = None,
+                            scheduled_to: Optional[str] = None) -> List[Row]:
+        return self._prepared("team_meeting_counts", list(user_ids), _ts(scheduled_from), _ts(scheduled_to))
+
+    def industry_histogram(self, start: str, end: str) -> List[Row]:
+        return self._prepared("industry_histogram", _ts(start), _ts(end))
+
+    def industry_daily_histogram(self, start_day: str, end_day: str) -> List[Row]:
+        return self._prepared("industry_daily_histogram", _ts(start_day), _ts(day_end(end_day)))
+
+    # Daily rollups (db/sql/daily_rollups.sql)
+    def rollup_histogram(self, user_id: str, source: str, from_day: Optional[str] = None,
+                         to_day: Optional[str] = None, cutoff_day: Optional[str] = None) -> List[Row]:
+        rows = self._fetch(ROLLUP_HISTOGRAM, user_id, source, _day(from_day), _day(to_day), _day(cutoff_day))
+        return rollup_rows(source, rows)
+
+    def rebuild_daily_rollups(self, user_id: Optional[str] = None) -> int:
+        return self._fetch("SELECT rebuild_daily_rollups($1) AS written", user_id)[0]["written"]
@@ -0,0 +1,35 @@
+"""
+Backfill or repair the per-user daily rollups from the raw tables.
+
+    python -m db.rebuild_rollups                 # every user
+    python -m db.rebuild_rollups --user-id <uuid>
+
+Run once after applying db/sql/daily_rollups.sql, before enabling
+DAILY_ROLLUPS; afterwards triggers keep the rollups current.
+"""
+import argparse
+import sys
+import time
+import uuid
+from typing import List
+
+from db.repository import close_repository, open_repository
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user-id", type=uuid.UUID, help="rebuild a single user (default: all users)")
+    args = parser.parse_args(argv)
+
+    repo = open_repository()
+    try:
+        started = time.perf_counter()
+        written = repo.rebuild_daily_rollups(str(args.user_id) if args.user_id else None)
+        print(f"Rebuilt {written} daily rollup rows in {time.perf_counter() - started:.1f}s")
+    finally:
+        close_repository()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,376 @@
+import logging
+import re
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core.config import DAILY_ROLLUPS, DATA_BACKEND, METRICS_ENABLED, SQLITE_PATH, SUPABASE_KEY, SUPABASE_URL, TRACING_ENABLED
+from utils.columnar import NAT, categorical, epoch_us, group_count, to_epoch_us
+
+logger = logging.getLogger(__name__)
+
+Row = Dict[str, Any]
+
+# Keyset position (sort value, unique id) of the last row of a page
+Cursor = Tuple[Optional[str], str]
+
+# Keyset order of the tables `list_page` serves: (timestamp, unique id)
+KEYSET_COLUMNS: Dict[str, Tuple[str, str]] = {
+    "contacts": ("created_at", "contact_id"),
+    "meetings": ("scheduled_at", "meeting_id"),
+    "emails": ("drafted_at", "email_id"),
+}
+
+_COLUMN_RE = re.compile(r"^\*$|^[a-z_][a-z0-9_]*$")
+
+
+def sql_columns(columns: str) -> str:
+    """Validate a supabase-style column list for interpolation into SQL."""
+    names = [c.strip() for c in columns.split(",")]
+    for name in names:
+        if not _COLUMN_RE.match(name):
+            raise ValueError(f"Unsupported column expression: {name!r}")
+    return ", ".join(names)
+
+
+def outcome_key(row: Row) -> str:
+    # Normalize outcomes to lowercase for comparison
+    o = row.get("outcome") or row.get("last_outcome_status") or ""
+    return o.lower()
+
+
+def day_end(day: str) -> str:
+    """Last instant of a UTC day, for inclusive bare-date end bounds."""
+    return f"{day}T23:59:59.999999+00:00"
+
+
+def _column(rows: List[Row], name: str, categories=()):
+    return categorical([r.get(name) for r in rows], categories)
+
+
+def group_by_columns(rows: List[Row], key: str) -> Dict[Tuple[str, ...], List[Row]]:
+    """Group bulk-update rows by the columns they set (everything but `key`)."""
+    groups: Dict[Tuple[str, ...], List[Row]] = {}
+    for row in rows:
+        groups.setdefault(tuple(c for c in row if c != key), []).append(row)
+    return groups
+
+
+# Tables with per-user daily rollups, keyed by (user_id, UTC day of the
+# timestamp column, status, outcome, flag).
+ROLLUP_SOURCES = ("contacts", "meetings", "emails")
+
+
+def rollup_rows(source: str, rows: List[Row]) -> List[Row]:
+    """
+    Shape summed rollup rows (status, outcome, flag, before_cutoff, count)
+    like the matching *_histogram method. Rollups store NULL as ''.
+    """
+    if source == "contacts":
+        return [{"outcome": r["outcome"], "last_outcome_status": r["status"] or None,
+                 "before_cutoff": None if r["before_cutoff"] is None else bool(r["before_cutoff"]),
+                 "count": r["count"]} for r in rows]
+    if source == "meetings":
+        return [{"status": r["status"] or None, "mom_exists": bool(r["flag"]), "count": r["count"]} for r in rows]
+    return [{"status": r["status"] or None, "count": r["count"]} for r in rows]
+
+
+class Repository(ABC):
+    """
+    Data-access interface used by the service layer.
+
+    Every method is a single backend round trip and returns plain dict rows,
+    shaped like the `.data` of a supabase response, so services stay agnostic
+    of where the data lives.
+
+    The grouped aggregate methods have row-shipping defaults built on the
+    list methods (grouped with vectorized NumPy passes); backends that can
+    group server-side override them.
+
+    Paged list methods order rows newest first by (timestamp, id), with
+    NULL timestamps first as postgres sorts them, and take the Cursor of
+    the previous page's last row as `after`: each page is one index seek
+    whatever its depth.
+
+    Backends that keep per-user daily rollups (maintained by triggers on
+    contacts / meetings / emails) set `daily_rollups` and override
+    `rollup_histogram` and `rebuild_daily_rollups`; the defaults answer
+    from the raw tables and have nothing to rebuild.
+    """
+
+    daily_rollups = False
+
+    def open(self) -> None:
+        """Acquire long-lived resources (pools). Called from the app lifespan."""
+
+    def close(self) -> None:
+        """Release resources acquired in `open`."""
+
+    @abstractmethod
+    def list_page(self, table: str, user_id: str, limit: int, after: Optional[Cursor] = None,
+                  start: Optional[str] = None, end: Optional[str] = None, columns: str = "*") -> List[Row]:
+        """
+        One keyset page of a KEYSET_COLUMNS table, optionally within a
+        [start, end] range of its timestamp. Always returns `limit` rows
+        unless the table has no more.
+        """
+
+    # Contacts
+    @abstractmethod
+    def list_contacts(self, user_id: str, columns: str = "*",
+                      created_from: Optional[str] = None, created_to: Optional[str] = None,
+                      newest_first: bool = False) -> List[Row]:
+        ...
+
+    @abstractmethod
+    def list_contacts_page(self, user_id: str, limit: int, after: Optional[Cursor] = None) -> List[Row]:
+        """Contacts keyset-paged on (created_at, contact_id), newest first."""
+
+    @abstractmethod
+    def search_contacts(self, user_id: str, query: str) -> List[Row]:
+        ...
+
+    @abstractmethod
+    def list_overdue_contacts(self, user_id: str, now: str, columns: str = "contact_id") -> List[Row]:
+        ...
+
+    @abstractmethod
+    def update_contact(self, contact_id: str, values: Row) -> None:
+        ...
+
+    @abstractmethod
+    def update_contacts(self, user_id: str, rows: List[Row]) -> None:
+        """
+        Bulk update of existing contacts of the user: each row is a
+        `contact_id` plus the columns to set. Rows may set different columns.
+        """
+
+    # Meetings
+    @abstractmethod
+    def list_meetings(self, user_id: str, columns: str = "*",
+                      scheduled_from: Optional[str] = None, scheduled_to: Optional[str] = None) -> List[Row]:
+        ...
+
+    @abstractmethod
+    def list_upcoming_meetings(self, user_id: str, now: str, limit: int) -> List[Row]:
+        """Meetings from `now` on, ascending, with a nested `contacts` name dict."""
+
+    @abstractmethod
+    def list_completed_meetings(self, user_id: str, limit: int, after: Optional[Cursor] = None) -> List[Row]:
+        """Completed meetings keyset-paged on (scheduled_at, meeting_id), with a nested `contacts` dict."""
+
+    @abstractmethod
+    def get_meeting(self, meeting_id: str, columns: str = "*") -> Optional[Row]:
+        ...
+
+    @abstractmethod
+    def list_meetings_by_id(self, user_id: str, meeting_ids: List[str], columns: str = "*") -> List[Row]:
+        """The user's meetings among `meeting_ids`; unknown ids are skipped."""
+
+    @abstractmethod
+    def update_meeting(self, meeting_id: str, user_id: str, values: Row) -> None:
+        ...
+
+    @abstractmethod
+    def update_meetings(self, user_id: str, rows: List[Row]) -> None:
+        """Bulk update of existing meetings of the user, like `update_contacts`."""
+
+    @abstractmethod
+    def list_contact_ai_scores(self, contact_id: str) -> List[Row]:
+        """Non-null `ai_score` rows of every meeting with the contact."""
+
+    @abstractmethod
+    def list_ai_scores(self, contact_ids: List[str]) -> List[Row]:
+        """Non-null (`contact_id`, `ai_score`) rows of every meeting with any of the contacts."""
+
+    # Emails
+    @abstractmethod
+    def list_emails(self, user_id: str, columns: str = "*",
+                    drafted_from: Optional[str] = None, drafted_to: Optional[str] = None) -> List[Row]:
+        ...
+
+    @abstractmethod
+    def search_emails(self, user_id: str, query: str) -> List[Row]:
+        ...
+
+    @abstractmethod
+    def list_recent_emails(self, user_id: str, limit: int, after: Optional[Cursor] = None) -> List[Row]:
+        """Emails keyset-paged on (drafted_at, email_id), newest first."""
+
+    # Scans
+    @abstractmethod
+    def list_scan_industries(self, start: str, end: str, columns: str = "industry") -> List[Row]:
+        ...
+
+    @abstractmethod
+    def daily_scan_counts(self, start: Optional[str] = None, end: Optional[str] = None) -> List[Row]:
+        """Scan counts per UTC `date`, oldest first; bounds are optional."""
+        ...
+
+    # Aggregates
+    def contact_outcome_histogram(self, user_id: str, created_from: Optional[str] = None,
+                                  created_to: Optional[str] = None, cutoff: Optional[str] = None) -> List[Row]:
+        """
+        Contact counts grouped by normalized `outcome`, raw `last_outcome_status`
+        and `before_cutoff` (created_at < cutoff; None when unknown).
+        """
+        rows = self.list_contacts(user_id, "last_outcome_status, outcome, created_at",
+                                  created_from=created_from, created_to=created_to)
+        outcome, outcome_labels = _column(rows, "outcome")
+        last, last_labels = _column(rows, "last_outcome_status")
+
+        # Normalize each distinct (outcome, last_outcome_status) pair once, then gather per row
+        normalized: Dict[str, int] = {}
+        pair_codes = np.array([
+            [normalized.setdefault(outcome_key({"outcome": o, "last_outcome_status": l}), len(normalized))
+             for l in last_labels]
+            for o in outcome_labels
+        ], dtype=np.int32).reshape(len(outcome_labels), len(last_labels))
+
+        # before_cutoff codes: 0 = unknown (no timestamp / no cutoff), 1 = False, 2 = True
+        before = np.zeros(len(rows), dtype=np.int32)
+        cutoff_us = to_epoch_us(cutoff)
+        if cutoff_us != NAT:
+            created = epoch_us([r.get("created_at") for r in rows])
+            before = np.where(created == NAT, 0, np.where(created < cutoff_us, 2, 1)).astype(np.int32)
+
+        return group_count({
+            "outcome": (pair_codes[outcome, last], list(normalized)),
+            "last_outcome_status": (last, last_labels),
+            "before_cutoff": (before, [None, False, True]),
+        })
+
+    def meeting_status_histogram(self, user_id: str, scheduled_from: Optional[str] = None,
+                                 scheduled_to: Optional[str] = None) -> List[Row]:
+        """Meeting counts grouped by `status` and `mom_exists`."""
+        rows = self.list_meetings(user_id, "status, mom_exists",
+                                  scheduled_from=scheduled_from, scheduled_to=scheduled_to)
+        mom_exists = categorical([bool(r.get("mom_exists")) for r in rows])
+        return group_count({"status": _column(rows, "status"), "mom_exists": mom_exists})
+
+    def email_status_histogram(self, user_id: str, drafted_from: Optional[str] = None,
+                               drafted_to: Optional[str] = None) -> List[Row]:
+        """Email counts grouped by `status`."""
+        rows = self.list_emails(user_id, "status", drafted_from=drafted_from, drafted_to=drafted_to)
+        return group_count({"status": _column(rows, "status")})
+
+    def count_overdue_contacts(self, user_id: str, now: str) -> int:
+        return len(self.list_overdue_contacts(user_id, now))
+
+    def team_contact_counts(self, user_ids: List[str], created_from: Optional[str] = None,
+                            created_to: Optional[str] = None, now: Optional[str] = None) -> List[Row]:
+        """
+        Per `user_id` of a team: `contacts` created in range and `overdue`
+        contacts (follow-up due before `now`, whenever created). Members
+        with neither may be missing. This default costs calls per member.
+        """
+        rows = []
+        for user_id in user_ids:
+            created = self.list_contacts(user_id, "contact_id", created_from=created_from, created_to=created_to)
+            overdue = self.count_overdue_contacts(user_id, now) if now else 0
+            rows.append({"user_id": user_id, "contacts": len(created), "overdue": overdue})
+        return rows
+
+    def team_meeting_counts(self, user_ids: List[str], scheduled_from: Optional[str] = None,
+                            scheduled_to: Optional[str] = None) -> List[Row]:
+        """Per `user_id` of a team: `completed` meetings scheduled in range. Members without may be missing."""
+        rows = []
+        for user_id in user_ids:
+            histogram = self.meeting_status_histogram(user_id, scheduled_from, scheduled_to)
+            rows.append({"user_id": user_id,
+                         "completed": sum(r["count"] for r in histogram if r["status"] == "COMPLETED")})
+        return rows
+
+    def industry_histogram(self, start: str, end: str) -> List[Row]:
+        """Scan counts grouped by `industry`."""
+        rows = self.list_scan_industries(start, end)
+        return group_count({"industry": _column(rows, "industry")})
+
+    def industry_daily_histogram(self, start_day: str, end_day: str) -> List[Row]:
+        """Scan counts grouped by UTC `day` and `industry` over an inclusive day range."""
+        rows = self.list_scan_industries(start_day, day_end(end_day), "industry, created_at")
+        days = categorical([(r.get("created_at") or "")[:10] or None for r in rows])
+        return group_count({"day": days, "industry": _column(rows, "industry")})
+
+    # Daily rollups
+    def rollup_histogram(self, user_id: str, source: str, from_day: Optional[str] = None,
+                         to_day: Optional[str] = None, cutoff_day: Optional[str] = None) -> List[Row]:
+        """
+        The `source` histogram summed from daily rollups over the inclusive
+        day range (dates, NULL = unbounded). `cutoff_day` splits contacts
+        into before_cutoff cohorts at the start of that day.
+        """
+        start = from_day and f"{from_day}T00:00:00+00:00"
+        end = to_day and day_end(to_day)
+        if source == "contacts":
+            return self.contact_outcome_histogram(user_id, start, end, cutoff_day and f"{cutoff_day}T00:00:00+00:00")
+        if source == "meetings":
+            return self.meeting_status_histogram(user_id, start, end)
+        if source == "emails":
+            return self.email_status_histogram(user_id, start, end)
+        raise ValueError(f"No rollups for {source!r}; expected one of {ROLLUP_SOURCES}")
+
+    def rebuild_daily_rollups(self, user_id: Optional[str] = None) -> int:
+        """Recompute rollups from the raw tables (one user or all). Returns rollup rows written."""
+        return 0
+
+
+_repository: Optional[Repository] = None
+
+
+def create_repository(backend: str = DATA_BACKEND) -> Repository:
+    repository = _create_backend(backend)
+    if METRICS_ENABLED or TRACING_ENABLED:
+        # Imported here: db.instrumentation itself imports this module
+        from db.instrumentation import instrumented
+        return instrumented(repository)
+    return repository
+
+
+def _create_backend(backend: str) -> Repository:
+    if backend == "supabase":
+        from db.supabase_repository import SupabaseRepository
+        return SupabaseRepository()
+    if backend in ("sqlite", "memory"):
+        from db.sqlite_repository import SQLiteRepository
+        return SQLiteRepository(SQLITE_PATH if backend == "sqlite" else ":memory:")
+    if backend == "postgres":
+        from db.postgres_repository import PostgresRepository
+        return PostgresRepository()
+    raise RuntimeError(f"Unknown DATA_BACKEND: {backend}")
+
+
+def get_repository() -> Repository:
+    global _repository
+    if _repository is None:
+        _repository = create_repository()
+    return _repository
+
+
+def set_repository(repository: Optional[Repository]) -> None:
+    """Swap the process-wide repository (tests, benchmarks). `None` resets to config."""
+    global _repository
+    _repository = repository
+
+
+def open_repository() -> Repository:
+    """
+    Open the configured repository at startup. A postgres backend that cannot
+    connect falls back to supabase when credentials for it are configured.
+    """
+    global _repository
+    repository = get_repository()
+    try:
+        repository.open()
+    except Exception as e:
+        if DATA_BACKEND != "postgres" or not (SUPABASE_URL and SUPABASE_KEY):
+            raise
+        logger.warning("Postgres backend unavailable (%s). Falling back to supabase.", e)
+        _repository = repository = create_repository("supabase")
+    return repository
+
+
+def close_repository() -> None:
+    if _repository is not None:
+        _repository.close()
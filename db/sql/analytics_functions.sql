@@ -0,0 +1,136 @@
+-- Grouped aggregates for the analytics endpoints, called through
+-- supabase.rpc(...) so PostgREST returns a handful of histogram rows instead
+-- of every contact / meeting / email in range.
+--
+-- Apply with the Supabase SQL editor or `psql "$DATABASE_URL" -f db/sql/analytics_functions.sql`.
+-- Range bounds are optional (NULL = unbounded), mirroring the repository API.
+
+create or replace function contact_outcome_histogram(
+    p_user_id uuid,
+    p_created_from timestamptz default null,
+    p_created_to timestamptz default null,
+    p_cutoff timestamptz default null
+)
+returns table (outcome text, last_outcome_status text, before_cutoff boolean, count bigint)
+language sql stable
+as $$
+    select lower(coalesce(nullif(c.outcome, ''), nullif(c.last_outcome_status::text, ''), '')),
+           c.last_outcome_status::text,
+           c.created_at < p_cutoff,
+           count(*)
+    from contacts c
+    where c.user_id = p_user_id
+      and (p_created_from is null or c.created_at >= p_created_from)
+      and (p_created_to is null or c.created_at <= p_created_to)
+    group by 1, 2, 3
+$$;
+
+create or replace function meeting_status_histogram(
+    p_user_id uuid,
+    p_scheduled_from timestamptz default null,
+    p_scheduled_to timestamptz default null
+)
+returns table (status text, mom_exists boolean, count bigint)
+language sql stable
+as $$
+    select m.status::text, coalesce(m.mom_exists, false), count(*)
+    from meetings m
+    where m.user_id = p_user_id
+      and (p_scheduled_from is null or m.scheduled_at >= p_scheduled_from)
+      and (p_scheduled_to is null or m.scheduled_at <= p_scheduled_to)
+    group by 1, 2
+$$;
+
+create or replace function email_status_histogram(
+    p_user_id uuid,
+    p_drafted_from timestamptz default null,
+    p_drafted_to timestamptz default null
+)
+returns table (status text, count bigint)
+language sql stable
+as $$
+    select e.status::text, count(*)
+    from emails e
+    where e.user_id = p_user_id
+      and (p_drafted_from is null or e.drafted_at >= p_drafted_from)
+      and (p_drafted_to is null or e.drafted_at <= p_drafted_to)
+    group by 1
+$$;
+
+-- Team views: one row per member instead of a call per member
+create or replace function team_contact_counts(
+    p_user_ids uuid[],
+    p_created_from timestamptz default null,
+    p_created_to timestamptz default null,
+    p_now timestamptz default null
+)
+returns table (user_id uuid, contacts bigint, overdue bigint)
+language sql stable
+as $$
+    select c.user_id,
+           count(*) filter (where (p_created_from is null or c.created_at >= p_created_from)
+                              and (p_created_to is null or c.created_at <= p_created_to)),
+           count(*) filter (where c.next_follow_up_due_at < p_now)
+    from contacts c
+    where c.user_id = any(p_user_ids)
+    group by 1
+$$;
+
+create or replace function team_meeting_counts(
+    p_user_ids uuid[],
+    p_scheduled_from timestamptz default null,
+    p_scheduled_to timestamptz default null
+)
+returns table (user_id uuid, completed bigint)
+language sql stable
+as $$
+    select m.user_id, count(*)
+    from meetings m
+    where m.user_id = any(p_user_ids)
+      and m.status::text = 'COMPLETED'
+      and (p_scheduled_from is null or m.scheduled_at >= p_scheduled_from)
+      and (p_scheduled_to is null or m.scheduled_at <= p_scheduled_to)
+    group by 1
+$$;
+
+create or replace function industry_histogram(p_start timestamptz, p_end timestamptz)
+returns table (industry text, count bigint)
+language sql stable
+as $$
+    select s.industry, count(*)
+    from customer_scanned_data s
+    where s.created_at >= p_start and s.created_at <= p_end
+    group by 1
+$$;
+
+-- Per-day buckets let the service cache closed days and re-query only what it lacks
+create or replace function industry_daily_histogram(p_start timestamptz, p_end timestamptz)
+returns table (day date, industry text, count bigint)
+language sql stable
+as $$
+    select (s.created_at at time zone 'utc')::date, s.industry, count(*)
+    from customer_scanned_data s
+    where s.created_at >= p_start and s.created_at <= p_end
+    group by 1, 2
+$$;
+
+-- Range-bounded overload of the project's daily_scan_counts(); NULL = unbounded
+create or replace function daily_scan_counts(p_start timestamptz, p_end timestamptz)
+returns table (date date, count bigint)
+language sql stable
+as $$
+    select (s.created_at at time zone 'utc')::date, count(*)
+    from customer_scanned_data s
+    where (p_start is null or s.created_at >= p_start)
+      and (p_end is null or s.created_at <= p_end)
+    group by 1
+    order by 1
+$$;
+
+-- Indexes backing the grouped scans above
+create index if not exists contacts_user_created_idx on contacts (user_id, created_at);
+create index if not exists contacts_user_follow_up_idx on contacts (user_id, next_follow_up_due_at)
+    where next_follow_up_due_at is not null;
+create index if not exists meetings_user_scheduled_idx on meetings (user_id, scheduled_at);
+create index if not exists emails_user_drafted_idx on emails (user_id, drafted_at);
+create index if not exists customer_scanned_data_created_idx on customer_scanned_data (created_at);
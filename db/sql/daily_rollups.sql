@@ -0,0 +1,161 @@
+-- Per-user daily rollups behind the summary and funnel endpoints.
+--
+-- One row per (user, UTC day, source table, status, outcome, flag) holding a
+-- row count. Triggers keep it current on every insert / update / delete of
+-- contacts, meetings and emails, so a date range is answered by summing at
+-- most one row per day and key instead of scanning the raw tables.
+--
+-- Apply after analytics_functions.sql, then backfill existing rows once:
+--   select rebuild_daily_rollups();
+-- (or `python -m db.rebuild_rollups`) and set DAILY_ROLLUPS=true.
+--
+--   contacts: day of created_at,   status = last_outcome_status, outcome = normalized outcome
+--   meetings: day of scheduled_at, status = status,              flag = mom_exists
+--   emails:   day of drafted_at,   status = status
+-- NULL status / outcome are stored as ''.
+
+create table if not exists daily_rollups (
+    user_id uuid not null,
+    source text not null,
+    day date not null,
+    status text not null default '',
+    outcome text not null default '',
+    flag boolean not null default false,
+    count bigint not null default 0,
+    primary key (user_id, source, day, status, outcome, flag)
+);
+
+create or replace function bump_daily_rollup(
+    p_user_id uuid, p_source text, p_at timestamptz,
+    p_status text, p_outcome text, p_flag boolean, p_delta bigint
+)
+returns void
+language sql
+as $$
+    insert into daily_rollups (user_id, source, day, status, outcome, flag, count)
+    select p_user_id, p_source, (p_at at time zone 'utc')::date,
+           coalesce(p_status, ''), coalesce(p_outcome, ''), coalesce(p_flag, false), p_delta
+    where p_user_id is not null and p_at is not null
+    on conflict (user_id, source, day, status, outcome, flag)
+    do update set count = daily_rollups.count + excluded.count
+$$;
+
+create or replace function contacts_daily_rollup()
+returns trigger
+language plpgsql
+as $$
+begin
+    if tg_op in ('UPDATE', 'DELETE') then
+        perform bump_daily_rollup(old.user_id, 'contacts', old.created_at, old.last_outcome_status::text,
+            lower(coalesce(nullif(old.outcome, ''), nullif(old.last_outcome_status::text, ''), '')), false, -1);
+    end if;
+    if tg_op in ('INSERT', 'UPDATE') then
+        perform bump_daily_rollup(new.user_id, 'contacts', new.created_at, new.last_outcome_status::text,
+            lower(coalesce(nullif(new.outcome, ''), nullif(new.last_outcome_status::text, ''), '')), false, 1);
+    end if;
+    return null;
+end
+$$;
+
+create or replace function meetings_daily_rollup()
+returns trigger
+language plpgsql
+as $$
+begin
+    if tg_op in ('UPDATE', 'DELETE') then
+        perform bump_daily_rollup(old.user_id, 'meetings', old.scheduled_at, old.status::text, '', old.mom_exists, -1);
+    end if;
+    if tg_op in ('INSERT', 'UPDATE') then
+        perform bump_daily_rollup(new.user_id, 'meetings', new.scheduled_at, new.status::text, '', new.mom_exists, 1);
+    end if;
+    return null;
+end
+$$;
+
+create or replace function emails_daily_rollup()
+returns trigger
+language plpgsql
+as $$
+begin
+    if tg_op in ('UPDATE', 'DELETE') then
+        perform bump_daily_rollup(old.user_id, 'emails', old.drafted_at, old.status::text, '', false, -1);
+    end if;
+    if tg_op in ('INSERT', 'UPDATE') then
+        perform bump_daily_rollup(new.user_id, 'emails', new.drafted_at, new.status::text, '', false, 1);
+    end if;
+    return null;
+end
+$$;
+
+drop trigger if exists contacts_daily_rollup on contacts;
+create trigger contacts_daily_rollup
+    after insert or delete or update of user_id, created_at, outcome, last_outcome_status on contacts
+    for each row execute function contacts_daily_rollup();
+
+drop trigger if exists meetings_daily_rollup on meetings;
+create trigger meetings_daily_rollup
+    after insert or delete or update of user_id, scheduled_at, status, mom_exists on meetings
+    for each row execute function meetings_daily_rollup();
+
+drop trigger if exists emails_daily_rollup on emails;
+create trigger emails_daily_rollup
+    after insert or delete or update of user_id, drafted_at, status on emails
+    for each row execute function emails_daily_rollup();
+
+-- Backfill / repair: recompute one user's rollups (or everyone's) from the raw tables.
+create or replace function rebuild_daily_rollups(p_user_id uuid default null)
+returns bigint
+language plpgsql
+as $$
+declare
+    written bigint;
+begin
+    -- Block trigger bumps until the rebuilt counts are committed
+    lock table daily_rollups in share row exclusive mode;
+    delete from daily_rollups where p_user_id is null or user_id = p_user_id;
+
+    insert into daily_rollups (user_id, source, day, status, outcome, flag, count)
+    select user_id, 'contacts', (created_at at time zone 'utc')::date, coalesce(last_outcome_status::text, ''),
+           lower(coalesce(nullif(outcome, ''), nullif(last_outcome_status::text, ''), '')), false, count(*)
+    from contacts
+    where created_at is not null and (p_user_id is null or user_id = p_user_id)
+    group by 1, 3, 4, 5
+    union all
+    select user_id, 'meetings', (scheduled_at at time zone 'utc')::date, coalesce(status::text, ''),
+           '', coalesce(mom_exists, false), count(*)
+    from meetings
+    where scheduled_at is not null and (p_user_id is null or user_id = p_user_id)
+    group by 1, 3, 4, 6
+    union all
+    select user_id, 'emails', (drafted_at at time zone 'utc')::date, coalesce(status::text, ''),
+           '', false, count(*)
+    from emails
+    where drafted_at is not null and (p_user_id is null or user_id = p_user_id)
+    group by 1, 3, 4;
+
+    get diagnostics written = row_count;
+    return written;
+end
+$$;
+
+-- Summed histogram for one source over an inclusive day range (NULL = unbounded).
+-- `p_cutoff` splits rows into before_cutoff cohorts at the start of that day.
+create or replace function rollup_histogram(
+    p_user_id uuid,
+    p_source text,
+    p_from date default null,
+    p_to date default null,
+    p_cutoff date default null
+)
+returns table (status text, outcome text, flag boolean, before_cutoff boolean, count bigint)
+language sql stable
+as $$
+    select r.status, r.outcome, r.flag, r.day < p_cutoff, sum(r.count)::bigint
+    from daily_rollups r
+    where r.user_id = p_user_id
+      and r.source = p_source
+      and (p_from is null or r.day >= p_from)
+      and (p_to is null or r.day <= p_to)
+    group by 1, 2, 3, 4
+    having sum(r.count) <> 0
+$$;
@@ -0,0 +1,16 @@
+-- Indexes for the keyset-paged list endpoints (contacts, completed meetings,
+-- drafted emails). Each page is `WHERE user_id = $1 AND (ts, id) < ($2, $3)
+-- ORDER BY ts DESC, id DESC LIMIT n`: a backward scan of one of these
+-- indexes that starts at the cursor, so deep pages cost the same as the first.
+--
+-- Apply with the Supabase SQL editor or `psql "$DATABASE_URL" -f db/sql/keyset_indexes.sql`.
+
+create index if not exists contacts_user_created_id_idx
+    on contacts (user_id, created_at, contact_id);
+
+create index if not exists meetings_user_completed_idx
+    on meetings (user_id, scheduled_at, meeting_id)
+    where status = 'COMPLETED';
+
+create index if not exists emails_user_drafted_id_idx
+    on emails (user_id, drafted_at, email_id);
@@ -0,0 +1,495 @@
+import sqlite3
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Iterable, List, Optional, Sequence
+
+from core.config import DAILY_ROLLUPS
+from db.repository import KEYSET_COLUMNS, Cursor, Repository, Row, day_end, group_by_columns, rollup_rows, sql_columns as _columns
+
+UTC = timezone.utc
+
+# Mirrors the subset of the Supabase schema the analytics service touches.
+# Timestamps are stored as ISO-8601 UTC strings so range filters compare the
+# same way PostgREST string filters do.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS contacts (
+    contact_id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    first_name TEXT,
+    last_name TEXT,
+    company_name TEXT,
+    email TEXT,
+    phone TEXT,
+    last_activity_at TEXT,
+    created_at TEXT,
+    next_follow_up_due_at TEXT,
+    next_follow_up_type TEXT,
+    last_outcome_status TEXT,
+    outcome TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_contacts_user_created_id ON contacts (user_id, created_at, contact_id);
+CREATE INDEX IF NOT EXISTS idx_contacts_user_follow_up ON contacts (user_id, next_follow_up_due_at);
+
+CREATE TABLE IF NOT EXISTS meetings (
+    meeting_id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    contact_id TEXT,
+    scheduled_at TEXT,
+    status TEXT,
+    mom_exists INTEGER DEFAULT 0,
+    duration_seconds INTEGER,
+    mom_text TEXT,
+    ai_score INTEGER,
+    ai_reasoning TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_meetings_user_scheduled_id ON meetings (user_id, scheduled_at, meeting_id);
+CREATE INDEX IF NOT EXISTS idx_meetings_contact ON meetings (contact_id);
+
+CREATE TABLE IF NOT EXISTS emails (
+    email_id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    contact_id TEXT,
+    status TEXT,
+    drafted_at TEXT,
+    prompt_version TEXT,
+    subject TEXT,
+    recipient_email TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_emails_user_drafted_id ON emails (user_id, drafted_at, email_id);
+
+CREATE TABLE IF NOT EXISTS customer_scanned_data (
+    id TEXT PRIMARY KEY,
+    user_id TEXT,
+    industry TEXT,
+    created_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_scans_created ON customer_scanned_data (created_at);
+
+CREATE TABLE IF NOT EXISTS daily_rollups (
+    user_id TEXT NOT NULL,
+    day TEXT NOT NULL,
+    source TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT '',
+    outcome TEXT NOT NULL DEFAULT '',
+    flag INTEGER NOT NULL DEFAULT 0,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, source, day, status, outcome, flag)
+);
+"""
+
+# Per-source rollup key: (timestamp column, status, outcome, flag) expressions
+# over a row alias `{r}`, plus the columns whose updates move a row between
+# keys. Mirrors db/sql/daily_rollups.sql.
+ROLLUP_KEYS = {
+    "contacts": ("created_at", "coalesce({r}.last_outcome_status, '')",
+                 "lower(coalesce(nullif({r}.outcome, ''), nullif({r}.last_outcome_status, ''), ''))", "0",
+                 "user_id, created_at, outcome, last_outcome_status"),
+    "meetings": ("scheduled_at", "coalesce({r}.status, '')", "''", "coalesce({r}.mom_exists, 0)",
+                 "user_id, scheduled_at, status, mom_exists"),
+    "emails": ("drafted_at", "coalesce({r}.status, '')", "''", "0", "user_id, drafted_at, status"),
+}
+
+
+def _rollup_bump(source: str, r: str, delta: int) -> str:
+    ts, status, outcome, flag, _ = ROLLUP_KEYS[source]
+    return (
+        "INSERT INTO daily_rollups (user_id, day, source, status, outcome, flag, count) "
+        f"SELECT {r}.user_id, substr({r}.{ts}, 1, 10), '{source}', {status.format(r=r)}, "
+        f"{outcome.format(r=r)}, {flag.format(r=r)}, {delta} WHERE {r}.{ts} IS NOT NULL "
+        "ON CONFLICT (user_id, source, day, status, outcome, flag) DO UPDATE SET count = count + excluded.count;"
+    )
+
+
+def _rollup_triggers() -> str:
+    # Keep rollups current on every write, whoever makes it
+    sql = []
+    for source, (_, _, _, _, watched) in ROLLUP_KEYS.items():
+        sql.append(f"CREATE TRIGGER IF NOT EXISTS {source}_rollup_insert AFTER INSERT ON {source} "
+                   f"BEGIN {_rollup_bump(source, 'NEW', 1)} END;")
+        sql.append(f"CREATE TRIGGER IF NOT EXISTS {source}_rollup_delete AFTER DELETE ON {source} "
+                   f"BEGIN {_rollup_bump(source, 'OLD', -1)} END;")
+        sql.append(f"CREATE TRIGGER IF NOT EXISTS {source}_rollup_update AFTER UPDATE OF {watched} ON {source} "
+                   f"BEGIN {_rollup_bump(source, 'OLD', -1)} {_rollup_bump(source, 'NEW', 1)} END;")
+    return "\n".join(sql)
+
+BOOL_COLUMNS = {"mom_exists"}
+
+
+def _to_db(value: Any) -> Any:
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=UTC)
+        return value.astimezone(UTC).isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, bool):
+        return int(value)
+    return value
+
+
+def _from_db(row: sqlite3.Row) -> Row:
+    data = dict(row)
+    for col in BOOL_COLUMNS.intersection(data):
+        if data[col] is not None:
+            data[col] = bool(data[col])
+    return data
+
+
+class SQLiteRepository(Repository):
+    """
+    Local SQLite backend. With the default ":memory:" path it is a fully
+    offline, in-process database for benchmarks and tests.
+    """
+
+    def __init__(self, path: str = ":memory:", daily_rollups: bool = DAILY_ROLLUPS):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.lock = threading.Lock()
+        self.daily_rollups = daily_rollups
+        with self.lock:
+            self.conn.executescript(SCHEMA)
+            self.conn.executescript(_rollup_triggers())
+
+    def _query(self, sql: str, params: Sequence[Any] = ()) -> List[Row]:
+        with self.lock:
+            cur = self.conn.execute(sql, [_to_db(p) for p in params])
+            return [_from_db(r) for r in cur.fetchall()]
+
+    def _execute(self, sql: str, params: Sequence[Any] = ()) -> None:
+        with self.lock:
+            self.conn.execute(sql, [_to_db(p) for p in params])
+            self.conn.commit()
+
+    def _update(self, table: str, values: Row, where: Row) -> None:
+        sets = ", ".join(f"{_columns(k)} = ?" for k in values)
+        conds = " AND ".join(f"{_columns(k)} = ?" for k in where)
+        self._execute(f"UPDATE {table} SET {sets} WHERE {conds}", [*values.values(), *where.values()])
+
+    def _update_many(self, table: str, key: str, user_id: str, rows: List[Row]) -> None:
+        # One transaction; one executemany per distinct set of columns
+        with self.lock:
+            for columns, group in group_by_columns(rows, key).items():
+                sets = ", ".join(f"{_columns(c)} = ?" for c in columns)
+                self.conn.executemany(
+                    f"UPDATE {table} SET {sets} WHERE {key} = ? AND user_id = ?",
+                    ([_to_db(r[c]) for c in columns] + [r[key], user_id] for r in group),
+                )
+            self.conn.commit()
+
+    def _in(self, values: Sequence[Any], params: List[Any]) -> str:
+        params.extend(values)
+        return f"({', '.join('?' for _ in values)})"
+
+    def insert_rows(self, table: str, rows: Iterable[Row]) -> int:
+        """Bulk-load rows (seeding for tests and benchmarks). Returns the row count."""
+        rows = list(rows)
+        if not rows:
+            return 0
+        cols = list(dict.fromkeys(c for r in rows for c in r))
+        sql = f"INSERT INTO {table} ({', '.join(_columns(c) for c in cols)}) VALUES ({', '.join('?' for _ in cols)})"
+        with self.lock:
+            self.conn.executemany(sql, ([_to_db(r.get(c)) for c in cols] for r in rows))
+            self.conn.commit()
+        return len(rows)
+
+    def list_page(self, table: str, user_id: str, limit: int, after: Optional[Cursor] = None,
+                  start: Optional[str] = None, end: Optional[str] = None, columns: str = "*") -> List[Row]:
+        column, key = KEYSET_COLUMNS[table]
+        params: List[Any] = [user_id]
+        where = self._range(column, start, end, params) + self._after(column, key, after, params)
+        return self._query(
+            f"SELECT {_columns(columns)} FROM {table} WHERE user_id = ?" + where
+            + f" ORDER BY {column} DESC NULLS FIRST, {key} DESC LIMIT ?",
+            params + [limit],
+        )
+
+    # Contacts
+    def list_contacts(self, user_id: str, columns: str = "*",
+                      created_from: Optional[str] = None, created_to: Optional[str] = None,
+                      newest_first: bool = False) -> List[Row]:
+        sql = f"SELECT {_columns(columns)} FROM contacts WHERE user_id = ?"
+        params: List[Any] = [user_id]
+        if created_from:
+            sql += " AND created_at >= ?"
+            params.append(created_from)
+        if created_to:
+            sql += " AND created_at <= ?"
+            params.append(created_to)
+        if newest_first:
+            sql += " ORDER BY created_at DESC"
+        return self._query(sql, params)
+
+    def list_contacts_page(self, user_id: str, limit: int, after: Optional[Cursor] = None) -> List[Row]:
+        return self.list_page("contacts", user_id, limit, after)
+
+    def search_contacts(self, user_id: str, query: str) -> List[Row]:
+        pattern = f"%{query}%"
+        return self._query(
+            "SELECT * FROM contacts WHERE user_id = ? "
+            "AND (first_name LIKE ? OR last_name LIKE ? OR email LIKE ?)",
+            [user_id, pattern, pattern, pattern],
+        )
+
+    def list_overdue_contacts(self, user_id: str, now: str, columns: str = "contact_id") -> List[Row]:
+        return self._query(
+            f"SELECT {_columns(columns)} FROM contacts WHERE user_id = ? "
+            "AND next_follow_up_due_at IS NOT NULL AND next_follow_up_due_at < ?",
+            [user_id, now],
+        )
+
+    def update_contact(self, contact_id: str, values: Row) -> None:
+        self._update("contacts", values, {"contact_id": contact_id})
+
+    def update_contacts(self, user_id: str, rows: List[Row]) -> None:
+        self._update_many("contacts", "contact_id", user_id, rows)
+
+    # Meetings
+    def list_meetings(self, user_id: str, columns: str = "*",
+                      scheduled_from: Optional[str] = None, scheduled_to: Optional[str] = None) -> List[Row]:
+        sql = f"SELECT {_columns(columns)} FROM meetings WHERE user_id = ?"
+        params: List[Any] = [user_id]
+        if scheduled_from:
+            sql += " AND scheduled_at >= ?"
+            params.append(scheduled_from)
+        if scheduled_to:
+            sql += " AND scheduled_at <= ?"
+            params.append(scheduled_to)
+        return self._query(sql, params)
+
+    def _with_contact(self, rows: List[Row], fields: Sequence[str]) -> List[Row]:
+        # Reshape flat join columns into the nested dict PostgREST embeds
+        for r in rows:
+            contact = {f: r.pop(f"c_{f}") for f in fields}
+            r["contacts"] = contact if r.pop("c_contact_id") else None
+        return rows
+
+    def list_upcoming_meetings(self, user_id: str, now: str, limit: int) -> List[Row]:
+        rows = self._query(
+            "SELECT m.meeting_id, m.scheduled_at, m.status, m.mom_exists, "
+            "c.contact_id AS c_contact_id, c.first_name AS c_first_name, c.last_name AS c_last_name "
+            "FROM meetings m LEFT JOIN contacts c ON c.contact_id = m.contact_id "
+            "WHERE m.user_id = ? AND m.scheduled_at >= ? ORDER BY m.scheduled_at LIMIT ?",
+            [user_id, now, limit],
+        )
+        return self._with_contact(rows, ("first_name", "last_name"))
+
+    def list_completed_meetings(self, user_id: str, limit: int, after: Optional[Cursor] = None) -> List[Row]:
+        params: List[Any] = [user_id]
+        where = self._after("m.scheduled_at", "m.meeting_id", after, params)
+        rows = self._query(
+            "SELECT m.*, c.contact_id AS c_contact_id, c.first_name AS c_first_name, "
+            "c.last_name AS c_last_name, c.company_name AS c_company_name "
+            "FROM meetings m LEFT JOIN contacts c ON c.contact_id = m.contact_id "
+            "WHERE m.user_id = ? AND m.status = 'COMPLETED'" + where
+            + " ORDER BY m.scheduled_at DESC NULLS FIRST, m.meeting_id DESC LIMIT ?",
+            params + [limit],
+        )
+        return self._with_contact(rows, ("first_name", "last_name", "company_name"))
+
+    def get_meeting(self, meeting_id: str, columns: str = "*") -> Optional[Row]:
+        rows = self._query(f"SELECT {_columns(columns)} FROM meetings WHERE meeting_id = ?", [meeting_id])
+        return rows[0] if rows else None
+
+    def update_meeting(self, meeting_id: str, user_id: str, values: Row) -> None:
+        self._update("meetings", values, {"meeting_id": meeting_id, "user_id": user_id})
+
+    def list_meetings_by_id(self, user_id: str, meeting_ids: List[str], columns: str = "*") -> List[Row]:
+        if not meeting_ids:
+            return []
+        params: List[Any] = [user_id]
+        ids = self._in(meeting_ids, params)
+        return self._query(f"SELECT {_columns(columns)} FROM meetings WHERE user_id = ? AND meeting_id IN {ids}", params)
+
+    def update_meetings(self, user_id: str, rows: List[Row]) -> None:
+        self._update_many("meetings", "meeting_id", user_id, rows)
+
+    def list_contact_ai_scores(self, contact_id: str) -> List[Row]:
+        return self._query(
+            "SELECT ai_score FROM meetings WHERE contact_id = ? AND ai_score IS NOT NULL",
+            [contact_id],
+        )
+
+    def list_ai_scores(self, contact_ids: List[str]) -> List[Row]:
+        if not contact_ids:
+            return []
+        params: List[Any] = []
+        ids = self._in(contact_ids, params)
+        return self._query(
+            f"SELECT contact_id, ai_score FROM meetings WHERE contact_id IN {ids} AND ai_score IS NOT NULL",
+            params,
+        )
+
+    # Emails
+    def list_emails(self, user_id: str, columns: str = "*",
+                    drafted_from: Optional[str] = None, drafted_to: Optional[str] = None) -> List[Row]:
+        sql = f"SELECT {_columns(columns)} FROM emails WHERE user_id = ?"
+        params: List[Any] = [user_id]
+        if drafted_from:
+            sql += " AND drafted_at >= ?"
+            params.append(drafted_from)
+        if drafted_to:
+            sql += " AND drafted_at <= ?"
+            params.append(drafted_to)
+        return self._query(sql, params)
+
+    def search_emails(self, user_id: str, query: str) -> List[Row]:
+        return self._query(
+            "SELECT * FROM emails WHERE user_id = ? AND status LIKE ?",
+            [user_id, f"%{query}%"],
+        )
+
+    def list_recent_emails(self, user_id: str, limit: int, after: Optional[Cursor] = None) -> List[Row]:
+        return self.list_page("emails", user_id, limit, after)
+
+    # Scans
+    def list_scan_industries(self, start: str, end: str, columns: str = "industry") -> List[Row]:
+        return self._query(
+            f"SELECT {_columns(columns)} FROM customer_scanned_data WHERE created_at >= ? AND created_at <= ?",
+            [start, end],
+        )
+
+    def daily_scan_counts(self, start: Optional[str] = None, end: Optional[str] = None) -> List[Row]:
+        params: List[Any] = []
+        where = self._range("created_at", start, end, params)
+        return self._query(
+            "SELECT substr(created_at, 1, 10) AS date, COUNT(*) AS count "
+            "FROM customer_scanned_data WHERE 1 = 1" + where + " GROUP BY 1 ORDER BY 1",
+            params,
+        )
+
+    # Aggregates
+    def _range(self, column: str, start: Optional[str], end: Optional[str], params: List[Any]) -> str:
+        sql = ""
+        if start:
+            sql += f" AND {column} >= ?"
+            params.append(start)
+        if end:
+            sql += f" AND {column} <= ?"
+            params.append(end)
+        return sql
+
+    def _after(self, column: str, key: str, after: Optional[Cursor], params: List[Any]) -> str:
+        # Rows past `after` in ORDER BY column DESC NULLS FIRST, key DESC. The
+        # row-value comparison is one index seek; it is never true for NULLs.
+        if after is None:
+            return ""
+        value, last_key = after
+        if value is None:
+            params.append(last_key)
+            return f" AND ({column} IS NOT NULL OR {key} < ?)"
+        params.extend([value, last_key])
+        return f" AND ({column}, {key}) < (?, ?)"
+
+    def contact_outcome_histogram(self, user_id: str, created_from: Optional[str] = None,
+                                  created_to: Optional[str] = None, cutoff: Optional[str] = None) -> List[Row]:
+        params: List[Any] = [cutoff, cutoff, user_id]
+        where = self._range("created_at", created_from, created_to, params)
+        rows = self._query(
+            "SELECT lower(coalesce(nullif(outcome, ''), nullif(last_outcome_status, ''), '')) AS outcome, "
+            "last_outcome_status, "
+            "CASE WHEN ? IS NULL OR created_at IS NULL THEN NULL ELSE created_at < ? END AS before_cutoff, "
+            "COUNT(*) AS count FROM contacts WHERE user_id = ?" + where + " GROUP BY 1, 2, 3",
+            params,
+        )
+        for r in rows:
+            if r["before_cutoff"] is not None:
+                r["before_cutoff"] = bool(r["before_cutoff"])
+        return rows
+
+    def meeting_status_histogram(self, user_id: str, scheduled_from: Optional[str] = None,
+                                 scheduled_to: Optional[str] = None) -> List[Row]:
+        params: List[Any] = [user_id]
+        where = self._range("scheduled_at", scheduled_from, scheduled_to, params)
+        return self._query(
+            "SELECT status, coalesce(mom_exists, 0) AS mom_exists, COUNT(*) AS count "
+            "FROM meetings WHERE user_id = ?" + where + " GROUP BY 1, 2",
+            params,
+        )
+
+    def email_status_histogram(self, user_id: str, drafted_from: Optional[str] = None,
+                               drafted_to: Optional[str] = None) -> List[Row]:
+        params: List[Any] = [user_id]
+        where = self._range("drafted_at", drafted_from, drafted_to, params)
+        return self._query(
+            "SELECT status, COUNT(*) AS count FROM emails WHERE user_id = ?" + where + " GROUP BY 1",
+            params,
+        )
+
+    def team_contact_counts(self, user_ids: List[str], created_from: Optional[str] = None,
+                            created_to: Optional[str] = None, now: Optional[str] = None) -> List[Row]:
+        if not user_ids:
+            return []
+        params: List[Any] = [created_from, created_from, created_to, created_to, now, *user_ids]
+        return self._query(
+            "SELECT user_id, "
+            "SUM(CASE WHEN (? IS NULL OR created_at >= ?) AND (? IS NULL OR created_at <= ?) THEN 1 ELSE 0 END) "
+            "AS contacts, "
+            "SUM(CASE WHEN next_follow_up_due_at < ? THEN 1 ELSE 0 END) AS overdue "
+            f"FROM contacts WHERE user_id IN ({', '.join('?' * len(user_ids))}) GROUP BY 1",
+            params,
+        )
+
+    def team_meeting_counts(self, user_ids: List[str], scheduled_from: Optional[str] = None,
+                            scheduled_to: Optional[str] = None) -> List[Row]:
+        if not user_ids:
+            return []
+        params: List[Any] = list(user_ids)
+        where = self._range("scheduled_at", scheduled_from, scheduled_to, params)
+        return self._query(
+            "SELECT user_id, COUNT(*) AS completed FROM meetings "
+            f"WHERE user_id IN ({', '.join('?' * len(user_ids))}) AND status = 'COMPLETED'" + where +
+            " GROUP BY 1",
+            params,
+        )
+
+    def count_overdue_contacts(self, user_id: str, now: str) -> int:
+        rows = self._query(
+            "SELECT COUNT(*) AS count FROM contacts WHERE user_id = ? "
+            "AND next_follow_up_due_at IS NOT NULL AND next_follow_up_due_at < ?",
+            [user_id, now],
+        )
+        return rows[0]["count"]
+
+    def industry_histogram(self, start: str, end: str) -> List[Row]:
+        return self._query(
+            "SELECT industry, COUNT(*) AS count FROM customer_scanned_data "
+            "WHERE created_at >= ? AND created_at <= ? GROUP BY 1",
+            [start, end],
+        )
+
+    def industry_daily_histogram(self, start_day: str, end_day: str) -> List[Row]:
+        return self._query(
+            "SELECT substr(created_at, 1, 10) AS day, industry, COUNT(*) AS count FROM customer_scanned_data "
+            "WHERE created_at >= ? AND created_at <= ? GROUP BY 1, 2",
+            [start_day, day_end(end_day)],
+        )
+
+    # Daily rollups
+    def rollup_histogram(self, user_id: str, source: str, from_day: Optional[str] = None,
+                         to_day: Optional[str] = None, cutoff_day: Optional[str] = None) -> List[Row]:
+        params: List[Any] = [cutoff_day, cutoff_day, user_id, source]
+        where = self._range("day", from_day, to_day, params)
+        rows = self._query(
+            "SELECT status, outcome, flag, CASE WHEN ? IS NULL THEN NULL ELSE day < ? END AS before_cutoff, "
+            "SUM(count) AS count FROM daily_rollups WHERE user_id = ? AND source = ?" + where +
+            " GROUP BY 1, 2, 3, 4 HAVING SUM(count) <> 0",
+            params,
+        )
+        return rollup_rows(source, rows)
+
+    def rebuild_daily_rollups(self, user_id: Optional[str] = None) -> int:
+        scope = " AND user_id = ?" if user_id else ""
+        params = [user_id] if user_id else []
+        with self.lock:
+            self.conn.execute("DELETE FROM daily_rollups WHERE 1 = 1" + scope, params)
+            for source, (ts, status, outcome, flag, _) in ROLLUP_KEYS.items():
+                self.conn.execute(
+                    "INSERT INTO daily_rollups (user_id, day, source, status, outcome, flag, count) "
+                    f"SELECT user_id, substr({ts}, 1, 10), '{source}', {status.format(r=source)}, "
+                    f"{outcome.format(r=source)}, {flag.format(r=source)}, COUNT(*) FROM {source} "
+                    f"WHERE {ts} IS NOT NULL{scope} GROUP BY 1, 2, 4, 5, 6",
+                    params,
+                )
+            self.conn.commit()
+            return self.conn.execute("SELECT COUNT(*) FROM daily_rollups WHERE 1 = 1" + scope, params).fetchone()[0]
@@ -0,0 +1,382 @@
+import logging
+from typing import Any, Callable, List, Optional, Sequence
+
+from postgrest.exceptions import APIError
+
+from core.config import DAILY_ROLLUPS, SUPABASE_AGGREGATE_RPC, SUPABASE_MAX_ROWS
+from db.repository import KEYSET_COLUMNS, Cursor, Repository, Row, day_end, group_by_columns, rollup_rows
+from utils import tracing
+
+logger = logging.getLogger(__name__)
+
+# PostgREST error code for "function not found in the schema cache"
+MISSING_FUNCTION = "PGRST202"
+# Postgres not_null_violation: an upsert row lacks a required column
+NOT_NULL_VIOLATION = "23502"
+
+
+def _note_pages(what: str, pages: int, rows: int) -> None:
+    # The instrumented call counts one round trip; report the other pages
+    if pages > 1:
+        tracing.note(f"{what}: {rows} rows in {pages} pages", pages - 1)
+
+
+class SupabaseRepository(Repository):
+    def __init__(self, client=None, aggregate_rpc: bool = SUPABASE_AGGREGATE_RPC,
+                 daily_rollups: bool = DAILY_ROLLUPS):
+        if client is None:
+            from db.supabase_client import supabase as client
+        self.client = client
+        self.aggregate_rpc = aggregate_rpc
+        self.daily_rollups = daily_rollups
+        self.bulk_upsert = True
+
+    def _all_pages(self, what: str, build: Callable[[], Any]) -> List[Row]:
+        """
+        Run an ordered query page by page. PostgREST silently caps every
+        response at its max-rows setting, so one request can drop rows.
+        Pages after the first are noted as extra round trips of `what`.
+        """
+        rows: List[Row] = []
+        pages = 0
+        while True:
+            page = build().range(len(rows), len(rows) + SUPABASE_MAX_ROWS - 1).execute().data
+            rows.extend(page)
+            pages += 1
+            if len(page) < SUPABASE_MAX_ROWS:
+                _note_pages(what, pages, len(rows))
+                return rows
+
+    def _aggregate(self, function: str, params: dict, fallback: Callable[[], Any],
+                   order: Sequence[str] = ()) -> Any:
+        """
+        Call a grouped-count SQL function. If it is not deployed, switch this
+        repository to the row-shipping defaults instead of failing every call.
+        Results that can outgrow one response pass an `order` and are paged.
+        """
+        if self.aggregate_rpc:
+            try:
+                if order:
+                    return self._all_pages(function, lambda: self._ordered(self.client.rpc(function, params), order))
+                return self.client.rpc(function, params).execute().data
+            except APIError as e:
+                if e.code != MISSING_FUNCTION:
+                    raise
+                logger.warning("RPC %s not deployed (%s). Falling back to row aggregation.", function, e.message)
+                tracing.note(f"{function}: RPC not deployed, aggregated from rows", 1)
+                self.aggregate_rpc = False
+        return fallback()
+
+    @staticmethod
+    def _ordered(query, columns: Sequence[str]):
+        for column in columns:
+            query = query.order(column)
+        return query
+
+    def _update_many(self, table: str, key: str, user_id: str, rows: List[Row]) -> None:
+        """
+        Bulk update as one upsert per distinct set of columns. Upserts insert
+        unknown keys, so callers pass only rows that exist; `user_id` is set
+        on each row and must match the owner.
+        """
+        if self.bulk_upsert:
+            try:
+                for _, group in group_by_columns(rows, key).items():
+                    self.client.table(table) \
+                        .upsert([{**r, "user_id": user_id} for r in group], on_conflict=key) \
+                        .execute()
+                return
+            except APIError as e:
+                # Postgres checks NOT NULL on the proposed insert row even when
+                # it conflicts, so tables with required columns cannot be upserted
+                if e.code != NOT_NULL_VIOLATION:
+                    raise
+                logger.warning("Bulk upsert into %s rejected (%s). Falling back to row updates.", table, e.message)
+                self.bulk_upsert = False
+        for r in rows:
+            self.client.table(table) \
+                .update({c: v for c, v in r.items() if c != key}) \
+                .eq(key, r[key]) \
+                .eq("user_id", user_id) \
+                .execute()
+
+    @staticmethod
+    def _after(query, column: str, key: str, after: Optional[Cursor]):
+        """
+        Order by column DESC NULLS FIRST, key DESC and keep the rows past
+        `after`. PostgREST has no row comparison, so (column, key) < after
+        is spelled out as an `or` filter.
+        """
+        query = query.order(column, desc=True, nullsfirst=True).order(key, desc=True)
+        if after is None:
+            return query
+        value, last_key = after
+        if value is None:
+            return query.or_(f"{column}.not.is.null,and({column}.is.null,{key}.lt.{last_key})")
+        return query.or_(f'{column}.lt."{value}",and({column}.eq."{value}",{key}.lt.{last_key})')
+
+    def list_page(self, table: str, user_id: str, limit: int, after: Optional[Cursor] = None,
+                  start: Optional[str] = None, end: Optional[str] = None, columns: str = "*") -> List[Row]:
+        # PostgREST caps each response at max-rows: larger pages take several
+        column, key = KEYSET_COLUMNS[table]
+        rows: List[Row] = []
+        pages = 0
+        while True:
+            query = self.client.table(table) \
+                .select(columns) \
+                .eq("user_id", user_id)
+            if start:
+                query = query.gte(column, start)
+            if end:
+                query = query.lte(column, end)
+            wanted = min(limit - len(rows), SUPABASE_MAX_ROWS)
+            page = self._after(query, column, key, after).limit(wanted).execute().data
+            rows.extend(page)
+            pages += 1
+            if len(page) < wanted or len(rows) >= limit:
+                _note_pages(f"list_page({table})", pages, len(rows))
+                return rows
+            after = (page[-1].get(column), str(page[-1][key]))
+
+    def list_contacts(self, user_id: str, columns: str = "*",
+                      created_from: Optional[str] = None, created_to: Optional[str] = None,
+                      newest_first: bool = False) -> List[Row]:
+        query = self.client.table("contacts") \
+            .select(columns) \
+            .eq("user_id", user_id)
+        if created_from:
+            query = query.gte("created_at", created_from)
+        if created_to:
+            query = query.lte("created_at", created_to)
+        if newest_first:
+            query = query.order("created_at", desc=True)
+        return query.execute().data
+
+    def list_contacts_page(self, user_id: str, limit: int, after: Optional[Cursor] = None) -> List[Row]:
+        return self.list_page("contacts", user_id, limit, after)
+
+    def search_contacts(self, user_id: str, query: str) -> List[Row]:
+        return self.client.table("contacts") \
+            .select("*") \
+            .eq("user_id", user_id) \
+            .or_(f"first_name.ilike.%{query}%,last_name.ilike.%{query}%,email.ilike.%{query}%") \
+            .execute().data
+
+    def list_overdue_contacts(self, user_id: str, now: str, columns: str = "contact_id") -> List[Row]:
+        return self.client.table("contacts") \
+            .select(columns) \
+            .eq("user_id", user_id) \
+            .lt("next_follow_up_due_at", now) \
+            .not_.is_("next_follow_up_due_at", "null") \
+            .execute().data
+
+    def update_contact(self, contact_id: str, values: Row) -> None:
+        self.client.table("contacts").update(values).eq("contact_id", contact_id).execute()
+
+    def update_contacts(self, user_id: str, rows: List[Row]) -> None:
+        self._update_many("contacts", "contact_id", user_id, rows)
+
+    def list_meetings(self, user_id: str, columns: str = "*",
+                      scheduled_from: Optional[str] = None, scheduled_to: Optional[str] = None) -> List[Row]:
+        query = self.client.table("meetings") \
+            .select(columns) \
+            .eq("user_id", user_id)
+        if scheduled_from:
+            query = query.gte("scheduled_at", scheduled_from)
+        if scheduled_to:
+            query = query.lte("scheduled_at", scheduled_to)
+        return query.execute().data
+
+    def list_upcoming_meetings(self, user_id: str, now: str, limit: int) -> List[Row]:
+        # Supabase-py supports joins if foreign keys exist: .select("*, contacts(first_name, last_name)")
+        # If join fails, we fallback to simple query
+        try:
+            return self.client.table("meetings") \
+                .select("meeting_id, scheduled_at, status, mom_exists, contacts(first_name, last_name)") \
+                .eq("user_id", user_id) \
+                .gte("scheduled_at", now) \
+                .order("scheduled_at") \
+                .limit(limit) \
+                .execute().data
+        except Exception as e:
+            # Fallback without join if it fails
+            tracing.note(f"list_upcoming_meetings: join failed ({e}), queried again without contacts", 1)
+            return self.client.table("meetings") \
+                .select("meeting_id, scheduled_at, status, mom_exists") \
+                .eq("user_id", user_id) \
+                .gte("scheduled_at", now) \
+                .order("scheduled_at") \
+                .limit(limit) \
+                .execute().data
+
+    def list_completed_meetings(self, user_id: str, limit: int, after: Optional[Cursor] = None) -> List[Row]:
+        query = self.client.table("meetings") \
+            .select("*, contacts(first_name, last_name, company_name)") \
+            .eq("user_id", user_id) \
+            .eq("status", "COMPLETED")
+        return self._after(query, "scheduled_at", "meeting_id", after) \
+            .limit(limit) \
+            .execute().data
+
+    def get_meeting(self, meeting_id: str, columns: str = "*") -> Optional[Row]:
+        data = self.client.table("meetings") \
+            .select(columns) \
+            .eq("meeting_id", meeting_id) \
+            .execute().data
+        return data[0] if data else None
+
+    def update_meeting(self, meeting_id: str, user_id: str, values: Row) -> None:
+        self.client.table("meetings").update(values) \
+            .eq("meeting_id", meeting_id) \
+            .eq("user_id", user_id) \
+            .execute()
+
+    def list_meetings_by_id(self, user_id: str, meeting_ids: List[str], columns: str = "*") -> List[Row]:
+        if not meeting_ids:
+            return []
+        return self.client.table("meetings") \
+            .select(columns) \
+            .eq("user_id", user_id) \
+            .in_("meeting_id", list(meeting_ids)) \
+            .execute().data
+
+    def update_meetings(self, user_id: str, rows: List[Row]) -> None:
+        self._update_many("meetings", "meeting_id", user_id, rows)
+
+    def list_contact_ai_scores(self, contact_id: str) -> List[Row]:
+        return self.client.table("meetings") \
+            .select("ai_score") \
+            .eq("contact_id", contact_id) \
+            .not_.is_("ai_score", "null") \
+            .execute().data
+
+    def list_ai_scores(self, contact_ids: List[str]) -> List[Row]:
+        if not contact_ids:
+            return []
+        return self._all_pages("list_ai_scores", lambda: self.client.table("meetings")
+                               .select("contact_id, ai_score")
+                               .in_("contact_id", list(contact_ids))
+                               .not_.is_("ai_score", "null")
+                               .order("meeting_id"))
+
+    def list_emails(self, user_id: str, columns: str = "*",
+                    drafted_from: Optional[str] = None, drafted_to: Optional[str] = None) -> List[Row]:
+        query = self.client.table("emails") \
+            .select(columns) \
+            .eq("user_id", user_id)
+        if drafted_from:
+            query = query.gte("drafted_at", drafted_from)
+        if drafted_to:
+            query = query.lte("drafted_at", drafted_to)
+        return query.execute().data
+
+    def search_emails(self, user_id: str, query: str) -> List[Row]:
+        return self.client.table("emails") \
+            .select("*") \
+            .eq("user_id", user_id) \
+            .ilike("status", f"%{query}%") \
+            .execute().data
+
+    def list_recent_emails(self, user_id: str, limit: int, after: Optional[Cursor] = None) -> List[Row]:
+        return self.list_page("emails", user_id, limit, after)
+
+    def list_scan_industries(self, start: str, end: str, columns: str = "industry") -> List[Row]:
+        # Every scan in range across all users: page through it
+        return self._all_pages("list_scan_industries", lambda: self.client.table("customer_scanned_data")
+                               .select(columns)
+                               .gte("created_at", start)
+                               .lte("created_at", end)
+                               .order("created_at")
+                               .order("id"))
+
+    def daily_scan_counts(self, start: Optional[str] = None, end: Optional[str] = None) -> List[Row]:
+        def whole_history() -> List[Row]:
+            # The original no-argument function, filtered here
+            rows = self._all_pages("daily_scan_counts", lambda: self.client.rpc("daily_scan_counts", {}).order("date"))
+            return [r for r in rows if (not start or r["date"] >= start[:10]) and (not end or r["date"] <= end[:10])]
+
+        return self._aggregate(
+            "daily_scan_counts",
+            {"p_start": start, "p_end": end},
+            whole_history,
+            order=("date",),
+        )
+
+    # Aggregates (server-side; see db/sql/analytics_functions.sql)
+    def contact_outcome_histogram(self, user_id: str, created_from: Optional[str] = None,
+                                  created_to: Optional[str] = None, cutoff: Optional[str] = None) -> List[Row]:
+        return self._aggregate(
+            "contact_outcome_histogram",
+            {"p_user_id": user_id, "p_created_from": created_from, "p_created_to": created_to, "p_cutoff": cutoff},
+            lambda: super(SupabaseRepository, self).contact_outcome_histogram(user_id, created_from, created_to, cutoff),
+        )
+
+    def meeting_status_histogram(self, user_id: str, scheduled_from: Optional[str] = None,
+                                 scheduled_to: Optional[str] = None) -> List[Row]:
+        return self._aggregate(
+            "meeting_status_histogram",
+            {"p_user_id": user_id, "p_scheduled_from": scheduled_from, "p_scheduled_to": scheduled_to},
+            lambda: super(SupabaseRepository, self).meeting_status_histogram(user_id, scheduled_from, scheduled_to),
+        )
+
+    def email_status_histogram(self, user_id: str, drafted_from: Optional[str] = None,
+                               drafted_to: Optional[str] = None) -> List[Row]:
+        return self._aggregate(
+            "email_status_histogram",
+            {"p_user_id": user_id, "p_drafted_from": drafted_from, "p_drafted_to": drafted_to},
+            lambda: super(SupabaseRepository, self).email_status_histogram(user_id, drafted_from, drafted_to),
+        )
+
+    def team_contact_counts(self, user_ids: List[str], created_from: Optional[str] = None,
+                            created_to: Optional[str] = None, now: Optional[str] = None) -> List[Row]:
+        return self._aggregate(
+            "team_contact_counts",
+            {"p_user_ids": list(user_ids), "p_created_from": created_from, "p_created_to": created_to, "p_now": now},
+            lambda: super(SupabaseRepository, self).team_contact_counts(user_ids, created_from, created_to, now),
+            order=("user_id",),
+        )
+
+    def team_meeting_counts(self, user_ids: List[str], scheduled_from: Optional[str] = None,
+                            scheduled_to: Optional[str] = None) -> List[Row]:
+        return self._aggregate(
+            "team_meeting_counts",
+            {"p_user_ids": list(user_ids), "p_scheduled_from": scheduled_from, "p_scheduled_to": scheduled_to},
+            lambda: super(SupabaseRepository, self).team_meeting_counts(user_ids, scheduled_from, scheduled_to),
+            order=("user_id",),
+        )
+
+    def industry_histogram(self, start: str, end: str) -> List[Row]:
+        return self._aggregate(
+            "industry_histogram",
+            {"p_start": start, "p_end": end},
+            lambda: super(SupabaseRepository, self).industry_histogram(start, end),
+        )
+
+    def industry_daily_histogram(self, start_day: str, end_day: str) -> List[Row]:
+        # One row per (day, industry): long ranges exceed a single response
+        return self._aggregate(
+            "industry_daily_histogram",
+            {"p_start": start_day, "p_end": day_end(end_day)},
+            lambda: super(SupabaseRepository, self).industry_daily_histogram(start_day, end_day),
+            order=("day", "industry"),
+        )
+
+    def count_overdue_contacts(self, user_id: str, now: str) -> int:
+        # HEAD request with an exact count: no rows cross the wire
+        return self.client.table("contacts") \
+            .select("contact_id", count="exact", head=True) \
+            .eq("user_id", user_id) \
+            .lt("next_follow_up_due_at", now) \
+            .not_.is_("next_follow_up_due_at", "null") \
+            .execute().count or 0
+
+    # Daily rollups (see db/sql/daily_rollups.sql)
+    def rollup_histogram(self, user_id: str, source: str, from_day: Optional[str] = None,
+                         to_day: Optional[str] = None, cutoff_day: Optional[str] = None) -> List[Row]:
+        rows = self.client.rpc("rollup_histogram", {
+            "p_user_id": user_id, "p_source": source, "p_from": from_day, "p_to": to_day, "p_cutoff": cutoff_day,
+        }).execute().data
+        return rollup_rows(source, rows)
+
+    def rebuild_daily_rollups(self, user_id: Optional[str] = None) -> int:
+        return self.client.rpc("rebuild_daily_rollups", {"p_user_id": user_id}).execute().data
@@ -1,10 +1,43 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from routers import analytics_router
+from fastapi.responses import Response
+from core.config import (
+    METRICS_ENABLED, ROUND_TRIP_BUDGET, ROUND_TRIP_BUDGETS, TRACE_DEBUG_ENDPOINT, TRACE_LOG_SIZE, TRACE_SLOW_MS,
+    TRACING_ENABLED,
+)
+from core.logging_config import setup_logging
+from core.metrics_config import setup_metrics
+from db.repository import close_repository, open_repository
+from routers import analytics_router, export_router
+from services import analytics_service, mom_jobs
+from utils.http_metrics import MetricsMiddleware
+from utils.metrics import PROMETHEUS_MEDIA_TYPE, registry
+from utils.pagination import NEXT_CURSOR_HEADER
+from utils.tracing import SERVER_TIMING_HEADER, TraceLog, TracingMiddleware
+
+setup_logging()
+
+# Recent slow / over-budget / requested traces, for GET /debug/traces
+# when TRACE_DEBUG_ENDPOINT is set
+trace_log = TraceLog(TRACE_LOG_SIZE)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Connection pools (postgres backend) live for the whole process
+    open_repository()
+    yield
+    mom_jobs.mom_queue.shutdown()
+    analytics_service.gemini.shutdown()
+    close_repository()
+
 
 app = FastAPI(
     title="Business Card Analytics API",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -13,14 +46,33 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, SERVER_TIMING_HEADER, "ETag"],
 )
 
+if TRACING_ENABLED:
+    app.add_middleware(TracingMiddleware, log=trace_log, slow_seconds=TRACE_SLOW_MS / 1000,
+                       default_budget=ROUND_TRIP_BUDGET, budgets=ROUND_TRIP_BUDGETS)
+
+if METRICS_ENABLED:
+    setup_metrics()
+    app.add_middleware(MetricsMiddleware)
+
 app.include_router(analytics_router.router)
+app.include_router(export_router.router)
 
 @app.get("/health")
 def health():
     return {"status": "ok"}
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return Response(registry.render(), media_type=PROMETHEUS_MEDIA_TYPE)
+
+if TRACING_ENABLED and TRACE_DEBUG_ENDPOINT:
+    @app.get("/debug/traces", include_in_schema=False)
+    def debug_traces():
+        return {"traces": trace_log.recent()}
+
 @app.get("/")
 def root():
     return {"message": "Welcome to Business Card Analytics API. Visit /docs for API documentation."}
@@ -1,6 +1,6 @@
 import uuid
 from datetime import date, datetime
-from typing import Optional, List
+from typing import Dict, Optional, List
 from enum import Enum
 from pydantic import BaseModel, Field
 
@@ -83,6 +83,16 @@ class DashboardSummary(BaseModel):
     converted_leads: int
     funnel_breakdown: FunnelBreakdown
 
+class DashboardPage(BaseModel):
+    # Sections that were not requested stay null
+    summary: Optional[DashboardSummary] = None
+    funnel: Optional[FunnelBreakdown] = None
+    upcoming_meetings: Optional[List[UpcomingMeeting]] = None
+    completed_meetings: Optional[List[CompletedMeeting]] = None
+    completed_meetings_next_cursor: Optional[str] = None
+    drafted_emails: Optional[List[EmailDetail]] = None
+    drafted_emails_next_cursor: Optional[str] = None
+
 class IndustryStat(BaseModel):
     industry: Optional[str]
     count: int
@@ -99,10 +109,25 @@ class TeamUserSummary(BaseModel):
     meetings_completed: int
     overdue_followups: int
 
+class TeamMembers(BaseModel):
+    user_ids: List[uuid.UUID] = Field(..., min_length=1, max_length=1000)
+
 class MeetingMoMCreate(BaseModel):
     meeting_id: uuid.UUID
     mom_text: str = Field(..., min_length=10, description="Summary of the meeting conversation")
 
+class MoMBatchCreate(BaseModel):
+    items: List[MeetingMoMCreate] = Field(..., min_length=1, max_length=200)
+
+class MoMJobStatus(BaseModel):
+    job_id: uuid.UUID
+    status: str  # queued, running, succeeded, failed
+    attempts: int
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
 class DateRangePreset(str, Enum):
     TODAY = "TODAY"
     THIS_WEEK = "THIS_WEEK"
@@ -111,7 +136,57 @@ class DateRangePreset(str, Enum):
     THIS_YEAR = "THIS_YEAR"
     CUSTOM = "CUSTOM"
 
+class DashboardSection(str, Enum):
+    SUMMARY = "summary"
+    FUNNEL = "funnel"
+    UPCOMING = "upcoming"
+    COMPLETED = "completed"
+    DRAFTED = "drafted"
+
+class TrendBucket(str, Enum):
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+
+class TeamSortField(str, Enum):
+    CONTACTS_CAPTURED = "contacts_captured"
+    MEETINGS_COMPLETED = "meetings_completed"
+    OVERDUE_FOLLOWUPS = "overdue_followups"
+
+class ExportEntity(str, Enum):
+    CONTACTS = "contacts"
+    MEETINGS = "meetings"
+    EMAILS = "emails"
+
+class ExportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
 class DateRangeResponse(BaseModel):
     start_date: str
     end_date: str
     preset: DateRangePreset
+
+class TrendPoint(BaseModel):
+    period_start: date
+    period_end: date
+    contacts_captured: int
+    qualified_contacts: int
+    converted_contacts: int
+    positive_outcomes: int
+    conversion_rate: float
+    meetings_scheduled: int
+    meetings_completed: int
+    mom_coverage_percent: float
+    cancelled_count: int
+    no_show_count: int
+    emails_drafted: int
+    emails_sent: int
+    # Difference from the previous period for each metric above (None for the first)
+    change: Optional[Dict[str, float]] = None
+
+class TrendSeries(BaseModel):
+    bucket: TrendBucket
+    start_date: str
+    end_date: str
+    points: List[TrendPoint]
@@ -1,69 +1,202 @@
 import uuid
 from typing import List, Optional
-from fastapi import APIRouter, Query, HTTPException
+from fastapi import APIRouter, Query, HTTPException, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from models.dashboard_model import (
     DashboardSummary, IndustryStat, DailyScanStat,
     SearchResult, FunnelBreakdown, UpcomingMeeting, MeetingMoMCreate,
-    DateRangeResponse, DateRangePreset, CompletedMeeting, EmailDetail, Contact
+    DateRangeResponse, DateRangePreset, CompletedMeeting, EmailDetail, Contact, Email, Meeting, MoMBatchCreate, MoMJobStatus,
+    DashboardPage, DashboardSection, TeamMembers, TeamSortField, TeamUserSummary, TrendBucket, TrendSeries
 )
-from services import analytics_service
+from core.config import FAST_JSON_RESPONSES
+from services import analytics_service, mom_jobs
+from utils.fast_json import RowSerializer, json_response
+from utils.http_cache import revalidate
+from utils.pagination import NDJSON_MEDIA_TYPE, NEXT_CURSOR_HEADER
 
 router = APIRouter()
 
+# Large list responses skip per-row models: rows are serialized directly
+# (see utils/fast_json.py) while response_model keeps documenting them.
+contact_rows = RowSerializer(Contact)
+meeting_rows = RowSerializer(Meeting)
+email_rows = RowSerializer(Email)
+
+def _revalidate(request: Request, response: Response, owner: str) -> Optional[Response]:
+    """304 when the client's copy of `owner`'s data is current (see utils/http_cache.py)."""
+    return revalidate(request, response, analytics_service.data_versions, owner)
+
 @router.get("/api/v1/search", response_model=SearchResult)
 def search(
     user_id: uuid.UUID,
     query: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=100),
 ):
-    return analytics_service.search_global(query, user_id)
+    if not FAST_JSON_RESPONSES:
+        return analytics_service.search_global(query, user_id, limit)
+    results = analytics_service.search_global_rows(query, user_id, limit)
+    return json_response({
+        "contacts": contact_rows.rows(results["contacts"]),
+        "meetings": meeting_rows.rows(results["meetings"]),
+        "emails": email_rows.rows(results["emails"]),
+    })
 
 @router.get("/api/v1/analytics/funnel", response_model=FunnelBreakdown)
 def funnel_view(
+    request: Request,
+    response: Response,
     user_id: uuid.UUID,
     preset: DateRangePreset = Query(DateRangePreset.THIS_MONTH),
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
 ):
+    not_modified = _revalidate(request, response, str(user_id))
+    if not_modified:
+        return not_modified
     start, end = analytics_service.resolve_date_range_preset(preset, start_date, end_date)
     return analytics_service.get_funnel_view(user_id, start, end)
 
 @router.get("/api/v1/meetings/upcoming", response_model=List[UpcomingMeeting])
 def upcoming_meetings(
+    request: Request,
+    response: Response,
     user_id: uuid.UUID,
     limit: int = Query(5, ge=1, le=20),
 ):
+    not_modified = _revalidate(request, response, str(user_id))
+    if not_modified:
+        return not_modified
     return analytics_service.get_upcoming_meetings(user_id, limit)
 
 @router.get("/api/v1/dashboard/summary", response_model=DashboardSummary)
 def my_dashboard_summary(
+    request: Request,
+    response: Response,
     user_id: uuid.UUID,
     preset: DateRangePreset = Query(DateRangePreset.THIS_MONTH),
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
 ):
+    not_modified = _revalidate(request, response, str(user_id))
+    if not_modified:
+        return not_modified
     start, end = analytics_service.resolve_date_range_preset(preset, start_date, end_date)
     summary = analytics_service.get_dashboard_summary(user_id, start, end)
     if summary is None:
         raise HTTPException(status_code=404, detail="No contacts found")
     return summary
 
+@router.get("/api/v1/dashboard", response_model=DashboardPage)
+def dashboard(
+    request: Request,
+    response: Response,
+    user_id: uuid.UUID,
+    sections: List[DashboardSection] = Query(list(DashboardSection)),
+    preset: DateRangePreset = Query(DateRangePreset.THIS_MONTH),
+    start_date: Optional[str] = Query(None),
+    end_date: Optional[str] = Query(None),
+    upcoming_limit: int = Query(5, ge=1, le=20),
+    limit: int = Query(20, ge=1, le=100),
+):
+    # The whole dashboard page (or the `sections` asked for) in one request
+    not_modified = _revalidate(request, response, str(user_id))
+    if not_modified:
+        return not_modified
+    start, end = analytics_service.resolve_date_range_preset(preset, start_date, end_date)
+    return analytics_service.get_dashboard(user_id, sections, start, end, upcoming_limit, limit)
+
+@router.get("/api/v1/analytics/trends", response_model=TrendSeries)
+def trends(
+    request: Request,
+    response: Response,
+    user_id: uuid.UUID,
+    bucket: TrendBucket = Query(TrendBucket.WEEK),
+    preset: DateRangePreset = Query(DateRangePreset.THIS_MONTH),
+    start_date: Optional[str] = Query(None),
+    end_date: Optional[str] = Query(None),
+):
+    not_modified = _revalidate(request, response, str(user_id))
+    if not_modified:
+        return not_modified
+    start, end = analytics_service.resolve_date_range_preset(preset, start_date, end_date)
+    return analytics_service.get_trends(user_id, start, end, bucket)
+
+@router.post("/api/v1/team/summary", response_model=List[TeamUserSummary])
+def team_summary(
+    team: TeamMembers,
+    preset: DateRangePreset = Query(DateRangePreset.THIS_MONTH),
+    start_date: Optional[str] = Query(None),
+    end_date: Optional[str] = Query(None),
+    sort_by: TeamSortField = Query(TeamSortField.CONTACTS_CAPTURED),
+    descending: bool = Query(True),
+    top_n: Optional[int] = Query(None, ge=1, le=1000),
+):
+    # Members in the body: a large team's ids do not fit in a URL
+    start, end = analytics_service.resolve_date_range_preset(preset, start_date, end_date)
+    return analytics_service.get_team_summary(team.user_ids, start, end, sort_by, descending, top_n)
+
 @router.get("/api/v1/analytics/industry-distribution", response_model=List[IndustryStat])
 def industry_distribution(
+    request: Request,
+    response: Response,
     preset: DateRangePreset = Query(DateRangePreset.THIS_MONTH),
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
+    top_n: Optional[int] = Query(None, ge=1, le=100),
 ):
+    not_modified = _revalidate(request, response, analytics_service.SHARED)
+    if not_modified:
+        return not_modified
     start, end = analytics_service.resolve_date_range_preset(preset, start_date, end_date)
-    return analytics_service.get_industry_distribution(start, end)
+    return analytics_service.get_industry_distribution(start, end, top_n)
 
 @router.get("/api/v1/analytics/daily-scans", response_model=List[DailyScanStat])
-def daily_scans():
-    return analytics_service.get_daily_scans()
+def daily_scans(
+    request: Request,
+    response: Response,
+    preset: DateRangePreset = Query(DateRangePreset.THIS_MONTH),
+    start_date: Optional[str] = Query(None),
+    end_date: Optional[str] = Query(None),
+):
+    not_modified = _revalidate(request, response, analytics_service.SHARED)
+    if not_modified:
+        return not_modified
+    start, end = analytics_service.resolve_date_range_preset(preset, start_date, end_date)
+    return analytics_service.get_daily_scans(start, end)
     
 @router.post("/api/v1/meetings/mom")
-def add_meeting_mom(mom_data: MeetingMoMCreate, user_id: uuid.UUID):
-    return analytics_service.analyze_and_save_mom(mom_data, user_id)
+async def add_meeting_mom(
+    mom_data: MeetingMoMCreate,
+    user_id: uuid.UUID,
+    background: bool = Query(False, alias="async"),
+):
+    # `async=true` queues the analysis on the MoM job workers and answers
+    # 202 with a job to poll instead of waiting for Gemini.
+    if not background:
+        return await mom_jobs.analyze(mom_data, user_id)
+    return _accepted(mom_jobs.submit(mom_data, user_id), user_id)
+
+@router.post("/api/v1/meetings/mom/batch")
+async def add_meeting_mom_batch(
+    batch: MoMBatchCreate,
+    user_id: uuid.UUID,
+    background: bool = Query(False, alias="async"),
+):
+    if not background:
+        return await mom_jobs.analyze_batch(batch.items, user_id)
+    return _accepted(mom_jobs.submit_batch(batch.items, user_id), user_id)
+
+def _accepted(job, user_id: uuid.UUID) -> JSONResponse:
+    return JSONResponse(
+        mom_jobs.get_status(job.id, user_id).model_dump(mode="json"),
+        status_code=202,
+        headers={"Location": f"/api/v1/meetings/mom/jobs/{job.id}?user_id={user_id}"},
+    )
+
+@router.get("/api/v1/meetings/mom/jobs/{job_id}", response_model=MoMJobStatus)
+def mom_job_status(job_id: uuid.UUID, user_id: uuid.UUID):
+    return mom_jobs.get_status(job_id, user_id)
 
 @router.get("/api/v1/analytics/date-range", response_model=DateRangeResponse)
 def get_date_range(
@@ -73,20 +206,54 @@ def get_date_range(
 ):
     return analytics_service.get_date_range_for_preset(preset, custom_start, custom_end)
 
+def _paged(response: Response, page):
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    return page.items
+
+# List endpoints page with `cursor` (from the X-Next-Cursor response header).
+# `stream=true` instead returns every remaining row as NDJSON, fetched and
+# serialized in chunks so memory stays flat whatever the list size.
+
 @router.get("/api/v1/meetings/completed", response_model=List[CompletedMeeting])
 def completed_meetings(
+    response: Response,
     user_id: uuid.UUID,
     limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
+    stream: bool = Query(False),
 ):
-    return analytics_service.get_completed_meetings(user_id, limit)
+    if stream:
+        return StreamingResponse(analytics_service.stream_completed_meetings(user_id, cursor),
+                                 media_type=NDJSON_MEDIA_TYPE)
+    return _paged(response, analytics_service.get_completed_meetings(user_id, limit, cursor))
 
 @router.get("/api/v1/emails/drafted", response_model=List[EmailDetail])
 def drafted_emails(
+    response: Response,
     user_id: uuid.UUID,
     limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
+    stream: bool = Query(False),
 ):
-    return analytics_service.get_drafted_emails(user_id, limit)
+    if stream:
+        return StreamingResponse(analytics_service.stream_drafted_emails(user_id, cursor),
+                                 media_type=NDJSON_MEDIA_TYPE)
+    return _paged(response, analytics_service.get_drafted_emails(user_id, limit, cursor))
 
 @router.get("/api/v1/contacts", response_model=List[Contact])
-def get_contacts(user_id: uuid.UUID):
-    return analytics_service.get_contacts_list(user_id)
+def get_contacts(
+    response: Response,
+    user_id: uuid.UUID,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = Query(None),
+    stream: bool = Query(False),
+):
+    if stream:
+        return StreamingResponse(analytics_service.stream_contacts(user_id, cursor),
+                                 media_type=NDJSON_MEDIA_TYPE)
+    if not FAST_JSON_RESPONSES:
+        return _paged(response, analytics_service.get_contacts_list(user_id, limit, cursor))
+    page = analytics_service.get_contact_rows(user_id, limit, cursor)
+    return json_response(contact_rows.rows(page.items),
+                         {NEXT_CURSOR_HEADER: page.next_cursor} if page.next_cursor else None)
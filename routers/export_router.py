@@ -0,0 +1,27 @@
+import uuid
+from typing import Optional
+
+from fastapi import APIRouter, Query
+from fastapi.responses import StreamingResponse
+
+from models.dashboard_model import ExportEntity, ExportFormat
+from services import export_service
+
+router = APIRouter()
+
+@router.get("/api/v1/export/{entity}")
+def export(
+    entity: ExportEntity,
+    user_id: uuid.UUID,
+    fmt: ExportFormat = Query(ExportFormat.CSV, alias="format"),
+    start_date: Optional[str] = Query(None),
+    end_date: Optional[str] = Query(None),
+    compress: bool = Query(False, alias="gzip"),
+):
+    # Streamed chunk by chunk: constant memory, and the worker thread is
+    # only held while a chunk is fetched and encoded.
+    chunks = export_service.export(user_id, entity, fmt, start_date, end_date, compress)
+    headers = {"Content-Disposition": f'attachment; filename="{entity.value}.{fmt.value}"'}
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(chunks, media_type=export_service.MEDIA_TYPES[fmt], headers=headers)
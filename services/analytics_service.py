@@ -1,20 +1,48 @@
 import uuid
 import random
 import json
-import google.generativeai as genai
-from core.config import GEMINI_API_KEY
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from core.config import (
+    ETAG_WINDOW_SECONDS, GEMINI_API_KEY, LLM_BREAKER_FAILURES, LLM_BREAKER_RESET_SECONDS, LLM_BURST, LLM_MAX_CONCURRENCY,
+    LLM_RATE_PER_SECOND, LLM_TIMEOUT_SECONDS, MOM_BATCH_CONCURRENCY, MOM_BATCH_PACK_SIZE, MOM_CACHE_MAX_AGE_SECONDS,
+    MOM_CACHE_MAX_ENTRIES, MOM_CACHE_PATH, STREAM_CHUNK_SIZE, TREND_CHUNK_SIZE, TREND_MAX_BUCKETS,
+)
 from datetime import date, datetime, timezone
-from typing import Optional, List, Dict
+from typing import Callable, Iterator, Optional, List, Dict
 from fastapi import HTTPException
-
-from db.supabase_client import supabase
+from pydantic import BaseModel
+
+from db.repository import KEYSET_COLUMNS, Cursor, get_repository
+from utils.cache import analytics_cache, day_buckets, industry_day_cache, scan_day_cache
+from utils.columnar import epoch_us
+from utils.fanout import fan_out
+from utils.http_cache import DataVersions
+from utils.llm_gateway import CircuitBreaker, GeminiProvider, LLMGateway
+from utils.pagination import Page, decode_cursor, fetch_page, iter_pages, ndjson
+from utils.result_store import ResultStore, content_key
+from utils.singleflight import SingleFlight
+from services import contact_search
+from services.metrics_engine import build_funnel, compute_bucketed_metrics, compute_metrics
 from models.dashboard_model import (
     DashboardSummary, FunnelBreakdown, IndustryStat, DailyScanStat,
     SearchResult, Contact, Meeting, Email, UpcomingMeeting, MeetingMoMCreate,
-    DateRangePreset, DateRangeResponse, CompletedMeeting, EmailDetail
+    DateRangePreset, DateRangeResponse, CompletedMeeting, EmailDetail, DashboardPage, DashboardSection,
+    TeamSortField, TeamUserSummary, TrendBucket, TrendPoint, TrendSeries
 )
 
+logger = logging.getLogger(__name__)
+
 UTC = timezone.utc
+OTHER_INDUSTRY = "Other"
+
+# Results not owned by a user (industry, scans) are computed once for all
+# concurrent callers; per-user results coalesce in analytics_cache.
+shared_flights = SingleFlight()
+
+# ETag versions: per user id, and SHARED for the data of all users
+data_versions = DataVersions(ETAG_WINDOW_SECONDS)
+SHARED = "*"
 
 from datetime import timedelta
 
@@ -61,215 +89,170 @@ def date_range(start: Optional[str], end: Optional[str]):
         return start, end
     return resolve_date_range_preset(DateRangePreset.THIS_MONTH)
 
-def search_global(query: str, user_id: uuid.UUID) -> SearchResult:
+def is_day(value: Optional[str]) -> bool:
+    # A bare YYYY-MM-DD bound (what the presets produce)
+    if not value or len(value) != 10:
+        return False
     try:
-        # Search Contacts
-        contacts_res = supabase.table("contacts") \
-            .select("*") \
-            .eq("user_id", str(user_id)) \
-            .or_(f"first_name.ilike.%{query}%,last_name.ilike.%{query}%,email.ilike.%{query}%") \
-            .execute()
-        
-        contacts = [Contact(**c) for c in contacts_res.data]
-    except Exception as e:
-        # Log error but don't fail entire search
-        print(f"Error searching contacts: {e}")
-        contacts = []
+        date.fromisoformat(value)
+    except ValueError:
+        return False
+    return True
+
+def end_of_day(value: str) -> str:
+    # A bare-date end bound covers that whole day, not just its first instant
+    return f"{value}T23:59:59.999999+00:00" if is_day(value) else value
+
+def _histogram_calls(repo, user_id: str, start: str, end: str, cutoff_day: Optional[str] = None) -> Dict[str, Callable]:
+    """
+    Contact, meeting and email histogram queries for [start, end]. With a
+    `cutoff_day`, contacts are counted over all time and split into cohorts
+    at the start of that day instead. Whole-day ranges are summed from the
+    daily rollups when the backend keeps them.
+    """
+    contacts_from, contacts_to = (None, None) if cutoff_day else (start, end)
+    if repo.daily_rollups and is_day(start) and is_day(end):
+        return {
+            "contacts": lambda: repo.rollup_histogram(user_id, "contacts", contacts_from, contacts_to, cutoff_day),
+            "meetings": lambda: repo.rollup_histogram(user_id, "meetings", start, end),
+            "emails": lambda: repo.rollup_histogram(user_id, "emails", start, end),
+        }
+    cutoff = f"{cutoff_day}T00:00:00+00:00" if cutoff_day else None
+    contacts_to = contacts_to and end_of_day(contacts_to)
+    end = end_of_day(end)
+    return {
+        "contacts": lambda: repo.contact_outcome_histogram(user_id, contacts_from, contacts_to, cutoff),
+        "meetings": lambda: repo.meeting_status_histogram(user_id, scheduled_from=start, scheduled_to=end),
+        "emails": lambda: repo.email_status_histogram(user_id, drafted_from=start, drafted_to=end),
+    }
+
+def search_global(query: str, user_id: uuid.UUID, limit: int = 20) -> SearchResult:
+    results = search_global_rows(query, user_id, limit)
+    return SearchResult(
+        contacts=[Contact(**c) for c in results["contacts"]],
+        meetings=[Meeting(**m) for m in results["meetings"]],
+        emails=[Email(**e) for e in results["emails"]],
+    )
+
+def search_global_rows(query: str, user_id: uuid.UUID, limit: int = 20) -> Dict[str, List[dict]]:
+    """`search_global` as raw rows, for the fast JSON path."""
+    repo = get_repository()
+
+    # Contacts and emails are searched concurrently. A failing side is
+    # logged and yields no results rather than failing the entire search.
+    # Contacts come ranked from the in-memory index (name, email, company).
+    # Note: emails are matched on 'status' only.
+    results = fan_out({
+        "contacts": lambda: contact_search.search_contacts(str(user_id), query, limit),
+        "emails": lambda: repo.search_emails(str(user_id), query),
+    }, defaults={"contacts": [], "emails": []})
 
     # Search Meetings
     # Note: 'status' is likely an ENUM, so ilike fails. We skip meeting search by status for now.
     meetings = []
 
-    # Search Emails
-    try:
-        emails_res = supabase.table("emails") \
-            .select("*") \
-            .eq("user_id", str(user_id)) \
-            .ilike("status", f"%{query}%") \
-            .execute()
-        emails = [Email(**e) for e in emails_res.data]
-    except Exception as e:
-        print(f"Error searching emails: {e}")
-        emails = []
-
-    return SearchResult(contacts=contacts, meetings=meetings, emails=emails)
+    return {"contacts": results["contacts"], "meetings": meetings, "emails": results["emails"]}
 
 def get_funnel_view(user_id: uuid.UUID, start_date: Optional[str], end_date: Optional[str]) -> FunnelBreakdown:
+    start, end = date_range(start_date, end_date)
+    return analytics_cache.get_or_compute((str(user_id), "funnel", start, end),
+                                          lambda: _compute_funnel_view(user_id, start, end))
+
+def _compute_funnel_view(user_id: uuid.UUID, start: str, end: str) -> FunnelBreakdown:
     try:
-        start, end = date_range(start_date, end_date)
-        
-        # We need contacts with outcome to calculate positive outcomes
-        contacts_res = supabase.table("contacts") \
-            .select("contact_id, last_outcome_status") \
-            .eq("user_id", str(user_id)) \
-            .gte("created_at", start) \
-            .lte("created_at", end) \
-            .execute()
-            
-        contacts_count = len(contacts_res.data)
-
-        meetings = supabase.table("meetings") \
-            .select("status") \
-            .eq("user_id", str(user_id)) \
-            .gte("scheduled_at", start) \
-            .lte("scheduled_at", end) \
-            .execute()
-
-        emails = supabase.table("emails") \
-            .select("status") \
-            .eq("user_id", str(user_id)) \
-            .gte("drafted_at", start) \
-            .lte("drafted_at", end) \
-            .execute()
-
-        completed = [m for m in meetings.data if m["status"] == "COMPLETED"]
+        repo = get_repository()
         
-        return FunnelBreakdown(
-            contacts_captured=contacts_count,
-            meetings_scheduled=len(meetings.data),
-            meetings_completed=len(completed),
-            emails_drafted=len([e for e in emails.data if e["status"] == "DRAFTED"]),
-            emails_sent=len([e for e in emails.data if e["status"] == "SENT"]),
-            positive_outcomes=len([c for c in contacts_res.data if c.get("last_outcome_status") in ("HOT", "WON")])
-        )
+        # Grouped counts: outcome histogram for contacts, status histograms for the rest.
+        # The three queries are independent and run concurrently.
+        results = fan_out(_histogram_calls(repo, str(user_id), start, end),
+                          defaults={"meetings": [], "emails": []})
+        return _funnel_from(results)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error in funnel view: {str(e)}")
 
+def _funnel_from(results: Dict[str, list]) -> FunnelBreakdown:
+    return build_funnel(compute_metrics(results["contacts"], results["meetings"], results["emails"]))
+
 def get_upcoming_meetings(user_id: uuid.UUID, limit: int = 5) -> List[UpcomingMeeting]:
+    return analytics_cache.get_or_compute((str(user_id), "upcoming", limit),
+                                          lambda: _compute_upcoming_meetings(user_id, limit))
+
+def _compute_upcoming_meetings(user_id: uuid.UUID, limit: int) -> List[UpcomingMeeting]:
     now = datetime.now(UTC).isoformat()
     
-    # We need contact name, so we might need a join or two queries.
-    # Supabase-py supports joins if foreign keys exist: .select("*, contacts(first_name, last_name)")
-    # If join fails, we fallback to simple query
-    try:
-        meetings = supabase.table("meetings") \
-            .select("meeting_id, scheduled_at, status, mom_exists, contacts(first_name, last_name)") \
-            .eq("user_id", str(user_id)) \
-            .gte("scheduled_at", now) \
-            .order("scheduled_at") \
-            .limit(limit) \
-            .execute()
-    except Exception:
-        # Fallback without join if it fails
-        meetings = supabase.table("meetings") \
-            .select("meeting_id, scheduled_at, status, mom_exists") \
-            .eq("user_id", str(user_id)) \
-            .gte("scheduled_at", now) \
-            .order("scheduled_at") \
-            .limit(limit) \
-            .execute()
-    
-    result = []
-    for m in meetings.data:
-        contact = m.get("contacts") or {}
-        if isinstance(contact, list): # Sometimes returns list if multiple matches (shouldn't happen with FK)
-            contact = contact[0] if contact else {}
-            
-        name = f"{contact.get('first_name', '')} {contact.get('last_name', '')}".strip()
-        result.append(UpcomingMeeting(
-            meeting_id=m["meeting_id"],
-            contact_name=name or "Unknown",
-            scheduled_at=m["scheduled_at"],
-            status=m["status"],
-            mom_exists=m["mom_exists"]
-        ))
-    return result
+    # We need contact name; the repository embeds it when the join is available
+    meetings = get_repository().list_upcoming_meetings(str(user_id), now, limit)
+    return [_upcoming_meeting(m) for m in meetings]
+
+def _upcoming_meeting(m: dict) -> UpcomingMeeting:
+    contact = m.get("contacts") or {}
+    if isinstance(contact, list): # Sometimes returns list if multiple matches (shouldn't happen with FK)
+        contact = contact[0] if contact else {}
+
+    name = f"{contact.get('first_name', '')} {contact.get('last_name', '')}".strip()
+    return UpcomingMeeting(
+        meeting_id=m["meeting_id"],
+        contact_name=name or "Unknown",
+        scheduled_at=m["scheduled_at"],
+        status=m["status"],
+        mom_exists=m["mom_exists"]
+    )
 
 def get_dashboard_summary(user_id: uuid.UUID, start_date: Optional[str], end_date: Optional[str]) -> DashboardSummary:
     start, end = date_range(start_date, end_date)
+    return analytics_cache.get_or_compute((str(user_id), "summary", start, end),
+                                          lambda: _compute_dashboard_summary(user_id, start, end))
 
-    # Contacts owned by user (Global for Leads calculation)
-    contacts = supabase.table("contacts") \
-        .select("contact_id, last_outcome_status, outcome, created_at", count="exact") \
-        .eq("user_id", str(user_id)) \
-        .execute()
-
-    contact_ids = [c["contact_id"] for c in contacts.data]
+def _compute_dashboard_summary(user_id: uuid.UUID, start: str, end: str) -> DashboardSummary:
+    repo = get_repository()
 
-    if not contact_ids:
+    # MoM Calculation (Cohort based: Leads created before this month)
+    # Using 30 days as approximation for "Last Month" comparison vs "Now",
+    # cut at the start of that day so daily rollups can answer it too
+    now = datetime.now(UTC)
+    cutoff_day = (now - timedelta(days=30)).date().isoformat()
+
+    # The four queries are independent: issue them concurrently. Contacts are
+    # required; a failed meetings/emails/followups query degrades to empty.
+    # Contacts owned by user (Global for Leads calculation), grouped by outcome and cohort
+    calls = _histogram_calls(repo, str(user_id), start, end, cutoff_day=cutoff_day)
+    calls["followups"] = lambda: repo.count_overdue_contacts(str(user_id), now.isoformat())
+    results = fan_out(calls, defaults={"meetings": [], "emails": [], "followups": 0})
+    return _summary_from(results["contacts"], results)
+
+def _summary_from(cohorts: list, results: Dict[str, list]) -> Optional[DashboardSummary]:
+    overdue_followups = results["followups"]
+
+    # One vectorized pass over the grouped counts yields every field below
+    metrics = compute_metrics(cohorts, results["meetings"], results["emails"])
+    total_leads = metrics["contacts"]
+
+    if not total_leads:
         # Return empty summary instead of None to avoid 404 in router if preferred, 
         # but router handles None -> 404.
         return None
 
-    # Meetings
-    meetings = supabase.table("meetings") \
-        .select("status, mom_exists") \
-        .eq("user_id", str(user_id)) \
-        .gte("scheduled_at", start) \
-        .lte("scheduled_at", end) \
-        .execute()
-
-    # Emails
-    emails = supabase.table("emails") \
-        .select("status") \
-        .eq("user_id", str(user_id)) \
-        .gte("drafted_at", start) \
-        .lte("drafted_at", end) \
-        .execute()
-
-    # Followups
-    followups = supabase.table("contacts") \
-        .select("contact_id") \
-        .eq("user_id", str(user_id)) \
-        .lt("next_follow_up_due_at", datetime.now(UTC).isoformat()) \
-        .not_.is_("next_follow_up_due_at", "null") \
-        .execute()
-
-    completed = [m for m in meetings.data if m["status"] == "COMPLETED"]
-    mom_done = [m for m in completed if m["mom_exists"]]
-
-    drafted_emails = [e for e in emails.data if e["status"] == "DRAFTED"]
-    sent_emails = [e for e in emails.data if e["status"] == "SENT"]
+    completed = metrics["meetings_completed"]
 
     # Conversion Rate Calculations
-    total_leads = len(contacts.data)
-    
-    # Normalize outcomes to lowercase for comparison
-    def get_outcome(c):
-        o = c.get("outcome") or c.get("last_outcome_status") or ""
-        return o.lower()
-
-    qualified_leads = len([c for c in contacts.data if get_outcome(c) in ("warm", "hot")])
-    converted_leads = len([c for c in contacts.data if get_outcome(c) == "hot"])
+    qualified_leads = metrics["qualified"]
+    converted_leads = metrics["converted"]
 
     conversion_rate = (converted_leads / total_leads * 100) if total_leads > 0 else 0
 
-    # MoM Calculation (Cohort based: Leads created before this month)
-    # Using 30 days as approximation for "Last Month" comparison vs "Now"
-    cutoff_date = datetime.now(UTC) - timedelta(days=30)
-    
-    prev_contacts = []
-    for c in contacts.data:
-        created_at_str = c.get("created_at")
-        if not created_at_str:
-            continue
-            
-        try:
-            # Handle both Z and standard ISO formats
-            dt = datetime.fromisoformat(created_at_str.replace('Z', '+00:00'))
-            
-            # Ensure it is timezone-aware to match cutoff_date (UTC)
-            if dt.tzinfo is None:
-                dt = dt.replace(tzinfo=UTC)
-                
-            if dt < cutoff_date:
-                prev_contacts.append(c)
-        except (ValueError, TypeError):
-             continue
-
-    prev_total = len(prev_contacts)
-    prev_converted = len([c for c in prev_contacts if get_outcome(c) == "hot"])
+    prev_total = metrics["prev_contacts"]
+    prev_converted = metrics["prev_converted"]
     
     prev_rate = (prev_converted / prev_total * 100) if prev_total > 0 else 0
     mom_change = round(conversion_rate - prev_rate)
 
     return DashboardSummary(
-        contacts_touched=len(set(contact_ids)),
-        emails_drafted=len(drafted_emails),
-        mom_coverage_percent=round(len(mom_done) / len(completed) * 100, 2) if completed else 0,
-        overdue_followups_count=len(followups.data),
-        cancelled_count=len([m for m in meetings.data if m["status"] == "CANCELLED"]),
-        no_show_count=len([m for m in meetings.data if m["status"] == "NO_SHOW"]),
+        contacts_touched=total_leads,
+        emails_drafted=metrics["emails_drafted"],
+        mom_coverage_percent=round(metrics["mom_done"] / completed * 100, 2) if completed else 0,
+        overdue_followups_count=overdue_followups,
+        cancelled_count=metrics["cancelled"],
+        no_show_count=metrics["no_show"],
         
         conversion_rate=round(conversion_rate),
         conversion_rate_change=mom_change,
@@ -277,35 +260,287 @@ def get_dashboard_summary(user_id: uuid.UUID, start_date: Optional[str], end_dat
         qualified_leads=qualified_leads,
         converted_leads=converted_leads,
         
-        funnel_breakdown=FunnelBreakdown(
-            contacts_captured=total_leads,
-            meetings_scheduled=len(meetings.data),
-            meetings_completed=len(completed),
-            emails_drafted=len(drafted_emails),
-            emails_sent=len(sent_emails),
-            qualified_contacts=qualified_leads,
-            positive_outcomes=converted_leads,
-        )
+        funnel_breakdown=build_funnel(metrics, positive="converted")
     )
 
-def get_industry_distribution(start_date: Optional[str], end_date: Optional[str]) -> List[IndustryStat]:
+# Backend queries behind each section of the composite dashboard. Sections
+# naming the same query share one call: summary and funnel read the same
+# meeting and email histograms.
+DASHBOARD_QUERIES = {
+    DashboardSection.SUMMARY: ("cohorts", "meetings", "emails", "followups"),
+    DashboardSection.FUNNEL: ("contacts", "meetings", "emails"),
+    DashboardSection.UPCOMING: ("upcoming",),
+    DashboardSection.COMPLETED: ("completed",),
+    DashboardSection.DRAFTED: ("drafted",),
+}
+# Optional queries degrade as on the single-section endpoints
+DASHBOARD_DEFAULTS = {"meetings": [], "emails": [], "followups": 0,
+                      "completed": Page([], None), "drafted": Page([], None)}
+
+def get_dashboard(user_id: uuid.UUID, sections: List[DashboardSection], start_date: Optional[str],
+                  end_date: Optional[str], upcoming_limit: int = 5, limit: int = 20) -> DashboardPage:
+    """
+    Several dashboard sections from one plan: the union of the queries they
+    need, each issued once and all concurrently. Summary, funnel and upcoming
+    meetings go through analytics_cache like their own endpoints, so cached
+    sections cost no query at all. Lists are first pages; their cursors
+    continue on the list endpoints.
+    """
     start, end = date_range(start_date, end_date)
+    owner = str(user_id)
+    cache_keys = {
+        DashboardSection.SUMMARY: (owner, "summary", start, end),
+        DashboardSection.FUNNEL: (owner, "funnel", start, end),
+        DashboardSection.UPCOMING: (owner, "upcoming", upcoming_limit),
+    }
+    values = {}
+    if analytics_cache.enabled:
+        for section in set(sections) & set(cache_keys):
+            found, value = analytics_cache.get(cache_keys[section])
+            if found:
+                values[section] = value
+
+    missing = [s for s in dict.fromkeys(sections) if s not in values]
+    needed = {name for s in missing for name in DASHBOARD_QUERIES[s]}
+    generation = analytics_cache.generation(owner)
+    calls = _dashboard_calls(get_repository(), owner, start, end, upcoming_limit, limit)
+    results = fan_out({name: calls[name] for name in needed},
+                      defaults={k: v for k, v in DASHBOARD_DEFAULTS.items() if k in needed})
+
+    build = {
+        DashboardSection.SUMMARY: lambda: _summary_from(results["cohorts"], results),
+        DashboardSection.FUNNEL: lambda: _funnel_from(results),
+        DashboardSection.UPCOMING: lambda: [_upcoming_meeting(m) for m in results["upcoming"]],
+        DashboardSection.COMPLETED: lambda: results["completed"]._replace(
+            items=[_completed_meeting(m) for m in results["completed"].items]),
+        DashboardSection.DRAFTED: lambda: results["drafted"]._replace(
+            items=[_email_detail(e) for e in results["drafted"].items]),
+    }
+    for section in missing:
+        values[section] = build[section]()
+        if section in cache_keys and analytics_cache.enabled:
+            analytics_cache.set(cache_keys[section], values[section], generation)
+
+    page = DashboardPage(
+        summary=values.get(DashboardSection.SUMMARY),
+        funnel=values.get(DashboardSection.FUNNEL),
+        upcoming_meetings=values.get(DashboardSection.UPCOMING),
+    )
+    if DashboardSection.COMPLETED in values:
+        page.completed_meetings, page.completed_meetings_next_cursor = values[DashboardSection.COMPLETED]
+    if DashboardSection.DRAFTED in values:
+        page.drafted_emails, page.drafted_emails_next_cursor = values[DashboardSection.DRAFTED]
+    return page
+
+def _dashboard_calls(repo, user_id: str, start: str, end: str, upcoming_limit: int,
+                     limit: int) -> Dict[str, Callable]:
+    # One clock for every section, as if their endpoints were called at once
+    now = datetime.now(UTC)
+    cohorts = _histogram_calls(repo, user_id, start, end, cutoff_day=(now - timedelta(days=30)).date().isoformat())
+    ranged = _histogram_calls(repo, user_id, start, end)
+    return {
+        "cohorts": cohorts["contacts"],
+        "contacts": ranged["contacts"],
+        "meetings": ranged["meetings"],
+        "emails": ranged["emails"],
+        "followups": lambda: repo.count_overdue_contacts(user_id, now.isoformat()),
+        "upcoming": lambda: repo.list_upcoming_meetings(user_id, now.isoformat(), upcoming_limit),
+        "completed": lambda: fetch_page(lambda n, after: repo.list_completed_meetings(user_id, n, after),
+                                        limit, None, "scheduled_at", "meeting_id"),
+        "drafted": lambda: fetch_page(lambda n, after: repo.list_recent_emails(user_id, n, after),
+                                      limit, None, "drafted_at", "email_id"),
+    }
 
-    rows = supabase.table("customer_scanned_data") \
-        .select("industry") \
-        .gte("created_at", start) \
-        .lte("created_at", end) \
-        .execute()
+def _rows_in_range(repo, table: str, user_id: str, start: str, end: str, columns: str) -> List[dict]:
+    # Keyset pages of TREND_CHUNK_SIZE: one unpaged read is capped at the backend's max rows
+    column, key = KEYSET_COLUMNS[table]
+    pages = iter_pages(lambda limit, after: repo.list_page(table, user_id, limit, after, start, end,
+                                                           f"{key}, {column}, {columns}"),
+                       TREND_CHUNK_SIZE, None, column, key)
+    return [r for page in pages for r in page]
 
-    stats: Dict[str, int] = {}
-    for r in rows.data:
-        stats[r["industry"]] = stats.get(r["industry"], 0) + 1
+# TrendPoint fields that get a period-over-period change
+TREND_METRICS = tuple(f for f in TrendPoint.model_fields if f not in ("period_start", "period_end", "change"))
 
-    return [IndustryStat(industry=k, count=v) for k, v in stats.items()]
+def get_trends(user_id: uuid.UUID, start_date: Optional[str], end_date: Optional[str],
+               bucket: TrendBucket = TrendBucket.WEEK) -> TrendSeries:
+    start, end = date_range(start_date, end_date)
+    return analytics_cache.get_or_compute((str(user_id), "trends", start, end, TrendBucket(bucket)),
+                                          lambda: _compute_trends(user_id, start, end, TrendBucket(bucket)))
 
-def get_daily_scans() -> List[DailyScanStat]:
-    result = supabase.rpc("daily_scan_counts").execute()
-    return result.data
+def _compute_trends(user_id: uuid.UUID, start: str, end: str, bucket: TrendBucket) -> TrendSeries:
+    """
+    Summary and funnel metrics per UTC day, week (from Monday) or month over
+    [start, end], with each period's change from the one before. Every
+    contact, meeting and email in range is read once (keyset pages, the
+    three tables concurrently) and bucketed by its timestamp in one pass,
+    so the number of queries follows the rows, not the periods. Contacts
+    count in the period they were created in.
+    """
+    try:
+        first, last = date.fromisoformat(start[:10]), date.fromisoformat(end[:10])
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Trend ranges must start and end with a YYYY-MM-DD date")
+    periods = period_starts(first, last, bucket)
+    if len(periods) > TREND_MAX_BUCKETS:
+        raise HTTPException(status_code=400,
+                            detail=f"{len(periods)} {bucket.value} periods requested; at most {TREND_MAX_BUCKETS}")
+
+    repo = get_repository()
+    uid, start, end = str(user_id), first.isoformat(), end_of_day(last.isoformat())
+    rows = fan_out({
+        "contacts": lambda: _rows_in_range(repo, "contacts", uid, start, end, "outcome, last_outcome_status"),
+        "meetings": lambda: _rows_in_range(repo, "meetings", uid, start, end, "status, mom_exists"),
+        "emails": lambda: _rows_in_range(repo, "emails", uid, start, end, "status"),
+    })
+    # Bucket edges in epoch microseconds: each period's start, then the day after `last`
+    bounds = periods + [last + timedelta(days=1)]
+    edges = epoch_us([d.isoformat() for d in bounds])
+    metrics = compute_bucketed_metrics(rows["contacts"], rows["meetings"], rows["emails"], edges)
+
+    points = []
+    for i, m in enumerate(metrics):
+        point = TrendPoint(
+            period_start=periods[i],
+            period_end=bounds[i + 1] - timedelta(days=1),
+            contacts_captured=m["contacts"],
+            qualified_contacts=m["qualified"],
+            converted_contacts=m["converted"],
+            positive_outcomes=m["positive"],
+            conversion_rate=round(m["converted"] / m["contacts"] * 100, 2) if m["contacts"] else 0,
+            meetings_scheduled=m["meetings"],
+            meetings_completed=m["meetings_completed"],
+            mom_coverage_percent=round(m["mom_done"] / m["meetings_completed"] * 100, 2) if m["meetings_completed"] else 0,
+            cancelled_count=m["cancelled"],
+            no_show_count=m["no_show"],
+            emails_drafted=m["emails_drafted"],
+            emails_sent=m["emails_sent"],
+        )
+        if points:
+            previous = points[-1]
+            point.change = {f: round(getattr(point, f) - getattr(previous, f), 2) for f in TREND_METRICS}
+        points.append(point)
+    return TrendSeries(bucket=bucket, start_date=first.isoformat(), end_date=last.isoformat(), points=points)
+
+def period_starts(first: date, last: date, bucket: TrendBucket) -> List[date]:
+    """Start of every period overlapping [first, last]; the first is clipped to `first`."""
+    if bucket == TrendBucket.DAY:
+        return [first + timedelta(days=i) for i in range((last - first).days + 1)]
+    if bucket == TrendBucket.WEEK:
+        current = first - timedelta(days=first.weekday())
+        step = lambda d: d + timedelta(days=7)
+    else:
+        current = first.replace(day=1)
+        step = lambda d: (d.replace(day=28) + timedelta(days=4)).replace(day=1)
+    starts = []
+    while current <= last:
+        starts.append(max(current, first))
+        current = step(current)
+    return starts
+
+def get_team_summary(user_ids: List[uuid.UUID], start_date: Optional[str], end_date: Optional[str],
+                     sort_by: TeamSortField = TeamSortField.CONTACTS_CAPTURED, descending: bool = True,
+                     top_n: Optional[int] = None) -> List[TeamUserSummary]:
+    """
+    Leaderboard of a team: contacts captured and meetings completed in the
+    range, and overdue follow-ups now, per member. Two grouped queries over
+    all members, run concurrently, whatever the team size. Ties keep the
+    order of `user_ids`.
+    """
+    start, end = date_range(start_date, end_date)
+    members = [str(u) for u in dict.fromkeys(user_ids)]
+    repo = get_repository()
+    now = datetime.now(UTC).isoformat()
+    results = fan_out({
+        "contacts": lambda: repo.team_contact_counts(members, start, end_of_day(end), now),
+        "meetings": lambda: repo.team_meeting_counts(members, start, end_of_day(end)),
+    })
+    contacts = {str(r["user_id"]): r for r in results["contacts"]}
+    completed = {str(r["user_id"]): r["completed"] for r in results["meetings"]}
+
+    team = [TeamUserSummary(
+        user_id=uuid.UUID(member),
+        # No user directory in this schema: names come from the caller's own user store
+        full_name=None,
+        email=None,
+        contacts_captured=contacts.get(member, {}).get("contacts") or 0,
+        meetings_completed=completed.get(member) or 0,
+        overdue_followups=contacts.get(member, {}).get("overdue") or 0,
+    ) for member in members]
+    field = TeamSortField(sort_by).value
+    team.sort(key=lambda s: getattr(s, field), reverse=descending)
+    return team[:top_n] if top_n is not None else team
+
+def get_industry_distribution(start_date: Optional[str], end_date: Optional[str],
+                              top_n: Optional[int] = None) -> List[IndustryStat]:
+    start, end = date_range(start_date, end_date)
+    return shared_flights.do(("industry", start, end, top_n),
+                             lambda: _compute_industry_distribution(start, end, top_n))
+
+def _compute_industry_distribution(start: str, end: str, top_n: Optional[int]) -> List[IndustryStat]:
+    if is_day(start) and is_day(end):
+        counts = _industry_counts_by_day(date.fromisoformat(start), date.fromisoformat(end))
+    else:
+        counts = {}
+        for r in get_repository().industry_histogram(start, end_of_day(end)):
+            counts[r["industry"]] = counts.get(r["industry"], 0) + r["count"]
+
+    return top_industries(counts, top_n)
+
+def _industry_counts_by_day(first: date, last: date) -> Dict[Optional[str], int]:
+    # Closed days come from the day-bucket cache; the rest in one grouped query
+    def fetch(first_missing: date, last_missing: date) -> Dict[date, Dict[Optional[str], int]]:
+        buckets: Dict[date, Dict[Optional[str], int]] = {}
+        for r in get_repository().industry_daily_histogram(first_missing.isoformat(), last_missing.isoformat()):
+            bucket = buckets.setdefault(date.fromisoformat(r["day"]), {})
+            bucket[r["industry"]] = bucket.get(r["industry"], 0) + r["count"]
+        return buckets
+
+    totals: Dict[Optional[str], int] = {}
+    today = datetime.now(UTC).date()
+    for bucket in day_buckets(industry_day_cache, "industry", first, last, today, fetch, dict).values():
+        for industry, n in bucket.items():
+            totals[industry] = totals.get(industry, 0) + n
+    return totals
+
+def top_industries(counts: Dict[Optional[str], int], top_n: Optional[int] = None) -> List[IndustryStat]:
+    # Largest first; with top_n, the tail is folded into a single "Other" bucket
+    ranked = sorted(counts.items(), key=lambda kv: (-kv[1], kv[0] is None, kv[0] or ""))
+    stats = [IndustryStat(industry=industry, count=n) for industry, n in ranked]
+    if top_n is not None and len(stats) > top_n:
+        other = sum(s.count for s in stats[top_n:])
+        stats = stats[:top_n] + [IndustryStat(industry=OTHER_INDUSTRY, count=other)]
+    return stats
+
+def get_daily_scans(start_date: Optional[str] = None, end_date: Optional[str] = None) -> List[DailyScanStat]:
+    start, end = date_range(start_date, end_date)
+    return shared_flights.do(("scans", start, end), lambda: _compute_daily_scans(start, end))
+
+def _compute_daily_scans(start: str, end: str) -> List[DailyScanStat]:
+    repo = get_repository()
+
+    if not (is_day(start) and is_day(end)):
+        return [DailyScanStat(**r) for r in repo.daily_scan_counts(start, end_of_day(end))]
+
+    # Closed days are immutable: only days missing from the cache (at least today) are counted
+    def fetch(first_missing: date, last_missing: date) -> Dict[date, int]:
+        rows = repo.daily_scan_counts(first_missing.isoformat(), end_of_day(last_missing.isoformat()))
+        return {date.fromisoformat(str(r["date"])[:10]): r["count"] for r in rows}
+
+    today = datetime.now(UTC).date()
+    counts = day_buckets(scan_day_cache, "scans", date.fromisoformat(start), date.fromisoformat(end),
+                         today, fetch, int)
+    return [DailyScanStat(date=day, count=n) for day, n in sorted(counts.items()) if n]
+
+MOM_SYSTEM_PROMPT = (
+    "Analyze the following Meeting Minutes (MoM) for BANT signals (Budget, Authority, Need, Timeline). "
+    "Return a JSON object with the following keys:\n"
+    "- score: integer (0-100)\n"
+    "- status: string ('HOT', 'WARM', 'COLD', 'LOST')\n"
+    "- reasoning: string (brief explanation)\n"
+    "- deal_breakers_found: boolean\n\n"
+    "Input Text:\n"
+)
 
 def analyze_mom_with_ai(text: str) -> dict:
     """
@@ -313,7 +548,7 @@ def analyze_mom_with_ai(text: str) -> dict:
     Falls back to simulation if GEMINI_API_KEY is not set.
     """
     if not GEMINI_API_KEY:
-        print("GEMINI_API_KEY not found. Using simulated analysis.")
+        logger.warning("GEMINI_API_KEY not found. Using simulated analysis.")
         length_factor = min(len(text) // 10, 20)
         base_score = random.randint(40, 80)
         score = min(100, base_score + length_factor)
@@ -326,34 +561,10 @@ def analyze_mom_with_ai(text: str) -> dict:
             "deal_breakers_found": deal_breaker
         }
     
-    # Configure Gemini
-    genai.configure(api_key=GEMINI_API_KEY)
-    
-    system_prompt = (
-        "Analyze the following Meeting Minutes (MoM) for BANT signals (Budget, Authority, Need, Timeline). "
-        "Return a JSON object with the following keys:\n"
-        "- score: integer (0-100)\n"
-        "- status: string ('HOT', 'WARM', 'COLD', 'LOST')\n"
-        "- reasoning: string (brief explanation)\n"
-        "- deal_breakers_found: boolean\n\n"
-        "Input Text:\n"
-    )
-    
     try:
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        response = model.generate_content(system_prompt + text)
-        
-        # Clean up response text if it contains markdown code blocks
-        content = response.text
-        if "```json" in content:
-            content = content.replace("```json", "").replace("```", "")
-        elif "```" in content:
-            content = content.replace("```", "")
-            
-        result = json.loads(content.strip())
-        return result
+        return gemini_mom_analysis(text)
     except Exception as e:
-        print(f"Gemini API error: {e}. Falling back to simulation.")
+        logger.exception("Gemini API error. Falling back to simulation.")
         # Fallback
         length_factor = min(len(text) // 10, 20)
         base_score = random.randint(40, 80)
@@ -365,29 +576,163 @@ def analyze_mom_with_ai(text: str) -> dict:
             "deal_breakers_found": False
         }
 
-def analyze_and_save_mom(mom_data: MeetingMoMCreate, user_id: uuid.UUID):
+# Several MoMs packed into one request: the prompt overhead and the round
+# trip are paid once per pack instead of once per MoM.
+MOM_BATCH_PROMPT = (
+    "Analyze each of the following numbered Meeting Minutes (MoM) for BANT signals "
+    "(Budget, Authority, Need, Timeline). Return a JSON array with one object per MoM, "
+    "with the following keys:\n"
+    "- id: integer (the MoM number)\n"
+    "- score: integer (0-100)\n"
+    "- status: string ('HOT', 'WARM', 'COLD', 'LOST')\n"
+    "- reasoning: string (brief explanation)\n"
+    "- deal_breakers_found: boolean\n\n"
+)
+MOM_ANALYSIS_KEYS = ("score", "status", "reasoning", "deal_breakers_found")
+
+GEMINI_MODEL = "gemini-2.5-flash"
+
+gemini = LLMGateway(
+    GeminiProvider(GEMINI_API_KEY, GEMINI_MODEL),
+    max_concurrency=LLM_MAX_CONCURRENCY,
+    rate=LLM_RATE_PER_SECOND,
+    burst=LLM_BURST,
+    timeout=LLM_TIMEOUT_SECONDS,
+    breaker=CircuitBreaker(LLM_BREAKER_FAILURES, LLM_BREAKER_RESET_SECONDS),
+    name="gemini",
+)
+
+# Model analyses by content: resubmitting the same MoM (up to whitespace)
+# reuses the stored analysis instead of calling Gemini again. Simulated
+# and fallback analyses are never stored.
+mom_cache = ResultStore(MOM_CACHE_PATH, MOM_CACHE_MAX_ENTRIES, MOM_CACHE_MAX_AGE_SECONDS, name="mom-analysis")
+
+def mom_cache_key(text: str, prompt: str) -> str:
+    return content_key(GEMINI_MODEL, prompt, " ".join(text.split()))
+
+def gemini_mom_analysis(text: str) -> dict:
+    """One Gemini analysis of the MoM text; raises on any API or parsing error."""
+    return mom_cache.get_or_compute(
+        mom_cache_key(text, MOM_SYSTEM_PROMPT),
+        lambda: _mom_analysis(_gemini_json(MOM_SYSTEM_PROMPT + text)),
+    )
+
+def gemini_mom_batch_analysis(texts: List[str]) -> List[dict]:
+    """Analyses of several MoMs from a single Gemini request, in input order."""
+    keys = [mom_cache_key(text, MOM_BATCH_PROMPT) for text in texts]
+    analyses = [mom_cache.get(key) for key in keys]
+    missing = [i for i, (found, _) in enumerate(analyses) if not found]
+    if missing:
+        prompt = MOM_BATCH_PROMPT + "\n\n".join(f"MoM {n}:\n{texts[i]}" for n, i in enumerate(missing, 1))
+        for i, analysis in zip(missing, unpack_mom_batch(_gemini_json(prompt), len(missing))):
+            mom_cache.set(keys[i], analysis)
+            analyses[i] = (True, analysis)
+    return [analysis for _, analysis in analyses]
+
+def _mom_analysis(result) -> dict:
+    # Only complete analyses are used (and cached)
+    if not isinstance(result, dict) or not all(k in result for k in MOM_ANALYSIS_KEYS):
+        raise ValueError("Analysis is missing required keys")
+    return {k: result[k] for k in MOM_ANALYSIS_KEYS}
+
+def unpack_mom_batch(results, count: int) -> List[dict]:
+    # Raises unless every MoM got exactly one complete analysis
+    if not isinstance(results, list):
+        raise ValueError("Batched analysis is not a JSON array")
+    by_id = {r.get("id"): r for r in results if isinstance(r, dict)}
+    if set(by_id) != set(range(1, count + 1)):
+        raise ValueError(f"Batched analysis covered {len(by_id)} of {count} MoMs")
+    return [_mom_analysis(by_id[i]) for i in range(1, count + 1)]
+
+def analyze_moms(texts: List[str]) -> List[dict]:
+    """
+    Analyses for many MoMs: MOM_BATCH_PACK_SIZE per Gemini request and at
+    most MOM_BATCH_CONCURRENCY requests in flight. A pack whose response
+    cannot be used is analyzed one MoM at a time (with the usual fallback).
+    """
+    if not GEMINI_API_KEY or not texts:
+        return [analyze_mom_with_ai(text) for text in texts]
+
+    packs = [texts[i:i + MOM_BATCH_PACK_SIZE] for i in range(0, len(texts), MOM_BATCH_PACK_SIZE)]
+
+    def analyze_pack(pack: List[str]) -> List[dict]:
+        try:
+            return gemini_mom_batch_analysis(pack)
+        except Exception as e:
+            logger.warning("Batched Gemini analysis failed (%s). Analyzing %d MoMs one by one.", e, len(pack))
+            return [analyze_mom_with_ai(text) for text in pack]
+
+    with ThreadPoolExecutor(min(MOM_BATCH_CONCURRENCY, len(packs)), thread_name_prefix="mom-batch") as pool:
+        return [analysis for pack in pool.map(analyze_pack, packs) for analysis in pack]
+
+def _gemini_json(prompt: str):
+    # Raises GatewayError subclasses without calling Gemini while the
+    # circuit is open or the process is over its limits
+    content = gemini.generate(prompt)
+
+    # Clean up response text if it contains markdown code blocks
+    if "```json" in content:
+        content = content.replace("```json", "").replace("```", "")
+    elif "```" in content:
+        content = content.replace("```", "")
+
+    return json.loads(content.strip())
+
+def _contact_status(avg_score: float, deal_breakers_found: bool) -> str:
+    new_status = "COLD"
+    if deal_breakers_found:
+        new_status = "LOST"
+    elif avg_score > 75:
+        new_status = "HOT"
+    elif avg_score > 40:
+        new_status = "WARM"
+    return new_status
+
+def _contact_outcome(new_status: str) -> dict:
+    # "COLD" might not be in the contact_outcome_status enum, so we filter it for the enum column
+    # but still save it to the text outcome column.
+    valid_enum_statuses = {"HOT", "WARM", "LOST", "WON"}
+
+    update_payload = {
+        "outcome": new_status
+    }
+
+    if new_status in valid_enum_statuses:
+        update_payload["last_outcome_status"] = new_status
+    return update_payload
+
+def analyze_and_save_mom(mom_data: MeetingMoMCreate, user_id: uuid.UUID,
+                         analyze: Optional[Callable[[str], dict]] = None):
+    """Analyze the MoM with `analyze` (default `analyze_mom_with_ai`) and save the outcome."""
+    try:
+        return _analyze_and_save_mom(mom_data, user_id, analyze or analyze_mom_with_ai)
+    finally:
+        # meetings/contacts changed (possibly partially): drop this user's cached results
+        analytics_cache.invalidate_user(str(user_id))
+        data_versions.bump(str(user_id))
+
+def _analyze_and_save_mom(mom_data: MeetingMoMCreate, user_id: uuid.UUID, analyze: Callable[[str], dict]):
     # 1. Call AI analysis
-    analysis = analyze_mom_with_ai(mom_data.mom_text)
+    analysis = analyze(mom_data.mom_text)
+
+    repo = get_repository()
 
     # 2. Update meetings table
     # Note: Ensure your Supabase 'meetings' table has 'mom_text', 'mom_exists', 'ai_score', 'ai_reasoning' columns.
-    supabase.table("meetings").update({
+    repo.update_meeting(str(mom_data.meeting_id), str(user_id), {
         "mom_text": mom_data.mom_text,
         "mom_exists": True,
         "ai_score": analysis["score"],
         "ai_reasoning": analysis["reasoning"]
-    }).eq("meeting_id", str(mom_data.meeting_id)).eq("user_id", str(user_id)).execute()
+    })
 
     # 3. Fetch contact_id for that meeting
-    meeting_res = supabase.table("meetings") \
-        .select("contact_id") \
-        .eq("meeting_id", str(mom_data.meeting_id)) \
-        .execute()
+    meeting = repo.get_meeting(str(mom_data.meeting_id), "contact_id")
     
-    if not meeting_res.data:
+    if not meeting:
         raise HTTPException(status_code=404, detail="Meeting not found")
 
-    contact_id = meeting_res.data[0].get("contact_id")
+    contact_id = meeting.get("contact_id")
     if not contact_id:
         return {
             "message": "Analysis saved to meeting, but no contact linked.",
@@ -395,13 +740,9 @@ def analyze_and_save_mom(mom_data: MeetingMoMCreate, user_id: uuid.UUID):
         }
 
     # 4. Fetch all past meetings for that contact (Cumulative History)
-    history_res = supabase.table("meetings") \
-        .select("ai_score") \
-        .eq("contact_id", contact_id) \
-        .not_.is_("ai_score", "null") \
-        .execute()
+    history = repo.list_contact_ai_scores(contact_id)
 
-    scores = [r["ai_score"] for r in history_res.data if r["ai_score"] is not None]
+    scores = [r["ai_score"] for r in history if r["ai_score"] is not None]
     # Include current if not yet reflected? The update above should reflect if we re-fetched, 
     # but supabase update might not be instant in read replica or we just use local value? 
     # It safely assumes strictly historical + current if 'update' was successful.
@@ -409,27 +750,12 @@ def analyze_and_save_mom(mom_data: MeetingMoMCreate, user_id: uuid.UUID):
     avg_score = sum(scores) / len(scores) if scores else analysis["score"]
 
     # 5. Determine final status
-    new_status = "COLD"
-    if analysis["deal_breakers_found"]:
-        new_status = "LOST"
-    elif avg_score > 75:
-        new_status = "HOT"
-    elif avg_score > 40:
-        new_status = "WARM"
+    new_status = _contact_status(avg_score, analysis["deal_breakers_found"])
 
     # 6. Update contacts table
-    # "COLD" might not be in the contact_outcome_status enum, so we filter it for the enum column
-    # but still save it to the text outcome column.
-    valid_enum_statuses = {"HOT", "WARM", "LOST", "WON"}
-    
-    update_payload = {
-        "outcome": new_status
-    }
-    
-    if new_status in valid_enum_statuses:
-        update_payload["last_outcome_status"] = new_status
-        
-    supabase.table("contacts").update(update_payload).eq("contact_id", contact_id).execute()
+    update_payload = _contact_outcome(new_status)
+    repo.update_contact(contact_id, update_payload)
+    contact_search.apply_contact_update(str(user_id), contact_id, update_payload)
 
     return {
         "analysis": analysis,
@@ -437,6 +763,77 @@ def analyze_and_save_mom(mom_data: MeetingMoMCreate, user_id: uuid.UUID):
         "new_contact_status": new_status
     }
 
+def analyze_and_save_mom_batch(items: List[MeetingMoMCreate], user_id: uuid.UUID,
+                               analyze: Optional[Callable[[List[str]], List[dict]]] = None) -> dict:
+    """
+    `analyze_and_save_mom` for many MoMs at once: packed, concurrent model
+    calls (default `analyze_moms`), then one bulk write per table and one
+    outcome per affected contact. Items for unknown meetings are reported,
+    not fatal. When a meeting appears twice, the last MoM wins.
+    """
+    try:
+        return _analyze_and_save_mom_batch(items, user_id, analyze or analyze_moms)
+    finally:
+        analytics_cache.invalidate_user(str(user_id))
+        data_versions.bump(str(user_id))
+
+def _analyze_and_save_mom_batch(items: List[MeetingMoMCreate], user_id: uuid.UUID,
+                                analyze: Callable[[List[str]], List[dict]]) -> dict:
+    repo = get_repository()
+    latest = {str(item.meeting_id): item for item in items}
+
+    # 1. Which meetings exist, and their contacts (one round trip)
+    rows = repo.list_meetings_by_id(str(user_id), list(latest), "meeting_id, contact_id")
+    contact_of = {str(r["meeting_id"]): r.get("contact_id") for r in rows}
+    found = [m for m in latest if m in contact_of]
+
+    # 2. Analyze every MoM of a known meeting
+    analyses = dict(zip(found, analyze([latest[m].mom_text for m in found])))
+
+    # 3. Update meetings in bulk
+    if found:
+        repo.update_meetings(str(user_id), [{
+            "meeting_id": m,
+            "mom_text": latest[m].mom_text,
+            "mom_exists": True,
+            "ai_score": analyses[m]["score"],
+            "ai_reasoning": analyses[m]["reasoning"],
+        } for m in found])
+
+    # 4. Cumulative history of every affected contact (one round trip)
+    by_contact: Dict[str, str] = {}  # contact -> its last meeting in the batch
+    for m in found:
+        if contact_of[m]:
+            by_contact[str(contact_of[m])] = m
+    scores: Dict[str, List[int]] = {c: [] for c in by_contact}
+    for r in repo.list_ai_scores(list(by_contact)):
+        scores[str(r["contact_id"])].append(r["ai_score"])
+
+    # 5. One outcome per contact, as if its MoMs had been saved in order
+    contacts = []
+    updates = []
+    for contact_id, m in by_contact.items():
+        avg_score = sum(scores[contact_id]) / len(scores[contact_id]) if scores[contact_id] else analyses[m]["score"]
+        new_status = _contact_status(avg_score, analyses[m]["deal_breakers_found"])
+        updates.append({"contact_id": contact_id, **_contact_outcome(new_status)})
+        contacts.append({"contact_id": contact_id, "average_score": avg_score, "new_contact_status": new_status})
+
+    # 6. Update contacts in bulk
+    if updates:
+        repo.update_contacts(str(user_id), updates)
+        for update in updates:
+            contact_search.apply_contact_update(str(user_id), update["contact_id"],
+                                                {k: v for k, v in update.items() if k != "contact_id"})
+
+    return {
+        "results": [
+            {"meeting_id": m, "contact_id": contact_of[m], "analysis": analyses[m]} if m in analyses
+            else {"meeting_id": m, "error": "Meeting not found"}
+            for m in latest
+        ],
+        "contacts": contacts,
+    }
+
 def get_date_range_for_preset(preset: DateRangePreset, custom_start: Optional[str] = None, custom_end: Optional[str] = None) -> DateRangeResponse:
     start, end = resolve_date_range_preset(preset, custom_start, custom_end)
     return DateRangeResponse(
@@ -445,73 +842,115 @@ def get_date_range_for_preset(preset: DateRangePreset, custom_start: Optional[st
         preset=preset
     )
 
-def get_completed_meetings(user_id: uuid.UUID, limit: int = 20) -> List[CompletedMeeting]:
+def _after(cursor: Optional[str]) -> Optional[Cursor]:
+    if cursor is None:
+        return None
     try:
-        # Fetch completed meetings joined with contacts to get name
-        response = supabase.table("meetings") \
-            .select("*, contacts(first_name, last_name, company_name)") \
-            .eq("user_id", str(user_id)) \
-            .eq("status", "COMPLETED") \
-            .order("scheduled_at", desc=True) \
-            .limit(limit) \
-            .execute()
-        
-        meetings = []
-        for m in response.data:
-            contact = m.get('contacts')
-            contact_name = "Unknown"
-            company_name = None
-            if contact:
-                contact_name = f"{contact.get('first_name', '')} {contact.get('last_name', '')}".strip()
-                company_name = contact.get('company_name')
-
-            meetings.append(CompletedMeeting(
-                meeting_id=uuid.UUID(m['meeting_id']),
-                contact_name=contact_name,
-                company_name=company_name,
-                scheduled_at=m.get('scheduled_at'),
-                status=m.get('status'),
-                mom_exists=m.get('mom_exists'),
-                mom_text=m.get('mom_text')
-            ))
-        return meetings
-    except Exception as e:
-        print(f"Error fetching completed meetings: {e}")
-        return []
+        return decode_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _stream(pages: Iterator[List[dict]], convert: Callable[[dict], BaseModel], what: str) -> Iterator[bytes]:
+    # Headers are already sent when a later page fails: log it and abort the
+    # response so the client sees a truncated stream rather than a short list.
+    def models():
+        for rows in pages:
+            yield [convert(r) for r in rows]
+    try:
+        yield from ndjson(models())
+    except Exception:
+        logger.exception("Error streaming %s", what)
+        raise
+
+def _completed_meeting(m: dict) -> CompletedMeeting:
+    contact = m.get('contacts')
+    contact_name = "Unknown"
+    company_name = None
+    if contact:
+        contact_name = f"{contact.get('first_name', '')} {contact.get('last_name', '')}".strip()
+        company_name = contact.get('company_name')
+
+    return CompletedMeeting(
+        meeting_id=uuid.UUID(m['meeting_id']),
+        contact_name=contact_name,
+        company_name=company_name,
+        scheduled_at=m.get('scheduled_at'),
+        status=m.get('status'),
+        mom_exists=m.get('mom_exists'),
+        mom_text=m.get('mom_text')
+    )
+
+def _email_detail(e: dict) -> EmailDetail:
+    return EmailDetail(
+        email_id=uuid.UUID(e['email_id']),
+        status=e.get('status'),
+        drafted_at=e.get('drafted_at'),
+        subject=e.get('subject', 'No Subject'),
+        recipient=e.get('recipient_email', 'Unknown')
+    )
 
-def get_drafted_emails(user_id: uuid.UUID, limit: int = 20) -> List[EmailDetail]:
+def _completed_meetings_fetch(user_id: uuid.UUID):
+    repo = get_repository()
+    return lambda limit, after: repo.list_completed_meetings(str(user_id), limit, after)
+
+def _drafted_emails_fetch(user_id: uuid.UUID):
+    repo = get_repository()
+    return lambda limit, after: repo.list_recent_emails(str(user_id), limit, after)
+
+def _contacts_fetch(user_id: uuid.UUID):
+    repo = get_repository()
+    return lambda limit, after: repo.list_contacts_page(str(user_id), limit, after)
+
+def get_completed_meetings(user_id: uuid.UUID, limit: int = 20, cursor: Optional[str] = None) -> Page:
+    """Newest completed meetings after `cursor`, with the cursor of the next page."""
+    after = _after(cursor)
     try:
-        # Fetch recent emails
-        response = supabase.table("emails") \
-            .select("*") \
-            .eq("user_id", str(user_id)) \
-            .order("drafted_at", desc=True) \
-            .limit(limit) \
-            .execute()
-            
-        emails = []
-        for e in response.data:
-            emails.append(EmailDetail(
-                email_id=uuid.UUID(e['email_id']),
-                status=e.get('status'),
-                drafted_at=e.get('drafted_at'),
-                subject=e.get('subject', 'No Subject'), 
-                recipient=e.get('recipient_email', 'Unknown') 
-            ))
-        return emails
-        return emails
-    except Exception as e:
-        print(f"Error fetching drafted emails: {e}")
-        return []
+        # Completed meetings joined with contacts to get name
+        page = fetch_page(_completed_meetings_fetch(user_id), limit, after, "scheduled_at", "meeting_id")
+        return page._replace(items=[_completed_meeting(m) for m in page.items])
+    except Exception:
+        logger.exception("Error fetching completed meetings")
+        return Page([], None)
+
+def stream_completed_meetings(user_id: uuid.UUID, cursor: Optional[str] = None) -> Iterator[bytes]:
+    """Every completed meeting after `cursor` as NDJSON, fetched STREAM_CHUNK_SIZE rows at a time."""
+    pages = iter_pages(_completed_meetings_fetch(user_id), STREAM_CHUNK_SIZE, _after(cursor),
+                       "scheduled_at", "meeting_id")
+    return _stream(pages, _completed_meeting, "completed meetings")
+
+def get_drafted_emails(user_id: uuid.UUID, limit: int = 20, cursor: Optional[str] = None) -> Page:
+    """Newest emails after `cursor`, with the cursor of the next page."""
+    after = _after(cursor)
+    try:
+        page = fetch_page(_drafted_emails_fetch(user_id), limit, after, "drafted_at", "email_id")
+        return page._replace(items=[_email_detail(e) for e in page.items])
+    except Exception:
+        logger.exception("Error fetching drafted emails")
+        return Page([], None)
+
+def stream_drafted_emails(user_id: uuid.UUID, cursor: Optional[str] = None) -> Iterator[bytes]:
+    pages = iter_pages(_drafted_emails_fetch(user_id), STREAM_CHUNK_SIZE, _after(cursor), "drafted_at", "email_id")
+    return _stream(pages, _email_detail, "drafted emails")
 
-def get_contacts_list(user_id: uuid.UUID) -> List[Contact]:
+def get_contacts_list(user_id: uuid.UUID, limit: Optional[int] = None, cursor: Optional[str] = None) -> Page:
+    """
+    Contacts, newest first. Without `limit` and `cursor` every contact is
+    returned at once (the original behaviour); otherwise one keyset page.
+    """
+    page = get_contact_rows(user_id, limit, cursor)
+    return page._replace(items=[Contact(**c) for c in page.items])
+
+def get_contact_rows(user_id: uuid.UUID, limit: Optional[int] = None, cursor: Optional[str] = None) -> Page:
+    """`get_contacts_list` as raw rows, for the fast JSON path."""
+    after = _after(cursor)
     try:
-        response = supabase.table("contacts") \
-            .select("*") \
-            .eq("user_id", str(user_id)) \
-            .order("created_at", desc=True) \
-            .execute()
-        return [Contact(**c) for c in response.data]
-    except Exception as e:
-        print(f"Error fetching contacts: {e}")
-        return []
+        if limit is None and after is None:
+            return Page(get_repository().list_contacts(str(user_id), newest_first=True), None)
+        return fetch_page(_contacts_fetch(user_id), limit or STREAM_CHUNK_SIZE, after, "created_at", "contact_id")
+    except Exception:
+        logger.exception("Error fetching contacts")
+        return Page([], None)
+
+def stream_contacts(user_id: uuid.UUID, cursor: Optional[str] = None) -> Iterator[bytes]:
+    pages = iter_pages(_contacts_fetch(user_id), STREAM_CHUNK_SIZE, _after(cursor), "created_at", "contact_id")
+    return _stream(pages, lambda c: Contact(**c), "contacts")
@@ -0,0 +1,40 @@
+from typing import List, Optional
+
+from core.config import CONTACT_INDEX_CHUNK_SIZE, CONTACT_INDEX_MAX_CONTACTS, CONTACT_INDEX_TTL_SECONDS
+from db.repository import KEYSET_COLUMNS, Row, get_repository
+from utils.cache import TTLCache
+from utils.pagination import iter_pages
+from utils.text_index import TextIndex
+
+# Per-user contact indexes, LRU-evicted across users once the total number
+# of indexed contacts exceeds CONTACT_INDEX_MAX_CONTACTS. The TTL bounds how
+# long contacts created outside this service take to become searchable.
+contact_index_cache = TTLCache(CONTACT_INDEX_MAX_CONTACTS, CONTACT_INDEX_TTL_SECONDS, weigh=len)
+
+
+def contact_texts(contact: Row) -> List[Optional[str]]:
+    first, last = contact.get("first_name"), contact.get("last_name")
+    full_name = f"{first} {last}" if first and last else None
+    return [first, last, full_name, contact.get("email"), contact.get("company_name")]
+
+
+def _build(user_id: str) -> TextIndex:
+    # Keyset pages: one unpaged request is capped at the backend's max rows
+    repo = get_repository()
+    pages = iter_pages(lambda limit, after: repo.list_contacts_page(user_id, limit, after),
+                       CONTACT_INDEX_CHUNK_SIZE, None, *KEYSET_COLUMNS["contacts"])
+    return TextIndex([c for page in pages for c in page], "contact_id", contact_texts)
+
+
+def search_contacts(user_id: str, query: str, limit: int) -> List[Row]:
+    """Top `limit` contacts matching `query` in name, email or company, best match first."""
+    index = contact_index_cache.get_or_compute((user_id, "contacts"), lambda: _build(user_id))
+    return index.search(query, limit)
+
+
+def apply_contact_update(user_id: str, contact_id: str, values: Row) -> None:
+    """Mirror a write we made to `contacts` into the user's index, if built."""
+    found, index = contact_index_cache.get((user_id, "contacts"))
+    if not found or not index.update(contact_id, values):
+        # Not indexed (yet): make sure an index built concurrently is not kept
+        contact_index_cache.invalidate_user(user_id)
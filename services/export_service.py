@@ -0,0 +1,85 @@
+import logging
+import uuid
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+from core.config import EXPORT_CHUNK_SIZE
+from db.repository import KEYSET_COLUMNS, Row, get_repository
+from models.dashboard_model import ExportEntity, ExportFormat
+from services.analytics_service import end_of_day
+from utils.pagination import NDJSON_MEDIA_TYPE, iter_pages
+from utils.streaming import csv_chunks, gzip_chunks, json_lines
+
+logger = logging.getLogger(__name__)
+
+# Exported columns per entity, in CSV column order
+EXPORT_COLUMNS: Dict[ExportEntity, Tuple[str, ...]] = {
+    ExportEntity.CONTACTS: (
+        "contact_id", "first_name", "last_name", "company_name", "email", "phone", "created_at",
+        "last_activity_at", "next_follow_up_due_at", "next_follow_up_type", "last_outcome_status", "outcome",
+    ),
+    ExportEntity.MEETINGS: (
+        "meeting_id", "contact_id", "scheduled_at", "status", "mom_exists", "duration_seconds",
+        "mom_text", "ai_score", "ai_reasoning",
+    ),
+    ExportEntity.EMAILS: (
+        "email_id", "contact_id", "status", "drafted_at", "prompt_version", "subject", "recipient_email",
+    ),
+}
+
+MEDIA_TYPES = {ExportFormat.CSV: "text/csv", ExportFormat.NDJSON: NDJSON_MEDIA_TYPE}
+
+
+def _bound(value: Optional[str], name: str) -> Optional[str]:
+    if value is None:
+        return None
+    try:
+        datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid {name}: {value!r}")
+    return value
+
+
+def export_pages(user_id: uuid.UUID, entity: ExportEntity, start: Optional[str] = None,
+                 end: Optional[str] = None) -> Iterator[List[Row]]:
+    """
+    Every row of `entity` for the user with its timestamp in [start, end]
+    (a bare-date end covers the whole day), newest first, as keyset pages
+    of EXPORT_CHUNK_SIZE rows. Only one page is held in memory at a time.
+    """
+    repo = get_repository()
+    table = entity.value
+    column, key = KEYSET_COLUMNS[table]
+    start, end = _bound(start, "start_date"), _bound(end, "end_date")
+    end = end_of_day(end) if end else None
+    columns = ", ".join(EXPORT_COLUMNS[entity])
+
+    def fetch(limit, after):
+        return repo.list_page(table, str(user_id), limit, after, start, end, columns)
+
+    return iter_pages(fetch, EXPORT_CHUNK_SIZE, None, column, key)
+
+
+def export(user_id: uuid.UUID, entity: ExportEntity, fmt: ExportFormat, start: Optional[str] = None,
+           end: Optional[str] = None, compress: bool = False) -> Iterator[bytes]:
+    """Encoded export stream; pages are fetched as the response is consumed."""
+    pages = export_pages(user_id, entity, start, end)
+    if fmt == ExportFormat.CSV:
+        chunks = csv_chunks(pages, EXPORT_COLUMNS[entity])
+    else:
+        chunks = json_lines(pages)
+    if compress:
+        chunks = gzip_chunks(chunks)
+    return _logged(chunks, entity)
+
+
+def _logged(chunks: Iterator[bytes], entity: ExportEntity) -> Iterator[bytes]:
+    # Headers are already sent when a page fails mid-export: log it and
+    # abort the response so the client sees a truncated transfer.
+    try:
+        yield from chunks
+    except Exception:
+        logger.exception("Error exporting %s", entity.value)
+        raise
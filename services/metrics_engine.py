@@ -0,0 +1,129 @@
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from db.repository import outcome_key
+from models.dashboard_model import FunnelBreakdown
+from utils.columnar import Categorical, categorical, epoch_us, group_count
+
+# Outcome groupings shared by the summary and funnel endpoints
+QUALIFIED_OUTCOMES = ("warm", "hot")
+CONVERTED_OUTCOMES = ("hot",)
+POSITIVE_STATUSES = ("HOT", "WON")
+
+
+class Histogram:
+    """
+    Columnar view of grouped-count rows: one categorical array per column
+    plus the `count` weights, so any filter is a mask and a weighted sum.
+    """
+
+    def __init__(self, rows: List[dict]):
+        self.weights = np.fromiter((r["count"] for r in rows), dtype=np.int64, count=len(rows))
+        self.columns = {}
+        for name in (rows[0] if rows else {}):
+            if name != "count":
+                self.columns[name] = categorical([r.get(name) for r in rows])
+
+    def isin(self, name: str, values: Iterable) -> np.ndarray:
+        if name not in self.columns:
+            return np.zeros(len(self.weights), dtype=bool)
+        codes, labels = self.columns[name]
+        values = set(values)
+        wanted = [i for i, label in enumerate(labels) if label in values]
+        return np.isin(codes, wanted)
+
+    def flag(self, name: str) -> np.ndarray:
+        return self.isin(name, (True,))
+
+    def total(self, mask=None) -> int:
+        if mask is None:
+            return int(self.weights.sum())
+        return int(self.weights[mask].sum())
+
+
+def compute_metrics(contacts: List[dict], meetings: List[dict], emails: List[dict]) -> Dict[str, int]:
+    """
+    Every count behind DashboardSummary and FunnelBreakdown, computed from
+    the contact outcome, meeting status and email status histograms.
+    """
+    c, m, e = Histogram(contacts), Histogram(meetings), Histogram(emails)
+
+    converted = c.isin("outcome", CONVERTED_OUTCOMES)
+    before = c.flag("before_cutoff")
+    completed = m.isin("status", ("COMPLETED",))
+
+    return {
+        "contacts": c.total(),
+        "qualified": c.total(c.isin("outcome", QUALIFIED_OUTCOMES)),
+        "converted": c.total(converted),
+        "positive": c.total(c.isin("last_outcome_status", POSITIVE_STATUSES)),
+        "prev_contacts": c.total(before),
+        "prev_converted": c.total(before & converted),
+        "meetings": m.total(),
+        "meetings_completed": m.total(completed),
+        "mom_done": m.total(completed & m.flag("mom_exists")),
+        "cancelled": m.total(m.isin("status", ("CANCELLED",))),
+        "no_show": m.total(m.isin("status", ("NO_SHOW",))),
+        "emails_drafted": e.total(e.isin("status", ("DRAFTED",))),
+        "emails_sent": e.total(e.isin("status", ("SENT",))),
+    }
+
+
+def build_funnel(metrics: Dict[str, int], positive: str = "positive") -> FunnelBreakdown:
+    # The summary reports converted (hot) contacts as positive outcomes; the
+    # funnel endpoint reports HOT/WON contacts. Everything else is shared.
+    return FunnelBreakdown(
+        contacts_captured=metrics["contacts"],
+        meetings_scheduled=metrics["meetings"],
+        meetings_completed=metrics["meetings_completed"],
+        emails_drafted=metrics["emails_drafted"],
+        emails_sent=metrics["emails_sent"],
+        qualified_contacts=metrics["qualified"],
+        positive_outcomes=metrics[positive],
+    )
+
+
+def bucket_codes(timestamps: Sequence[Optional[str]], edges: np.ndarray) -> Categorical:
+    """
+    Bucket of each timestamp as a categorical column: bucket i holds
+    [edges[i], edges[i + 1]) in epoch microseconds, label None anything
+    missing or outside. One binary search per row over the sorted edges.
+    """
+    buckets = len(edges) - 1
+    index = np.searchsorted(edges, epoch_us(timestamps), side="right") - 1
+    index[index >= buckets] = -1  # NAT and early rows are already -1
+    return (index + 1).astype(np.int32), [None, *range(buckets)]
+
+
+def compute_bucketed_metrics(contacts: List[dict], meetings: List[dict], emails: List[dict],
+                             edges: np.ndarray) -> List[Dict[str, int]]:
+    """
+    `compute_metrics` for every bucket of `edges` from raw rows: contacts by
+    created_at, meetings by scheduled_at, emails by drafted_at. Each table is
+    grouped by (bucket, columns) in one pass, then every bucket's small
+    histogram goes through the same metric definitions as the summary.
+    """
+    grouped = {
+        "contacts": group_count({
+            "bucket": bucket_codes([r.get("created_at") for r in contacts], edges),
+            "outcome": categorical([outcome_key(r) for r in contacts]),
+            "last_outcome_status": categorical([r.get("last_outcome_status") for r in contacts]),
+        }) if contacts else [],
+        "meetings": group_count({
+            "bucket": bucket_codes([r.get("scheduled_at") for r in meetings], edges),
+            "status": categorical([r.get("status") for r in meetings]),
+            "mom_exists": categorical([bool(r.get("mom_exists")) for r in meetings]),
+        }) if meetings else [],
+        "emails": group_count({
+            "bucket": bucket_codes([r.get("drafted_at") for r in emails], edges),
+            "status": categorical([r.get("status") for r in emails]),
+        }) if emails else [],
+    }
+    per_bucket = [{name: [] for name in grouped} for _ in range(len(edges) - 1)]
+    for name, rows in grouped.items():
+        for row in rows:
+            bucket = row.pop("bucket")
+            if bucket is not None:
+                per_bucket[bucket][name].append(row)
+    return [compute_metrics(b["contacts"], b["meetings"], b["emails"]) for b in per_bucket]
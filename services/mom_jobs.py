@@ -0,0 +1,87 @@
+import uuid
+from datetime import datetime, timezone
+from typing import Callable, List, Optional
+
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+
+from core.config import (
+    GEMINI_API_KEY, MOM_JOB_MAX_ATTEMPTS, MOM_JOB_MAX_PENDING, MOM_JOB_RETENTION_SECONDS,
+    MOM_JOB_RETRY_BACKOFF_SECONDS, MOM_JOB_WORKERS,
+)
+from models.dashboard_model import MeetingMoMCreate, MoMJobStatus
+from services import analytics_service
+from utils.jobs import SUCCEEDED, Job, JobQueue, QueueFull
+
+UTC = timezone.utc
+
+# Async MoM analyses run on their own workers, never on the request
+# threadpool. HTTP errors (meeting not found) are final; anything else is
+# retried.
+mom_queue = JobQueue(MOM_JOB_WORKERS, MOM_JOB_MAX_PENDING, MOM_JOB_RETENTION_SECONDS,
+                     MOM_JOB_RETRY_BACKOFF_SECONDS, permanent=(HTTPException,), name="mom-analysis")
+
+
+def _analyzer(job: Job) -> Callable[[str], dict]:
+    # Earlier attempts let Gemini errors surface so they are retried; the
+    # last one falls back to the simulated analysis like the sync path does.
+    if job.final_attempt or not GEMINI_API_KEY:
+        return analytics_service.analyze_mom_with_ai
+    return analytics_service.gemini_mom_analysis
+
+
+def _submit(run: Callable[[Job], dict], user_id: uuid.UUID, max_attempts: int) -> Job:
+    try:
+        return mom_queue.submit(run, str(user_id), max_attempts)
+    except QueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+
+
+def submit(mom_data: MeetingMoMCreate, user_id: uuid.UUID, max_attempts: int = MOM_JOB_MAX_ATTEMPTS) -> Job:
+    return _submit(lambda job: analytics_service.analyze_and_save_mom(mom_data, user_id, _analyzer(job)),
+                   user_id, max_attempts)
+
+
+def submit_batch(items: List[MeetingMoMCreate], user_id: uuid.UUID,
+                 max_attempts: int = MOM_JOB_MAX_ATTEMPTS) -> Job:
+    # Packs that fail fall back inside analyze_moms; retries cover the writes
+    return _submit(lambda job: analytics_service.analyze_and_save_mom_batch(items, user_id),
+                   user_id, max_attempts)
+
+
+async def analyze(mom_data: MeetingMoMCreate, user_id: uuid.UUID) -> dict:
+    """
+    The synchronous API, as before the queue existed: one attempt on the
+    request threadpool. It never waits behind (or is refused because of)
+    queued async jobs, and leaves no job behind.
+    """
+    return await run_in_threadpool(analytics_service.analyze_and_save_mom, mom_data, user_id)
+
+
+async def analyze_batch(items: List[MeetingMoMCreate], user_id: uuid.UUID) -> dict:
+    return await run_in_threadpool(analytics_service.analyze_and_save_mom_batch, items, user_id)
+
+
+def _error(error: Optional[BaseException]) -> Optional[str]:
+    if error is None:
+        return None
+    return str(error.detail) if isinstance(error, HTTPException) else str(error)
+
+
+def _time(ts: Optional[float]) -> Optional[datetime]:
+    return datetime.fromtimestamp(ts, UTC) if ts is not None else None
+
+
+def get_status(job_id: uuid.UUID, user_id: uuid.UUID) -> MoMJobStatus:
+    job = mom_queue.get(str(job_id))
+    if job is None or job.owner != str(user_id):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return MoMJobStatus(
+        job_id=job.id,
+        status=job.status,
+        attempts=job.attempts,
+        result=job.result if job.status == SUCCEEDED else None,
+        error=_error(job.error),
+        created_at=_time(job.created_at),
+        finished_at=_time(job.finished_at),
+    )
@@ -0,0 +1,38 @@
+import os
+
+import pytest
+
+# Run the suite against the offline in-process backend unless a real
+# backend is configured explicitly.
+os.environ.setdefault("DATA_BACKEND", "memory")
+# Tests must not see analyses cached on disk by earlier runs
+os.environ.setdefault("MOM_CACHE_PATH", "")
+
+# The manual DB check needs a live Supabase project
+collect_ignore = []
+if not (os.getenv("SUPABASE_URL") and os.getenv("SUPABASE_SERVICE_ROLE_KEY")):
+    collect_ignore.append("test_manual_db_check.py")
+
+
+@pytest.fixture
+def sqlite_repo():
+    from db.repository import set_repository
+    from db.sqlite_repository import SQLiteRepository
+
+    repo = SQLiteRepository()
+    set_repository(repo)
+    yield repo
+    set_repository(None)
+
+
+@pytest.fixture(autouse=True)
+def clear_analytics_cache():
+    from services.contact_search import contact_index_cache
+    from utils.cache import analytics_cache, industry_day_cache, scan_day_cache
+
+    caches = (analytics_cache, industry_day_cache, scan_day_cache, contact_index_cache)
+    for cache in caches:
+        cache.clear()
+    yield
+    for cache in caches:
+        cache.clear()
@@ -0,0 +1,23 @@
+from benchmarks import bench_analytics, bench_serialization
+
+
+def test_benchmark_run_reports_round_trips_and_rows():
+    results = bench_analytics.run([50], repeat=1, scans=20, seed=1)
+    summary = results["50"]["get_dashboard_summary"]
+    assert summary["round_trips"] == 4
+    assert summary["rows"] > 0
+    assert set(results["50"]) == set(bench_analytics._cases(None))
+
+
+def test_compare_flags_regressions():
+    baseline = {"1000": {"get_funnel_view": {"wall_ms": 10.0, "round_trips": 3, "rows": 100, "peak_kb": 1.0}}}
+    slower = {"1000": {"get_funnel_view": {"wall_ms": 20.0, "round_trips": 4, "rows": 100, "peak_kb": 1.0}}}
+    same = {"1000": {"get_funnel_view": {"wall_ms": 11.0, "round_trips": 3, "rows": 90, "peak_kb": 1.0}}}
+
+    assert len(bench_analytics.compare(slower, baseline, threshold=0.25)) == 2
+    assert bench_analytics.compare(same, baseline, threshold=0.25) == []
+
+
+def test_serialization_benchmark_compares_both_paths():
+    result = bench_serialization.run(50, repeat=1, seed=1)
+    assert result["rows"] == 50 and result["model_us_per_row"] > 0 and result["fast_us_per_row"] > 0
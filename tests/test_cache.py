@@ -0,0 +1,132 @@
+import threading
+import time
+
+from utils.cache import TTLCache
+from utils.singleflight import SingleFlight
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = TTLCache(max_entries=10, ttl=30, clock=clock)
+    cache.set(("u1", "summary"), 1)
+
+    assert cache.get(("u1", "summary")) == (True, 1)
+    clock.now = 31
+    assert cache.get(("u1", "summary")) == (False, None)
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(max_entries=2, ttl=30)
+    cache.set(("u1", "a"), 1)
+    cache.set(("u1", "b"), 2)
+    cache.get(("u1", "a"))
+    cache.set(("u1", "c"), 3)
+
+    assert cache.get(("u1", "b")) == (False, None)
+    assert cache.get(("u1", "a")) == (True, 1)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_invalidate_user_drops_only_that_user():
+    cache = TTLCache(max_entries=10, ttl=30)
+    cache.set(("u1", "summary"), 1)
+    cache.set(("u2", "summary"), 2)
+
+    assert cache.invalidate_user("u1") == 1
+    assert cache.get(("u1", "summary")) == (False, None)
+    assert cache.get(("u2", "summary")) == (True, 2)
+
+
+def test_value_computed_across_an_invalidation_is_not_stored():
+    cache = TTLCache(max_entries=10, ttl=30)
+
+    def compute():
+        cache.invalidate_user("u1")  # a write lands while we compute
+        return "stale"
+
+    assert cache.get_or_compute(("u1", "summary"), compute) == "stale"
+    assert cache.get(("u1", "summary")) == (False, None)
+
+
+def test_weighted_entries_bound_the_total_weight():
+    cache = TTLCache(max_entries=5, ttl=30, weigh=len)
+    cache.set(("u1", "index"), [1, 2, 3])
+    cache.set(("u2", "index"), [1, 2])
+    cache.get(("u1", "index"))
+    cache.set(("u3", "index"), [1, 2])
+
+    assert cache.get(("u2", "index")) == (False, None)
+    assert cache.stats()["weight"] == 5
+    cache.set(("u4", "index"), list(range(6)))
+    assert cache.get(("u4", "index")) == (False, None)
+
+
+def _concurrently(n, fn):
+    results, errors = [], []
+
+    def run():
+        try:
+            results.append(fn())
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run) for _ in range(n)]
+    for t in threads:
+        t.start()
+    return threads, results, errors
+
+
+def test_concurrent_misses_share_one_computation():
+    flights = SingleFlight()
+    release = threading.Event()
+    computed = []
+
+    def compute():
+        computed.append(1)
+        release.wait(5)
+        return "value"
+
+    threads, results, _ = _concurrently(8, lambda: flights.do("k", compute))
+    while flights.stats()["calls"] < 8:
+        time.sleep(0.001)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert results == ["value"] * 8 and len(computed) == 1
+    assert flights.stats() == {"calls": 8, "coalesced": 7, "coalesce_ratio": 0.875, "in_flight": 0}
+
+    def fail():
+        raise ValueError("backend down")
+
+    threads, _, errors = _concurrently(3, lambda: flights.do("k", fail))
+    for t in threads:
+        t.join()
+    assert len(errors) == 3 and all(isinstance(e, ValueError) for e in errors)
+
+
+def test_coalescing_respects_invalidation():
+    cache = TTLCache(max_entries=10, ttl=0)  # caching off, coalescing still on
+    started, release = threading.Event(), threading.Event()
+
+    def stale():
+        started.set()
+        release.wait(5)
+        return "before write"
+
+    threads, results, _ = _concurrently(1, lambda: cache.get_or_compute(("u1", "summary"), stale))
+    started.wait(5)
+    cache.invalidate_user("u1")
+    assert cache.get_or_compute(("u1", "summary"), lambda: "after write") == "after write"
+    release.set()
+    threads[0].join()
+    assert results == ["before write"] and cache.stats()["coalesced"] == 0
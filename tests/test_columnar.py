@@ -0,0 +1,23 @@
+from utils.columnar import NAT, categorical, epoch_us, group_count
+
+
+def test_categorical_keeps_given_categories_first():
+    codes, labels = categorical(["b", "a", None, "b"], categories=("a",))
+    assert labels == ["a", "b", None]
+    assert codes.tolist() == [1, 0, 2, 1]
+
+
+def test_epoch_us_normalizes_offsets():
+    values = epoch_us(["2026-01-01T00:00:00+00:00", "2026-01-01T01:00:00+01:00",
+                       "2026-01-01T00:00:00Z", "2026-01-01", None, "not a date"])
+    assert len(set(values[:4].tolist())) == 1
+    assert values[4] == NAT and values[5] == NAT
+
+
+def test_group_count_counts_combinations():
+    rows = group_count({
+        "status": categorical(["SENT", "SENT", "DRAFTED"]),
+        "flag": categorical([True, False, True]),
+    })
+    assert sorted((r["status"], r["flag"], r["count"]) for r in rows) == \
+        [("DRAFTED", True, 1), ("SENT", False, 1), ("SENT", True, 1)]
@@ -0,0 +1,60 @@
+import csv
+import gzip
+import io
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from services import export_service
+from utils.streaming import gzip_chunks
+
+USER_ID = uuid.UUID("00000000-0000-0000-0000-000000000002")
+NOW = datetime(2026, 3, 10, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def client(sqlite_repo, monkeypatch):
+    # Several pages per export
+    monkeypatch.setattr(export_service, "EXPORT_CHUNK_SIZE", 3)
+    sqlite_repo.insert_rows("contacts", [
+        {"contact_id": str(uuid.uuid4()), "user_id": str(USER_ID), "first_name": f"C{i}",
+         "company_name": "Acme, Inc.", "created_at": NOW - timedelta(days=i)}
+        for i in range(10)
+    ])
+    return TestClient(app)
+
+
+def test_csv_export_streams_every_row(client):
+    response = client.get(f"/api/v1/export/contacts?user_id={USER_ID}")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [r["first_name"] for r in rows] == [f"C{i}" for i in range(10)]
+    assert rows[0]["company_name"] == "Acme, Inc." and rows[0]["last_name"] == ""
+
+
+def test_ndjson_export_honours_range_and_gzip(client):
+    response = client.get(f"/api/v1/export/contacts?user_id={USER_ID}&format=ndjson&gzip=true"
+                          "&start_date=2026-03-03&end_date=2026-03-08")
+
+    # The client undoes Content-Encoding
+    assert response.headers["content-encoding"] == "gzip"
+    names = [json.loads(line)["first_name"] for line in response.text.splitlines()]
+    assert names == ["C2", "C3", "C4", "C5", "C6", "C7"]
+
+
+def test_gzip_chunks_form_one_member_flushed_per_chunk():
+    chunks = list(gzip_chunks(iter([b"a,b\n", b"1,2\n"])))
+
+    assert len(chunks) == 3
+    assert gzip.decompress(b"".join(chunks)) == b"a,b\n1,2\n"
+
+
+def test_export_rejects_bad_input(client):
+    assert client.get(f"/api/v1/export/scans?user_id={USER_ID}").status_code == 422
+    assert client.get(f"/api/v1/export/emails?user_id={USER_ID}&start_date=yesterday").status_code == 400
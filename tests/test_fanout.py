@@ -0,0 +1,40 @@
+import time
+
+import pytest
+
+from utils.fanout import fan_out
+
+
+def test_fan_out_runs_calls_concurrently():
+    def slow(value):
+        def call():
+            time.sleep(0.2)
+            return value
+        return call
+
+    started = time.perf_counter()
+    results = fan_out({"a": slow(1), "b": slow(2), "c": slow(3), "d": slow(4)})
+    elapsed = time.perf_counter() - started
+
+    assert results == {"a": 1, "b": 2, "c": 3, "d": 4}
+    assert elapsed < 0.6
+
+
+def test_fan_out_uses_defaults_for_failed_or_slow_calls():
+    def boom():
+        raise ValueError("backend down")
+
+    results = fan_out(
+        {"ok": lambda: 1, "failed": boom, "slow": lambda: time.sleep(0.5)},
+        timeout=0.1,
+        defaults={"failed": [], "slow": 0},
+    )
+    assert results == {"ok": 1, "failed": [], "slow": 0}
+
+
+def test_fan_out_raises_for_required_calls():
+    def boom():
+        raise ValueError("backend down")
+
+    with pytest.raises(ValueError):
+        fan_out({"ok": lambda: 1, "required": boom})
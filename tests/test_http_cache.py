@@ -0,0 +1,38 @@
+from utils.http_cache import DataVersions, matches
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_versions_move_on_writes_and_windows():
+    clock = Clock()
+    versions = DataVersions(window=30, clock=clock)
+    tag = versions.etag("u1", "/summary?")
+    assert versions.etag("u1", "/summary?") == tag
+    assert versions.etag("u2", "/summary?") != tag
+    assert versions.etag("u1", "/funnel?") != tag
+
+    versions.bump("u1")
+    bumped = versions.etag("u1", "/summary?")
+    assert bumped != tag
+    versions.bump("u1")  # same clock tick
+    assert versions.etag("u1", "/summary?") != bumped
+
+    settled = versions.etag("u1", "/summary?")
+    clock.now += 30
+    assert versions.etag("u1", "/summary?") != settled
+    assert not DataVersions(window=0).enabled
+
+
+def test_if_none_match_uses_weak_comparison():
+    assert matches('W/"abc"', 'W/"abc"')
+    assert matches('"abc"', 'W/"abc"')
+    assert matches('"x", W/"abc"', 'W/"abc"')
+    assert matches("*", 'W/"abc"')
+    assert not matches('"abcd"', 'W/"abc"')
+    assert not matches(None, 'W/"abc"')
@@ -0,0 +1,52 @@
+import threading
+
+import pytest
+
+from utils.jobs import FAILED, SUCCEEDED, JobQueue, QueueFull
+
+
+def test_failing_job_is_retried_until_it_succeeds():
+    queue = JobQueue(workers=1, max_pending=10, retention=60, backoff=0)
+    attempts = []
+
+    def flaky(job):
+        attempts.append(job.final_attempt)
+        if not job.final_attempt:
+            raise RuntimeError("transient")
+        return "ok"
+
+    job = queue.submit(flaky, "u1", max_attempts=3)
+
+    assert job.future.result(timeout=5) == "ok"
+    assert job.status == SUCCEEDED and job.attempts == 3
+    assert attempts == [False, False, True]
+    assert queue.stats()["retries"] == 2
+    queue.shutdown()
+
+
+def test_permanent_errors_are_not_retried(caplog):
+    queue = JobQueue(workers=1, max_pending=10, retention=60, backoff=0, permanent=(KeyError,))
+
+    def missing(job):
+        raise KeyError("meeting")
+
+    job = queue.submit(missing, "u1", max_attempts=3)
+
+    with pytest.raises(KeyError):
+        job.future.result(timeout=5)
+    assert job.status == FAILED and job.attempts == 1
+    assert f"Job {job.id}" in caplog.text and "KeyError: 'meeting'" in caplog.text
+    queue.shutdown()
+
+
+def test_submit_fails_fast_when_the_backlog_is_full():
+    queue = JobQueue(workers=1, max_pending=1, retention=60, backoff=0)
+    started, release = threading.Event(), threading.Event()
+    queue.submit(lambda job: started.set() or release.wait(5), "u1")
+    started.wait(5)
+    queue.submit(lambda job: None, "u1")
+
+    with pytest.raises(QueueFull):
+        queue.submit(lambda job: None, "u1")
+    release.set()
+    queue.shutdown()
@@ -0,0 +1,93 @@
+import threading
+import time
+
+import pytest
+
+from services import analytics_service
+from utils.llm_gateway import (
+    CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpen, DeadlineExceeded, FakeProvider, LLMGateway, Overloaded,
+)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _gateway(provider, max_concurrency=4, rate=1000.0, burst=1000, timeout=1.0, failures=3, clock=None):
+    breaker = CircuitBreaker(failures, reset_after=30, clock=clock or time.monotonic)
+    return LLMGateway(provider, max_concurrency, rate, burst, timeout, breaker, name="test")
+
+
+def test_concurrency_is_capped():
+    running, peak = [0], [0]
+    lock = threading.Lock()
+
+    def provider(prompt, timeout):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.02)
+        with lock:
+            running[0] -= 1
+        return prompt
+
+    gateway = _gateway(provider, max_concurrency=2)
+    threads = [threading.Thread(target=gateway.generate, args=(str(i),)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert peak[0] == 2 and gateway.stats()["succeeded"] == 8
+
+
+def test_rate_limit_and_deadline():
+    gateway = _gateway(FakeProvider("ok"), rate=1.0, burst=1, timeout=0.2)
+    assert gateway.generate("a") == "ok"
+    with pytest.raises(Overloaded):
+        gateway.generate("b")  # next token is a second away, past the deadline
+
+    slow = _gateway(FakeProvider("late", latency=1.0), timeout=0.05)
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        slow.generate("a")
+    assert time.monotonic() - started < 0.5
+    assert slow.stats()["timed_out"] == 1
+
+
+def test_circuit_opens_and_recovers_through_a_trial_call():
+    clock = Clock()
+    provider = FakeProvider([RuntimeError("503"), RuntimeError("503"), RuntimeError("503"), "ok"])
+    gateway = _gateway(provider, clock=clock)
+    for _ in range(3):
+        with pytest.raises(RuntimeError):
+            gateway.generate("x")
+    assert gateway.breaker.state == OPEN
+
+    with pytest.raises(CircuitOpen):
+        gateway.generate("x")
+    assert len(provider.prompts) == 3  # refused without calling the provider
+
+    clock.now += 30
+    assert gateway.breaker.allow() and gateway.breaker.state == HALF_OPEN
+    assert not gateway.breaker.allow()  # one trial at a time
+    clock.now += 30
+    assert gateway.generate("x") == "ok"
+    stats = gateway.stats()
+    assert stats["circuit"] == CLOSED and stats["circuit_trips"] == 1 and stats["circuit_open"] == 1
+    assert stats["latency_p50_seconds"] is not None
+
+
+def test_mom_analysis_falls_back_at_once_while_circuit_is_open(monkeypatch):
+    provider = FakeProvider(RuntimeError("unavailable"))
+    gateway = _gateway(provider, failures=1)
+    monkeypatch.setattr(analytics_service, "GEMINI_API_KEY", "test")
+    monkeypatch.setattr(analytics_service, "gemini", gateway)
+
+    for _ in range(3):
+        analysis = analytics_service.analyze_mom_with_ai("Budget approved, timeline Q3")
+        assert "Fallback simulation" in analysis["reasoning"]
+    assert len(provider.prompts) == 1 and gateway.stats()["circuit_open"] == 2
@@ -0,0 +1,48 @@
+from fastapi.testclient import TestClient
+
+from db.instrumentation import instrumented
+from db.repository import set_repository
+from utils.metrics import Registry
+
+
+def test_prometheus_text_format():
+    registry = Registry()
+    latency = registry.histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+    errors = registry.counter("errors_total", "Errors.", ("route",))
+    for value in (0.05, 0.5, 5.0):
+        latency.observe(value, "/a")
+    errors.inc('say "hi"\n')
+    registry.collector("queue", "Queue.", lambda: [("pending", {"name": "q"}, 3), ("oldest", {}, None)])
+
+    lines = registry.render().splitlines()
+    assert "# TYPE latency_seconds histogram" in lines
+    assert [line for line in lines if line.startswith("latency_seconds")] == [
+        'latency_seconds_bucket{route="/a",le="0.1"} 1',
+        'latency_seconds_bucket{route="/a",le="1"} 2',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 3',
+        'latency_seconds_sum{route="/a"} 5.55',
+        'latency_seconds_count{route="/a"} 3',
+    ]
+    assert 'errors_total{route="say \\"hi\\"\\n"} 1' in lines
+    assert 'queue_pending{name="q"} 3' in lines and not [line for line in lines if "oldest" in line]
+
+
+def test_metrics_endpoint_reports_routes_and_queries(sqlite_repo):
+    from main import app
+
+    set_repository(instrumented(sqlite_repo))
+    client = TestClient(app)
+    client.get("/health")
+    client.get("/api/v1/dashboard/summary?user_id=00000000-0000-0000-0000-000000000001")
+    client.get("/api/v1/export/unknown?user_id=00000000-0000-0000-0000-000000000001")
+    client.get("/no/such/path")
+
+    response = client.get("/metrics")
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    assert 'http_request_duration_seconds_count{method="GET",route="/health",status="200"}' in text
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/v1/export/{entity}",status="422"}' in text
+    assert 'route="unmatched",status="404"' in text
+    assert 'http_requests_in_flight{method="GET",route="/metrics"} 1' in text
+    assert 'db_query_duration_seconds_count{table="contacts",method="contact_outcome_histogram"}' in text
+    assert 'cache_misses{cache="analytics"}' in text and 'llm_circuit_open{provider="gemini"} 0' in text
@@ -0,0 +1,652 @@
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from models.dashboard_model import MeetingMoMCreate
+from services import analytics_service
+
+USER_ID = uuid.UUID("00000000-0000-0000-0000-000000000001")
+NOW = datetime.now(timezone.utc)
+
+
+def _seed(repo):
+    contacts = [
+        {"contact_id": str(uuid.uuid4()), "user_id": str(USER_ID), "first_name": "Ada", "last_name": "Lovelace",
+         "email": "ada@example.com", "created_at": NOW - timedelta(days=40), "outcome": "HOT",
+         "next_follow_up_due_at": NOW - timedelta(days=1)},
+        {"contact_id": str(uuid.uuid4()), "user_id": str(USER_ID), "first_name": "Alan", "last_name": "Turing",
+         "email": "alan@example.com", "created_at": NOW - timedelta(days=2), "last_outcome_status": "WARM"},
+        {"contact_id": str(uuid.uuid4()), "user_id": str(USER_ID), "first_name": "Grace", "last_name": "Hopper",
+         "email": "grace@example.com", "created_at": NOW - timedelta(days=1), "outcome": None},
+    ]
+    meetings = [
+        {"meeting_id": str(uuid.uuid4()), "user_id": str(USER_ID), "contact_id": contacts[0]["contact_id"],
+         "scheduled_at": NOW - timedelta(days=1), "status": "COMPLETED", "mom_exists": True},
+        {"meeting_id": str(uuid.uuid4()), "user_id": str(USER_ID), "contact_id": contacts[1]["contact_id"],
+         "scheduled_at": NOW - timedelta(days=1), "status": "COMPLETED", "mom_exists": False},
+        {"meeting_id": str(uuid.uuid4()), "user_id": str(USER_ID), "contact_id": contacts[2]["contact_id"],
+         "scheduled_at": NOW - timedelta(days=1), "status": "CANCELLED", "mom_exists": False},
+        {"meeting_id": str(uuid.uuid4()), "user_id": str(USER_ID), "contact_id": contacts[1]["contact_id"],
+         "scheduled_at": NOW + timedelta(days=1), "status": "SCHEDULED", "mom_exists": False},
+    ]
+    emails = [
+        {"email_id": str(uuid.uuid4()), "user_id": str(USER_ID), "status": "DRAFTED", "drafted_at": NOW - timedelta(days=1)},
+        {"email_id": str(uuid.uuid4()), "user_id": str(USER_ID), "status": "SENT", "drafted_at": NOW - timedelta(days=1)},
+    ]
+    repo.insert_rows("contacts", contacts)
+    repo.insert_rows("meetings", meetings)
+    repo.insert_rows("emails", emails)
+    return contacts, meetings, emails
+
+
+def _range():
+    return (NOW - timedelta(days=7)).date().isoformat(), (NOW + timedelta(days=1)).date().isoformat()
+
+
+def test_dashboard_summary_on_sqlite(sqlite_repo):
+    _seed(sqlite_repo)
+    start, end = _range()
+    summary = analytics_service.get_dashboard_summary(USER_ID, start, end)
+
+    assert summary.total_leads == 3
+    assert summary.qualified_leads == 2
+    assert summary.converted_leads == 1
+    assert summary.overdue_followups_count == 1
+    assert summary.cancelled_count == 1
+    assert summary.mom_coverage_percent == 50.0
+    assert summary.funnel_breakdown.emails_sent == 1
+    # The only contact older than 30 days is HOT
+    assert summary.conversion_rate_change == round(100 / 3 - 100)
+
+
+def test_funnel_view_on_sqlite(sqlite_repo):
+    _seed(sqlite_repo)
+    start, end = _range()
+    funnel = analytics_service.get_funnel_view(USER_ID, start, end)
+
+    assert funnel.contacts_captured == 2
+    # The end date is inclusive: tomorrow's meeting is in range
+    assert funnel.meetings_scheduled == 4
+    assert funnel.meetings_completed == 2
+    assert funnel.qualified_contacts == 1
+    assert funnel.emails_drafted == 1
+
+
+def test_search_and_upcoming_on_sqlite(sqlite_repo):
+    _seed(sqlite_repo)
+    result = analytics_service.search_global("gra", USER_ID)
+    assert [c.first_name for c in result.contacts] == ["Grace"]
+    assert [c.first_name for c in analytics_service.search_global("a", USER_ID, limit=1).contacts] == ["Ada"]
+
+    upcoming = analytics_service.get_upcoming_meetings(USER_ID)
+    assert [m.contact_name for m in upcoming] == ["Alan Turing"]
+
+
+def test_contact_index_loads_every_page_past_the_row_cap(sqlite_repo, monkeypatch):
+    from services import contact_search
+
+    sqlite_repo.insert_rows("contacts", [
+        {"contact_id": str(uuid.uuid4()), "user_id": str(USER_ID), "first_name": f"Zed{i}",
+         "created_at": NOW - timedelta(hours=i)} for i in range(7)
+    ])
+    # Unpaged reads stop at the cap like PostgREST's max-rows; pages of 3 need three requests
+    list_contacts = sqlite_repo.list_contacts
+    monkeypatch.setattr(sqlite_repo, "list_contacts", lambda *a, **k: list_contacts(*a, **k)[:2])
+    monkeypatch.setattr(contact_search, "CONTACT_INDEX_CHUNK_SIZE", 3)
+
+    found = contact_search.search_contacts(str(USER_ID), "zed", 20)
+    assert sorted(c["first_name"] for c in found) == [f"Zed{i}" for i in range(7)]
+
+
+def test_analyze_and_save_mom_on_sqlite(sqlite_repo, monkeypatch):
+    contacts, meetings, _ = _seed(sqlite_repo)
+    monkeypatch.setattr(analytics_service, "analyze_mom_with_ai", lambda text: {
+        "score": 90, "status": "HOT", "reasoning": "test", "deal_breakers_found": False,
+    })
+    meeting_id = meetings[1]["meeting_id"]
+    result = analytics_service.analyze_and_save_mom(
+        MeetingMoMCreate(meeting_id=meeting_id, mom_text="Budget approved, timeline Q3"), USER_ID
+    )
+
+    assert result["new_contact_status"] == "HOT"
+    assert sqlite_repo.get_meeting(meeting_id, "mom_exists")["mom_exists"] is True
+    contact = sqlite_repo.list_contacts(str(USER_ID), "contact_id, outcome, last_outcome_status")
+    updated = [c for c in contact if c["contact_id"] == contacts[1]["contact_id"]][0]
+    assert updated["outcome"] == "HOT" and updated["last_outcome_status"] == "HOT"
+
+
+def test_sqlite_aggregates_match_row_shipping_defaults(sqlite_repo):
+    from db.repository import Repository
+
+    _seed(sqlite_repo)
+    start, end = _range()
+    cutoff = (NOW - timedelta(days=30)).isoformat()
+    uid = str(USER_ID)
+
+    def norm(rows):
+        return sorted(repr(sorted(r.items())) for r in rows)
+
+    assert norm(sqlite_repo.contact_outcome_histogram(uid, cutoff=cutoff)) == \
+        norm(Repository.contact_outcome_histogram(sqlite_repo, uid, cutoff=cutoff))
+    assert norm(sqlite_repo.meeting_status_histogram(uid, start, end)) == \
+        norm(Repository.meeting_status_histogram(sqlite_repo, uid, start, end))
+    assert norm(sqlite_repo.email_status_histogram(uid, start, end)) == \
+        norm(Repository.email_status_histogram(sqlite_repo, uid, start, end))
+    assert sqlite_repo.count_overdue_contacts(uid, NOW.isoformat()) == \
+        Repository.count_overdue_contacts(sqlite_repo, uid, NOW.isoformat())
+
+
+def test_summary_and_funnel_share_metrics(sqlite_repo):
+    _seed(sqlite_repo)
+    start, end = _range()
+    summary = analytics_service.get_dashboard_summary(USER_ID, start, end).funnel_breakdown
+    funnel = analytics_service.get_funnel_view(USER_ID, start, end)
+
+    # Meetings and emails come from the same ranged histograms on both endpoints
+    for field in ("meetings_scheduled", "meetings_completed", "emails_drafted", "emails_sent"):
+        assert getattr(summary, field) == getattr(funnel, field)
+
+
+def test_saving_mom_invalidates_cached_summary(sqlite_repo, monkeypatch):
+    _, meetings, _ = _seed(sqlite_repo)
+    monkeypatch.setattr(analytics_service, "analyze_mom_with_ai", lambda text: {
+        "score": 90, "status": "HOT", "reasoning": "test", "deal_breakers_found": False,
+    })
+    monkeypatch.setattr(analytics_service.analytics_cache, "ttl", 60)
+    start, end = _range()
+    assert analytics_service.get_dashboard_summary(USER_ID, start, end).mom_coverage_percent == 50.0
+
+    analytics_service.analyze_and_save_mom(
+        MeetingMoMCreate(meeting_id=meetings[1]["meeting_id"], mom_text="Budget approved"), USER_ID
+    )
+    assert analytics_service.get_dashboard_summary(USER_ID, start, end).mom_coverage_percent == 100.0
+
+
+def test_rollups_match_raw_tables(sqlite_repo):
+    contacts, meetings, _ = _seed(sqlite_repo)
+    start, end = _range()
+    raw_summary = analytics_service.get_dashboard_summary(USER_ID, start, end)
+    raw_funnel = analytics_service.get_funnel_view(USER_ID, start, end)
+
+    # Writes after seeding are picked up by the triggers
+    sqlite_repo.update_meeting(meetings[1]["meeting_id"], str(USER_ID), {"mom_exists": True})
+    sqlite_repo.update_contact(contacts[2]["contact_id"], {"outcome": "WARM"})
+    sqlite_repo.update_meeting(meetings[1]["meeting_id"], str(USER_ID), {"mom_exists": False})
+    sqlite_repo.update_contact(contacts[2]["contact_id"], {"outcome": None})
+
+    sqlite_repo.daily_rollups = True
+    analytics_service.analytics_cache.clear()
+    assert analytics_service.get_dashboard_summary(USER_ID, start, end) == raw_summary
+    assert analytics_service.get_funnel_view(USER_ID, start, end) == raw_funnel
+
+    assert sqlite_repo.rebuild_daily_rollups(str(USER_ID)) > 0
+    analytics_service.analytics_cache.clear()
+    assert analytics_service.get_dashboard_summary(USER_ID, start, end) == raw_summary
+
+
+def test_default_rollup_histogram_answers_from_raw_tables(sqlite_repo):
+    from db.repository import Repository
+
+    _seed(sqlite_repo)
+    start, end = _range()
+    cutoff = (NOW - timedelta(days=3)).date().isoformat()
+
+    def rows(histogram):
+        return sorted((sorted(r.items()) for r in histogram), key=repr)
+
+    for source, cutoff_day in (("contacts", None), ("contacts", cutoff), ("meetings", None), ("emails", None)):
+        default = Repository.rollup_histogram(sqlite_repo, str(USER_ID), source, start, end, cutoff_day)
+        assert rows(default) == rows(sqlite_repo.rollup_histogram(str(USER_ID), source, start, end, cutoff_day))
+    assert Repository.rebuild_daily_rollups(sqlite_repo) == 0
+
+
+def test_industry_distribution_top_n_and_day_buckets(sqlite_repo):
+    from db.instrumentation import InstrumentedRepository, QueryStats
+    from db.repository import set_repository
+    from utils.cache import industry_day_cache
+
+    industries = ["Retail"] * 4 + ["Finance"] * 3 + ["Health"] * 2 + ["Energy", None]
+    sqlite_repo.insert_rows("customer_scanned_data", [
+        {"id": str(uuid.uuid4()), "industry": industry, "created_at": NOW - timedelta(days=i % 5)}
+        for i, industry in enumerate(industries)
+    ])
+    repo = InstrumentedRepository(sqlite_repo)
+    stats = QueryStats()
+    repo.add_listener(stats)
+    set_repository(repo)
+    start, end = (NOW - timedelta(days=7)).date().isoformat(), NOW.date().isoformat()
+
+    full = analytics_service.get_industry_distribution(start, end)
+    assert [(s.industry, s.count) for s in full] == \
+        [("Retail", 4), ("Finance", 3), ("Health", 2), ("Energy", 1), (None, 1)]
+    raw = sqlite_repo.industry_histogram(start, analytics_service.end_of_day(end))
+    assert sorted(s.count for s in full) == sorted(r["count"] for r in raw)
+
+    top = analytics_service.get_industry_distribution(start, end, top_n=2)
+    assert [(s.industry, s.count) for s in top] == [("Retail", 4), ("Finance", 3), ("Other", 4)]
+
+    # Past days were cached by the first call; only today is queried again
+    assert industry_day_cache.stats()["entries"] == 7
+    stats.reset()
+    analytics_service.get_industry_distribution(start, end)
+    assert stats.round_trips == 1
+
+
+def test_daily_scans_are_ranged_and_cached_per_day(sqlite_repo):
+    from db.instrumentation import InstrumentedRepository, QueryStats
+    from db.repository import set_repository
+
+    sqlite_repo.insert_rows("customer_scanned_data", [
+        {"id": str(uuid.uuid4()), "industry": "Retail", "created_at": NOW - timedelta(days=days)}
+        for days in (0, 0, 1, 3, 3, 3, 40)
+    ])
+    repo = InstrumentedRepository(sqlite_repo)
+    stats = QueryStats()
+    repo.add_listener(stats)
+    set_repository(repo)
+    start, end = (NOW - timedelta(days=7)).date().isoformat(), NOW.date().isoformat()
+
+    scans = analytics_service.get_daily_scans(start, end)
+    assert [(s.date, s.count) for s in scans] == [
+        ((NOW - timedelta(days=3)).date(), 3), ((NOW - timedelta(days=1)).date(), 1), (NOW.date(), 2),
+    ]
+
+    # Only today is counted again, and only today's rows are scanned
+    sqlite_repo.insert_rows("customer_scanned_data", [
+        {"id": str(uuid.uuid4()), "industry": "Retail", "created_at": NOW}
+    ])
+    stats.reset()
+    scans = analytics_service.get_daily_scans(start, end)
+    assert scans[-1].count == 3
+    assert stats.round_trips == 1 and stats.rows == 1
+
+
+def test_contacts_are_keyset_paged_and_streamed(sqlite_repo):
+    from fastapi.testclient import TestClient
+    from main import app
+
+    contacts, _, _ = _seed(sqlite_repo)
+    # A NULL timestamp sorts first, as postgres orders DESC
+    sqlite_repo.insert_rows("contacts", [{"contact_id": str(uuid.uuid4()), "user_id": str(USER_ID),
+                                          "first_name": "Linus", "created_at": None}])
+    client = TestClient(app)
+
+    names, cursor = [], None
+    while True:
+        params = {"user_id": str(USER_ID), "limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/api/v1/contacts", params=params)
+        names += [c["first_name"] for c in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert names == ["Linus", "Grace", "Alan", "Ada"]
+
+    response = client.get("/api/v1/contacts", params={"user_id": str(USER_ID), "stream": "true"})
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert [json.loads(line)["first_name"] for line in response.text.splitlines()] == names
+
+    response = client.get("/api/v1/contacts", params={"user_id": str(USER_ID), "cursor": "bogus"})
+    assert response.status_code == 400
+
+
+def test_completed_meetings_page_through_ties(sqlite_repo, monkeypatch):
+    _, meetings, _ = _seed(sqlite_repo)
+    monkeypatch.setattr(analytics_service, "STREAM_CHUNK_SIZE", 1)
+    # Both completed meetings share scheduled_at: the id breaks the tie
+    first = analytics_service.get_completed_meetings(USER_ID, limit=1)
+    second = analytics_service.get_completed_meetings(USER_ID, limit=1, cursor=first.next_cursor)
+
+    completed = {m["meeting_id"] for m in meetings if m["status"] == "COMPLETED"}
+    assert {str(m.meeting_id) for m in first.items + second.items} == completed
+    assert second.next_cursor is None
+
+    streamed = b"".join(analytics_service.stream_completed_meetings(USER_ID)).splitlines()
+    assert {json.loads(line)["meeting_id"] for line in streamed} == completed
+
+
+def test_mom_analysis_runs_as_a_background_job(sqlite_repo, monkeypatch):
+    from fastapi.testclient import TestClient
+    from main import app
+    from services import mom_jobs
+
+    _, meetings, _ = _seed(sqlite_repo)
+    monkeypatch.setattr(analytics_service, "analyze_mom_with_ai", lambda text: {
+        "score": 20, "status": "COLD", "reasoning": "test", "deal_breakers_found": True,
+    })
+    client = TestClient(app)
+    body = {"meeting_id": meetings[1]["meeting_id"], "mom_text": "No budget this year at all"}
+
+    response = client.post(f"/api/v1/meetings/mom?user_id={USER_ID}&async=true", json=body)
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+    mom_jobs.mom_queue.get(job_id).future.result(timeout=5)
+
+    status = client.get(response.headers["location"]).json()
+    assert status["status"] == "succeeded" and status["attempts"] == 1
+    assert status["result"]["new_contact_status"] == "LOST"
+    assert client.get(f"/api/v1/meetings/mom/jobs/{job_id}?user_id={uuid.uuid4()}").status_code == 404
+
+    missing = {"meeting_id": str(uuid.uuid4()), "mom_text": "Meeting that never happened"}
+    assert client.post(f"/api/v1/meetings/mom?user_id={USER_ID}", json=missing).status_code == 404
+
+    # The synchronous mode stays off the job queue: it works with the queue
+    # full and leaves no job behind
+    def full(*args, **kwargs):
+        raise mom_jobs.QueueFull("full")
+    monkeypatch.setattr(mom_jobs.mom_queue, "submit", full)
+    assert client.post(f"/api/v1/meetings/mom?user_id={USER_ID}&async=true", json=body).status_code == 503
+    response = client.post(f"/api/v1/meetings/mom?user_id={USER_ID}", json=body)
+    assert response.status_code == 200 and response.json()["new_contact_status"] == "LOST"
+
+
+def test_mom_batch_packs_model_calls_and_writes_in_bulk(sqlite_repo, monkeypatch):
+    from fastapi.testclient import TestClient
+    from db.instrumentation import InstrumentedRepository, QueryStats
+    from db.repository import set_repository
+    from main import app
+
+    contacts, meetings, _ = _seed(sqlite_repo)
+    packs = []
+
+    def batch(texts):
+        packs.append(len(texts))
+        return [{"score": 90 if "budget" in t else 30, "status": "HOT", "reasoning": t,
+                 "deal_breakers_found": False} for t in texts]
+
+    monkeypatch.setattr(analytics_service, "GEMINI_API_KEY", "test")
+    monkeypatch.setattr(analytics_service, "MOM_BATCH_PACK_SIZE", 2)
+    monkeypatch.setattr(analytics_service, "gemini_mom_batch_analysis", batch)
+    repo = InstrumentedRepository(sqlite_repo)
+    stats = QueryStats()
+    repo.add_listener(stats)
+    set_repository(repo)
+
+    items = [
+        {"meeting_id": meetings[1]["meeting_id"], "mom_text": "First pass, no decision"},
+        {"meeting_id": meetings[0]["meeting_id"], "mom_text": "budget approved"},
+        {"meeting_id": meetings[3]["meeting_id"], "mom_text": "budget approved for Q3"},
+        {"meeting_id": meetings[1]["meeting_id"], "mom_text": "budget confirmed"},
+        {"meeting_id": str(uuid.uuid4()), "mom_text": "Meeting that never happened"},
+    ]
+    response = TestClient(app).post(f"/api/v1/meetings/mom/batch?user_id={USER_ID}", json={"items": items})
+    assert response.status_code == 200
+    body = response.json()
+
+    # Duplicate meeting collapsed to its last MoM, unknown meeting reported
+    assert sorted(packs) == [1, 2]
+    assert [r.get("error") for r in body["results"]] == [None, None, None, "Meeting not found"]
+    assert body["results"][0]["analysis"]["reasoning"] == "budget confirmed"
+    # lookup, meetings, scores, contacts: four round trips for the whole batch
+    assert stats.round_trips == 4
+
+    outcomes = {c["contact_id"]: c["new_contact_status"] for c in body["contacts"]}
+    assert outcomes == {contacts[0]["contact_id"]: "HOT", contacts[1]["contact_id"]: "HOT"}
+    saved = {c["contact_id"]: c["outcome"] for c in sqlite_repo.list_contacts(str(USER_ID), "contact_id, outcome")}
+    assert saved[contacts[1]["contact_id"]] == "HOT"
+
+
+def test_unpack_mom_batch_requires_every_analysis():
+    import pytest
+
+    row = {"score": 50, "status": "WARM", "reasoning": "ok", "deal_breakers_found": False}
+    unpacked = analytics_service.unpack_mom_batch([{"id": 2, **row, "extra": 1}, {"id": 1, **row, "score": 10}], 2)
+    assert [a["score"] for a in unpacked] == [10, 50] and "extra" not in unpacked[0]
+    for results in ({"id": 1, **row}, [{"id": 1, **row}], [{"id": 1, **row}, {"id": 3, **row}]):
+        with pytest.raises(ValueError):
+            analytics_service.unpack_mom_batch(results, 2)
+
+
+def test_fast_endpoints_match_the_model_path(sqlite_repo, monkeypatch):
+    from fastapi.testclient import TestClient
+    from routers import analytics_router
+
+    _seed(sqlite_repo)
+    client = TestClient(analytics_router.router)
+    urls = [f"/api/v1/contacts?user_id={USER_ID}", f"/api/v1/contacts?user_id={USER_ID}&limit=2",
+            f"/api/v1/search?user_id={USER_ID}&query=a"]
+
+    fast = [client.get(url) for url in urls]
+    monkeypatch.setattr(analytics_router, "FAST_JSON_RESPONSES", False)
+    slow = [client.get(url) for url in urls]
+
+    for f, s in zip(fast, slow):
+        assert f.status_code == 200 and f.headers["content-type"] == "application/json"
+        assert json.loads(f.content) == json.loads(s.content)
+        assert f.headers.get("x-next-cursor") == s.headers.get("x-next-cursor")
+    assert fast[1].headers["x-next-cursor"]
+
+
+def test_concurrent_industry_requests_share_one_query(sqlite_repo, monkeypatch):
+    import threading
+    from db.instrumentation import InstrumentedRepository, QueryStats
+    from db.repository import set_repository
+
+    repo = InstrumentedRepository(sqlite_repo)
+    stats = QueryStats()
+    repo.add_listener(stats)
+    set_repository(repo)
+    flights = analytics_service.shared_flights
+    before = flights.stats()["coalesced"]
+    query = sqlite_repo.industry_daily_histogram
+
+    def slow_query(*args):
+        # Hold the first query until every other caller has joined it
+        for _ in range(5000):
+            if flights.stats()["coalesced"] - before >= 4:
+                break
+            threading.Event().wait(0.001)
+        return query(*args)
+
+    monkeypatch.setattr(sqlite_repo, "industry_daily_histogram", slow_query)
+    start, end = _range()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(
+        analytics_service.get_industry_distribution(start, end))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+
+    assert len(results) == 5 and all(r == results[0] for r in results)
+    assert stats.round_trips == 1
+
+
+def test_analytics_revalidation_skips_the_backend_until_a_write(sqlite_repo, monkeypatch):
+    from fastapi.testclient import TestClient
+    from db.instrumentation import InstrumentedRepository, QueryStats
+    from db.repository import set_repository
+    from routers import analytics_router
+
+    _, meetings, _ = _seed(sqlite_repo)
+    repo = InstrumentedRepository(sqlite_repo)
+    stats = QueryStats()
+    repo.add_listener(stats)
+    set_repository(repo)
+    monkeypatch.setattr(analytics_service, "analyze_mom_with_ai", lambda text: {
+        "score": 90, "status": "HOT", "reasoning": "test", "deal_breakers_found": False,
+    })
+    monkeypatch.setattr(analytics_service.data_versions, "window", 3600)
+    client = TestClient(analytics_router.router)
+    url = f"/api/v1/dashboard/summary?user_id={USER_ID}"
+
+    first = client.get(url)
+    etag = first.headers["etag"]
+    assert first.status_code == 200 and first.headers["cache-control"].startswith("private")
+    calls = stats.round_trips
+    again = client.get(url, headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.content == b"" and again.headers["etag"] == etag
+    assert stats.round_trips == calls
+    assert client.get(f"/api/v1/analytics/funnel?user_id={USER_ID}", headers={"If-None-Match": etag}).status_code == 200
+
+    analytics_service.analyze_and_save_mom(
+        MeetingMoMCreate(meeting_id=meetings[1]["meeting_id"], mom_text="Budget approved"), USER_ID
+    )
+    changed = client.get(url, headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+    assert changed.json()["mom_coverage_percent"] == 100.0
+
+
+def test_composite_dashboard_shares_queries_across_sections(sqlite_repo):
+    from fastapi.testclient import TestClient
+    from db.instrumentation import InstrumentedRepository, QueryStats
+    from db.repository import set_repository
+    from routers import analytics_router
+
+    _seed(sqlite_repo)
+    repo = InstrumentedRepository(sqlite_repo)
+    stats = QueryStats()
+    repo.add_listener(stats)
+    set_repository(repo)
+    client = TestClient(analytics_router.router)
+    start, end = _range()
+    dates = f"user_id={USER_ID}&preset=CUSTOM&start_date={start}&end_date={end}"
+
+    page = client.get(f"/api/v1/dashboard?{dates}&limit=1")
+    assert page.status_code == 200
+    assert stats.round_trips == 8  # ten across the five separate endpoints
+    body = page.json()
+
+    analytics_service.analytics_cache.clear()
+    separate = {
+        "summary": client.get(f"/api/v1/dashboard/summary?{dates}").json(),
+        "funnel": client.get(f"/api/v1/analytics/funnel?{dates}").json(),
+        "upcoming_meetings": client.get(f"/api/v1/meetings/upcoming?user_id={USER_ID}").json(),
+        "completed_meetings": client.get(f"/api/v1/meetings/completed?user_id={USER_ID}&limit=1").json(),
+        "drafted_emails": client.get(f"/api/v1/emails/drafted?user_id={USER_ID}&limit=1").json(),
+    }
+    for section, expected in separate.items():
+        assert body[section] == expected, section
+    assert body["completed_meetings_next_cursor"] and body["drafted_emails_next_cursor"]
+
+    only = client.get(f"/api/v1/dashboard?{dates}&sections=funnel&sections=upcoming").json()
+    assert only["funnel"] == body["funnel"] and only["summary"] is None and only["drafted_emails"] is None
+
+
+def test_team_summary_is_two_grouped_queries(sqlite_repo):
+    from fastapi.testclient import TestClient
+    from db.instrumentation import InstrumentedRepository, QueryStats
+    from db.repository import Repository, set_repository
+    from routers import analytics_router
+
+    _seed(sqlite_repo)
+    other, idle = uuid.UUID(int=2), uuid.UUID(int=3)
+    sqlite_repo.insert_rows("contacts", [
+        {"contact_id": str(uuid.uuid4()), "user_id": str(other), "created_at": NOW - timedelta(days=i)}
+        for i in range(5)
+    ])
+    repo = InstrumentedRepository(sqlite_repo)
+    stats = QueryStats()
+    repo.add_listener(stats)
+    set_repository(repo)
+    start, end = _range()
+    dates = f"preset=CUSTOM&start_date={start}&end_date={end}"
+    members = {"user_ids": [str(idle), str(USER_ID), str(other)]}
+
+    team = TestClient(analytics_router.router).post(f"/api/v1/team/summary?{dates}", json=members).json()
+    assert stats.round_trips == 2
+    assert [(t["user_id"], t["contacts_captured"], t["meetings_completed"], t["overdue_followups"]) for t in team] == [
+        (str(other), 5, 0, 0), (str(USER_ID), 2, 2, 1), (str(idle), 0, 0, 0)]
+
+    top = analytics_service.get_team_summary(members["user_ids"], start, end, "meetings_completed", top_n=1)
+    assert [t.user_id for t in top] == [USER_ID]
+
+    # The grouped query agrees with the per-member default
+    args = (members["user_ids"], start, analytics_service.end_of_day(end), NOW.isoformat())
+    by_user = lambda rows: {r["user_id"]: r for r in rows if r["contacts"] or r["overdue"]}
+    assert by_user(sqlite_repo.team_contact_counts(*args)) == by_user(Repository.team_contact_counts(sqlite_repo, *args))
+
+
+def test_trends_bucket_three_queries_like_per_period_funnels(sqlite_repo):
+    from benchmarks.seed import seed_user
+    from db.instrumentation import InstrumentedRepository, QueryStats
+    from db.repository import set_repository
+
+    seed_user(sqlite_repo, str(USER_ID), 400, seed=5)
+    repo = InstrumentedRepository(sqlite_repo)
+    stats = QueryStats()
+    repo.add_listener(stats)
+    set_repository(repo)
+    today = NOW.date()
+    start, end = (today - timedelta(days=120)).isoformat(), today.isoformat()
+
+    series = analytics_service.get_trends(USER_ID, start, end, "month")
+    assert stats.round_trips == 3
+    assert series.points[0].period_start.isoformat() == start and series.points[-1].period_end == today
+    assert series.points[0].change is None
+    assert series.points[1].change["contacts_captured"] == (
+        series.points[1].contacts_captured - series.points[0].contacts_captured)
+
+    for point in series.points:
+        funnel = analytics_service._compute_funnel_view(
+            USER_ID, point.period_start.isoformat(), point.period_end.isoformat())
+        assert (point.contacts_captured, point.meetings_scheduled, point.meetings_completed, point.emails_drafted,
+                point.emails_sent, point.qualified_contacts, point.positive_outcomes) == (
+            funnel.contacts_captured, funnel.meetings_scheduled, funnel.meetings_completed, funnel.emails_drafted,
+            funnel.emails_sent, funnel.qualified_contacts, funnel.positive_outcomes)
+    assert sum(p.contacts_captured for p in series.points) > 0
+
+
+def test_period_starts_align_to_weeks_and_months():
+    from datetime import date
+    from models.dashboard_model import TrendBucket
+
+    first, last = date(2026, 1, 14), date(2026, 3, 2)
+    assert analytics_service.period_starts(first, last, TrendBucket.MONTH) == [
+        date(2026, 1, 14), date(2026, 2, 1), date(2026, 3, 1)]
+    weeks = analytics_service.period_starts(first, last, TrendBucket.WEEK)
+    assert weeks[0] == first and weeks[1] == date(2026, 1, 19) and weeks[-1] == date(2026, 3, 2)
+    assert len(analytics_service.period_starts(first, first, TrendBucket.DAY)) == 1
+
+
+def test_trends_read_every_page_past_the_row_cap(sqlite_repo, monkeypatch):
+    from benchmarks.seed import seed_user
+
+    seed_user(sqlite_repo, str(USER_ID), 300, seed=6)
+    # Unpaged reads stop at the cap like PostgREST's max-rows
+    for name in ("list_contacts", "list_meetings", "list_emails"):
+        unpaged = getattr(sqlite_repo, name)
+        monkeypatch.setattr(sqlite_repo, name, lambda *a, _unpaged=unpaged, **k: _unpaged(*a, **k)[:2])
+    monkeypatch.setattr(analytics_service, "TREND_CHUNK_SIZE", 64)
+    today = NOW.date()
+
+    series = analytics_service.get_trends(USER_ID, (today - timedelta(days=90)).isoformat(), today.isoformat(), "month")
+    for point in series.points:
+        funnel = analytics_service._compute_funnel_view(
+            USER_ID, point.period_start.isoformat(), point.period_end.isoformat())
+        assert (point.contacts_captured, point.meetings_scheduled, point.emails_drafted + point.emails_sent) == (
+            funnel.contacts_captured, funnel.meetings_scheduled, funnel.emails_drafted + funnel.emails_sent)
+    assert sum(p.contacts_captured for p in series.points) > 64
+
+
+def test_postgres_warmup_arguments_match_no_rows():
+    import asyncio
+
+    from db.postgres_repository import AGGREGATE_STATEMENTS, prepare_aggregates
+
+    calls = []
+
+    class Connection:
+        async def fetch(self, sql, *args):
+            calls.append((sql, args))
+
+    asyncio.run(prepare_aggregates(Connection()))
+
+    assert [sql for sql, _ in calls] == list(AGGREGATE_STATEMENTS.values())
+    for sql, args in calls:
+        if "$1::timestamptz IS NULL" in sql:
+            # optional bounds: only an empty range matches nothing
+            assert args[0] > args[1]
+        else:
+            # NULL in a required filter ($1 = owner or lower bound)
+            assert args[0] is None
+
+
+def test_list_fetch_failures_are_logged_with_traceback(sqlite_repo, monkeypatch, caplog):
+    def broken(*args, **kwargs):
+        raise RuntimeError("backend down")
+
+    monkeypatch.setattr(sqlite_repo, "list_recent_emails", broken)
+
+    assert analytics_service.get_drafted_emails(USER_ID).items == []
+    [record] = [r for r in caplog.records if r.name == "services.analytics_service"]
+    assert record.getMessage() == "Error fetching drafted emails" and record.exc_info[1].args == ("backend down",)
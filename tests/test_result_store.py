@@ -0,0 +1,83 @@
+import re
+
+from services import analytics_service
+from utils import result_store
+from utils.result_store import ResultStore, content_key
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_results_are_shared_between_processes_and_expire(tmp_path):
+    clock = Clock()
+    path = str(tmp_path / "cache" / "results.sqlite3")
+    worker_a = ResultStore(path, max_entries=10, max_age=60, clock=clock)
+    worker_b = ResultStore(path, max_entries=10, max_age=60, clock=clock)
+
+    worker_a.set("k", {"score": 80})
+    assert worker_b.get("k") == (True, {"score": 80})
+    assert worker_b.get("other") == (False, None)
+    assert worker_b.stats()["hit_ratio"] == 0.5 and worker_b.stats()["entries"] == 1
+
+    clock.now += 61
+    assert worker_a.get("k") == (False, None)
+    assert worker_a.prune() == 1
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, monkeypatch):
+    monkeypatch.setattr(result_store, "TOUCH_INTERVAL_SECONDS", 0)
+    clock = Clock()
+    store = ResultStore(str(tmp_path / "results.sqlite3"), max_entries=2, max_age=3600, clock=clock)
+    for key in ("a", "b"):
+        store.set(key, key)
+        clock.now += 1
+    store.get("a")
+    clock.now += 1
+    store.set("c", "c")
+
+    assert store.prune() == 1
+    assert [store.get(k)[0] for k in ("a", "b", "c")] == [True, False, True]
+
+
+def test_unusable_store_is_a_miss(tmp_path):
+    store = ResultStore(str(tmp_path), max_entries=10, max_age=60)  # a directory
+    assert store.get_or_compute("k", lambda: 1) == 1
+    assert store.stats()["errors"] == 2
+    assert not ResultStore("", max_entries=10, max_age=60).enabled
+
+
+def test_mom_analyses_are_cached_by_normalized_text(tmp_path, monkeypatch):
+    store = ResultStore(str(tmp_path / "mom.sqlite3"), max_entries=100, max_age=3600)
+    monkeypatch.setattr(analytics_service, "mom_cache", store)
+    prompts = []
+
+    def gemini(prompt):
+        prompts.append(prompt)
+        if prompt.startswith(analytics_service.MOM_BATCH_PROMPT):
+            return [{"id": i, "score": 70, "status": "WARM", "reasoning": "batch", "deal_breakers_found": False}
+                    for i in range(1, len(re.findall(r"^MoM \d+:", prompt, re.M)) + 1)]
+        return {"score": 90, "status": "HOT", "reasoning": "single", "deal_breakers_found": False, "extra": 1}
+
+    monkeypatch.setattr(analytics_service, "_gemini_json", gemini)
+
+    first = analytics_service.gemini_mom_analysis("Budget approved,  timeline Q3")
+    again = analytics_service.gemini_mom_analysis("  Budget approved, timeline\nQ3 ")
+    assert first == again and "extra" not in first and len(prompts) == 1
+    assert analytics_service.gemini_mom_analysis("Budget approved, timeline Q4")["score"] == 90
+    assert len(prompts) == 2
+
+    # Batches only send the MoMs they have no analysis for
+    analytics_service.gemini_mom_batch_analysis(["Needs a demo first"])
+    batch = analytics_service.gemini_mom_batch_analysis(["Needs a demo first", "No budget this year"])
+    assert [a["reasoning"] for a in batch] == ["batch", "batch"]
+    assert len(prompts) == 4 and "Needs a demo" not in prompts[-1]
+    assert store.stats()["hits"] == 2
+
+
+def test_content_key_separates_parts():
+    assert content_key("ab", "c") != content_key("a", "bc")
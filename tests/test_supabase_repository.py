@@ -0,0 +1,172 @@
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+from postgrest.exceptions import APIError
+
+from db.instrumentation import instrumented
+from db.supabase_repository import SupabaseRepository
+from utils.tracing import Trace, current_trace
+
+
+@contextmanager
+def traced():
+    trace = Trace("GET", "/test", "/test")
+    token = current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        current_trace.reset(token)
+
+
+class FakeQuery:
+    """Chainable stand-in for a postgrest request builder."""
+
+    def __init__(self, client, name, data):
+        self.client = client
+        self.name = name
+        self.data = data
+        self.not_ = self
+        self.window = None
+
+    def range(self, start, end):
+        self.client.calls.append((self.name, "range", (start, end), {}))
+        self.window = (start, end + 1)
+        return self
+
+    def __getattr__(self, method):
+        def chain(*args, **kwargs):
+            self.client.calls.append((self.name, method, args, kwargs))
+            return self
+        return chain
+
+    def execute(self):
+        data = self.data[slice(*self.window)] if self.window else self.data
+        return SimpleNamespace(data=data, count=len(self.data))
+
+
+class FakeClient:
+    def __init__(self, tables=None, rpcs=None):
+        self.tables = tables or {}
+        self.rpcs = rpcs or {}
+        self.calls = []
+
+    def table(self, name):
+        return FakeQuery(self, name, self.tables.get(name, []))
+
+    def rpc(self, name, params=None):
+        self.calls.append(("rpc", name, params))
+        if name not in self.rpcs:
+            raise APIError({"code": "PGRST202", "message": f"Could not find the function {name}"})
+        return FakeQuery(self, name, self.rpcs[name])
+
+
+def test_histograms_use_rpc_when_deployed():
+    client = FakeClient(rpcs={"meeting_status_histogram": [{"status": "COMPLETED", "mom_exists": True, "count": 7}]})
+    repo = SupabaseRepository(client, aggregate_rpc=True)
+
+    rows = repo.meeting_status_histogram("u1", "2026-01-01", "2026-01-31")
+
+    assert rows == [{"status": "COMPLETED", "mom_exists": True, "count": 7}]
+    assert client.calls == [("rpc", "meeting_status_histogram",
+                             {"p_user_id": "u1", "p_scheduled_from": "2026-01-01", "p_scheduled_to": "2026-01-31"})]
+
+
+def test_histograms_fall_back_to_rows_when_rpc_missing():
+    meetings = [{"status": "COMPLETED", "mom_exists": True}, {"status": "COMPLETED", "mom_exists": False},
+                {"status": "COMPLETED", "mom_exists": True}]
+    client = FakeClient(tables={"meetings": meetings})
+    repo = instrumented(SupabaseRepository(client, aggregate_rpc=True))
+
+    with traced() as trace:
+        rows = repo.meeting_status_histogram("u1")
+    # The failed RPC, then the row query
+    assert trace.round_trips == 2 and "RPC not deployed" in trace.notes[0]
+    assert sorted(rows, key=lambda r: r["mom_exists"]) == [
+        {"status": "COMPLETED", "mom_exists": False, "count": 1},
+        {"status": "COMPLETED", "mom_exists": True, "count": 2},
+    ]
+    # The missing function is remembered: no further RPC attempts
+    client.calls.clear()
+    repo.meeting_status_histogram("u1")
+    assert not [c for c in client.calls if c[0] == "rpc"]
+
+
+def test_overdue_count_uses_head_count_query():
+    client = FakeClient(tables={"contacts": [{}, {}, {}]})
+    repo = SupabaseRepository(client)
+
+    assert repo.count_overdue_contacts("u1", "2026-01-01T00:00:00+00:00") == 3
+    assert ("contacts", "select", ("contact_id",), {"count": "exact", "head": True}) in client.calls
+
+
+def test_large_results_are_paged_past_the_row_cap(monkeypatch):
+    import db.supabase_repository as module
+
+    monkeypatch.setattr(module, "SUPABASE_MAX_ROWS", 2)
+    rows = [{"day": "2026-01-01", "industry": f"I{i}", "count": 1} for i in range(5)]
+    client = FakeClient(rpcs={"industry_daily_histogram": rows})
+    repo = instrumented(SupabaseRepository(client))
+
+    with traced() as trace:
+        assert repo.industry_daily_histogram("2026-01-01", "2026-01-01") == rows
+    assert [c[2] for c in client.calls if c[1] == "range"] == [(0, 1), (2, 3), (4, 5)]
+    assert trace.round_trips == 3 and trace.notes == ["industry_daily_histogram: 5 rows in 3 pages"]
+
+
+def test_keyset_page_filters_past_the_cursor():
+    client = FakeClient(tables={"emails": []})
+    repo = SupabaseRepository(client)
+
+    repo.list_recent_emails("u1", 50, after=("2026-01-01T00:00:00+00:00", "e9"))
+
+    assert ("emails", "order", ("drafted_at",), {"desc": True, "nullsfirst": True}) in client.calls
+    assert ("emails", "or_", ('drafted_at.lt."2026-01-01T00:00:00+00:00",'
+                              'and(drafted_at.eq."2026-01-01T00:00:00+00:00",email_id.lt.e9)',), {}) in client.calls
+    assert ("emails", "limit", (50,), {}) in client.calls
+
+
+def test_list_page_fills_pages_larger_than_the_row_cap(monkeypatch):
+    import db.supabase_repository as module
+
+    monkeypatch.setattr(module, "SUPABASE_MAX_ROWS", 2)
+    client = FakeClient(tables={"contacts": [{"contact_id": f"c{i}", "created_at": None} for i in range(2)]})
+    repo = instrumented(SupabaseRepository(client))
+
+    with traced() as trace:
+        repo.list_page("contacts", "u1", 3)
+    assert trace.round_trips == 2
+
+    # A second request for the remainder, continuing after the first page
+    assert [c[2] for c in client.calls if c[1] == "limit"] == [(2,), (1,)]
+    assert ("contacts", "or_", ("created_at.not.is.null,and(created_at.is.null,contact_id.lt.c1)",), {}) in client.calls
+
+
+def test_bulk_updates_upsert_per_column_set_and_fall_back_to_row_updates():
+    client = FakeClient()
+    repo = SupabaseRepository(client)
+    repo.update_contacts("u1", [{"contact_id": "c1", "outcome": "HOT", "last_outcome_status": "HOT"},
+                                {"contact_id": "c2", "outcome": "COLD"},
+                                {"contact_id": "c3", "outcome": "WARM", "last_outcome_status": "WARM"}])
+    upserts = [c for c in client.calls if c[1] == "upsert"]
+    assert [len(c[2][0]) for c in upserts] == [2, 1]
+    assert all(r["user_id"] == "u1" for c in upserts for r in c[2][0])
+    assert upserts[0][3] == {"on_conflict": "contact_id"}
+
+    class NotNullClient(FakeClient):
+        def table(self, name):
+            query = super().table(name)
+            def upsert(*args, **kwargs):
+                raise APIError({"code": "23502", "message": "null value in column \"first_name\""})
+            query.upsert = upsert
+            return query
+
+    client = NotNullClient()
+    repo = SupabaseRepository(client)
+    for _ in range(2):
+        repo.update_contacts("u1", [{"contact_id": "c1", "outcome": "HOT"}])
+    assert not repo.bulk_upsert
+    assert [c for c in client.calls if c[1] in ("update", "eq")] == [
+        ("contacts", "update", ({"outcome": "HOT"},), {}),
+        ("contacts", "eq", ("contact_id", "c1"), {}),
+        ("contacts", "eq", ("user_id", "u1"), {}),
+    ] * 2
@@ -0,0 +1,41 @@
+from utils.text_index import TextIndex
+
+
+def _texts(doc):
+    return [doc.get("name"), doc.get("email")]
+
+
+DOCS = [
+    {"id": "1", "name": "Mark Anna", "email": "mark@acme.io"},
+    {"id": "2", "name": "Anna", "email": "anna@example.com"},
+    {"id": "3", "name": "Annabel Lee", "email": "lee@example.com"},
+    {"id": "4", "name": "Joanna Smith", "email": "js@example.com"},
+    {"id": "5", "name": "Bob", "email": "bob@example.com"},
+]
+
+
+def test_matches_are_ranked_exact_prefix_word_substring():
+    index = TextIndex(DOCS, "id", _texts)
+
+    assert [d["id"] for d in index.search("Anna", 10)] == ["2", "3", "1", "4"]
+    assert [d["id"] for d in index.search("anna", 2)] == ["2", "3"]
+    assert index.search("zzz", 10) == [] and index.search("  ", 10) == []
+
+
+def test_substrings_span_emails_but_not_field_boundaries():
+    index = TextIndex(DOCS, "id", _texts)
+
+    assert [d["id"] for d in index.search("ple.co", 10)] == ["2", "3", "4", "5"]
+    assert index.search("bobbob", 10) == []
+
+
+def test_updates_and_removals_are_reflected():
+    index = TextIndex(DOCS, "id", _texts)
+
+    assert index.update("5", {"name": "Annette"})
+    assert not index.update("missing", {"name": "Anna"})
+    assert [d["id"] for d in index.search("ann", 10)] == ["2", "3", "5", "1", "4"]
+
+    index.remove("2")
+    assert "2" not in [d["id"] for d in index.search("ann", 10)]
+    assert len(index) == 4
@@ -0,0 +1,118 @@
+import importlib
+import logging
+import uuid
+from datetime import datetime, timezone
+
+from fastapi.testclient import TestClient
+
+from db.instrumentation import instrumented
+from db.repository import set_repository
+from db.supabase_repository import SupabaseRepository
+from utils import tracing
+from utils.tracing import Trace, current_trace
+
+USER_ID = "00000000-0000-0000-0000-000000000001"
+
+
+def _client(sqlite_repo):
+    import main
+
+    main.trace_log.clear()
+    set_repository(instrumented(sqlite_repo))
+    return main, TestClient(main.app)
+
+
+def test_requested_trace_comes_back_as_server_timing(sqlite_repo):
+    main, client = _client(sqlite_repo)
+    sqlite_repo.insert_rows("contacts", [{"contact_id": str(uuid.uuid4()), "user_id": USER_ID,
+                                          "created_at": datetime.now(timezone.utc)}])
+
+    untraced = client.get(f"/api/v1/dashboard/summary?user_id={USER_ID}&preset=THIS_MONTH")
+    assert untraced.status_code == 200
+    assert "server-timing" not in untraced.headers
+    main.trace_log.clear()
+
+    timing = client.get(f"/api/v1/analytics/funnel?user_id={USER_ID}", headers={"X-Trace": "1"}).headers["server-timing"]
+    entries = [e.split(";")[0] for e in timing.split(", ")]
+    assert entries == ["q1", "q2", "q3", "db", "total"]
+    assert 'desc="contacts.contact_outcome_histogram rows=1"' in timing and 'desc="round trips=3"' in timing
+
+    [trace] = main.trace_log.recent()
+    assert trace["route"] == "/api/v1/analytics/funnel" and trace["round_trips"] == 3
+    assert {s["table"] for s in trace["spans"]} == {"contacts", "meetings", "emails"}
+    assert USER_ID in trace["spans"][0]["filters"]
+
+
+def test_debug_traces_endpoint_is_opt_in(sqlite_repo, monkeypatch):
+    import core.config
+
+    main, client = _client(sqlite_repo)
+    assert client.get("/debug/traces").status_code == 404
+
+    monkeypatch.setenv("TRACE_DEBUG_ENDPOINT", "true")
+    importlib.reload(core.config)
+    try:
+        client = TestClient(importlib.reload(main).app)
+        client.get(f"/api/v1/analytics/funnel?user_id={USER_ID}", headers={"X-Trace": "1"})
+        assert client.get("/debug/traces").json()["traces"][0]["route"] == "/api/v1/analytics/funnel"
+
+        monkeypatch.setenv("TRACING_ENABLED", "false")
+        importlib.reload(core.config)
+        assert TestClient(importlib.reload(main).app).get("/debug/traces").status_code == 404
+    finally:
+        monkeypatch.undo()
+        importlib.reload(core.config)
+        importlib.reload(main)
+
+
+def test_budget_violations_are_logged_and_kept(sqlite_repo, caplog):
+    from starlette.applications import Starlette
+    from starlette.responses import PlainTextResponse
+    from starlette.routing import Route
+
+    repo = instrumented(sqlite_repo)
+
+    def work(request):
+        for _ in range(3):
+            repo.list_contacts(USER_ID)
+        return PlainTextResponse("ok")
+
+    log = tracing.TraceLog(5)
+    app = tracing.TracingMiddleware(Starlette(routes=[Route("/work", work)]), log, slow_seconds=60, default_budget=2)
+    with caplog.at_level(logging.WARNING, logger="utils.tracing"):
+        TestClient(app).get("/work")
+
+    assert "made 3 backend calls (budget 2); duplicates: [\"list_contacts('" in caplog.text
+    assert log.recent()[0]["round_trips"] == 3
+
+
+def test_duplicates_and_backend_notes():
+    class FailingJoin:
+        def __init__(self):
+            self.calls = 0
+
+        def table(self, name):
+            return self
+
+        def __getattr__(self, method):
+            return lambda *args, **kwargs: self
+
+        def execute(self):
+            self.calls += 1
+            if self.calls == 1:
+                raise RuntimeError("Could not find a relationship between 'meetings' and 'contacts'")
+            return type("Result", (), {"data": []})()
+
+    repo = instrumented(SupabaseRepository(FailingJoin()))
+    trace = Trace("GET", "/api/v1/meetings/upcoming", "/api/v1/meetings/upcoming")
+    token = current_trace.set(trace)
+    try:
+        user_id = str(uuid.uuid4())
+        repo.list_upcoming_meetings(user_id, "2026-01-01", 5)
+        repo.list_upcoming_meetings(user_id, "2026-01-01", 5)
+    finally:
+        current_trace.reset(token)
+
+    assert trace.round_trips == 3  # the first call queried twice
+    assert trace.duplicates() == [f"list_upcoming_meetings('{user_id}', '2026-01-01', 5)"]
+    assert "join failed" in trace.notes[0] and 'note1;desc="list_upcoming_meetings: join failed' in trace.server_timing()
@@ -0,0 +1,175 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from core.config import (
+    ANALYTICS_CACHE_MAX_ENTRIES, ANALYTICS_CACHE_TTL_SECONDS,
+    INDUSTRY_DAY_CACHE_MAX_DAYS, INDUSTRY_DAY_CACHE_TTL_SECONDS,
+    SCAN_DAY_CACHE_MAX_DAYS, SCAN_DAY_CACHE_TTL_SECONDS,
+)
+from utils.singleflight import SingleFlight
+
+
+class TTLCache:
+    """
+    Bounded in-process result cache with per-entry TTL and LRU eviction.
+
+    Keys are tuples whose first element is the owning user id, so every
+    entry of one user can be dropped at once after a write. Each user also
+    has a generation counter: a value computed while an invalidation for
+    that user happened is returned to its caller but never stored.
+    A `ttl` of 0 disables caching. With `weigh`, `max_entries` bounds the
+    summed weight of the entries rather than their number. Concurrent
+    misses of one key are computed once (single flight).
+    """
+
+    def __init__(self, max_entries: int = ANALYTICS_CACHE_MAX_ENTRIES, ttl: float = ANALYTICS_CACHE_TTL_SECONDS,
+                 clock: Callable[[], float] = time.monotonic, weigh: Optional[Callable[[Any], int]] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self.weigh = weigh or (lambda value: 1)
+        self.weight = 0
+        # key -> (expires_at, value, weight at insertion)
+        self._entries: "OrderedDict[Tuple, Tuple[float, Any, int]]" = OrderedDict()
+        self._generations: Dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.flights = SingleFlight()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_entries > 0
+
+    def get(self, key: Tuple) -> Tuple[bool, Any]:
+        """Return (found, value); expired entries count as misses."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value, _ = entry
+                if expires_at > self.clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                self._pop(key)
+            self.misses += 1
+            return False, None
+
+    def _pop(self, key: Tuple) -> None:
+        self.weight -= self._entries.pop(key)[2]
+
+    def set(self, key: Tuple, value: Any, generation: Optional[int] = None) -> None:
+        with self._lock:
+            if generation is not None and generation != self._generations.get(key[0], 0):
+                return
+            weight = self.weigh(value)
+            if weight > self.max_entries:
+                return  # would evict everything else and still not fit
+            if key in self._entries:
+                self._pop(key)
+            self._entries[key] = (self.clock() + self.ttl, value, weight)
+            self.weight += weight
+            while self.weight > self.max_entries:
+                self._pop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def get_or_compute(self, key: Tuple, compute: Callable[[], Any]) -> Any:
+        """
+        Cached value of `key`, else `compute()`. Concurrent misses of one key
+        share a single computation, even with caching disabled.
+        """
+        if self.enabled:
+            found, value = self.get(key)
+            if found:
+                return value
+        generation = self.generation(key[0])
+
+        def load() -> Any:
+            value = compute()
+            if self.enabled:
+                self.set(key, value, generation)
+            return value
+
+        # Keyed on the generation too: a request arriving after a write
+        # never joins a computation that may have read the old data
+        return self.flights.do((key, generation), load)
+
+    def generation(self, user_id: Hashable) -> int:
+        """Pass to `set` for a value computed from now on (see the class docs)."""
+        with self._lock:
+            return self._generations.get(user_id, 0)
+
+    def invalidate_user(self, user_id: Hashable) -> int:
+        """Drop every entry owned by `user_id`; returns how many were dropped."""
+        with self._lock:
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+            stale = [k for k in self._entries if k[0] == user_id]
+            for k in stale:
+                self._pop(k)
+            self.invalidations += 1
+            return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+            self.weight = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "weight": self.weight,
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                **{k: v for k, v in self.flights.stats().items() if k != "calls"},
+            }
+
+
+def day_buckets(cache: TTLCache, kind: str, first: date, last: date, today: date,
+                fetch: Callable[[date, date], Dict[date, Any]], empty: Callable[[], Any]) -> Dict[date, Any]:
+    """
+    Per-day values for the inclusive range [first, last]. Closed days
+    (before `today`) are served from `cache`; the days it lacks, always
+    including today, come from a single `fetch(first_missing, last_missing)`
+    and the closed ones are cached. Days `fetch` omits get `empty()`.
+    Keys are ("*", kind, day): day buckets are not owned by a user.
+    """
+    result: Dict[date, Any] = {}
+    missing = []
+    day = first
+    while day <= last:
+        found, value = cache.get(("*", kind, day)) if day < today and cache.enabled else (False, None)
+        if found:
+            result[day] = value
+        else:
+            missing.append(day)
+        day += timedelta(days=1)
+
+    if missing:
+        fetched = fetch(missing[0], missing[-1])
+        for day in missing:
+            value = fetched[day] if day in fetched else empty()
+            if day < today and cache.enabled:
+                cache.set(("*", kind, day), value)
+            result[day] = value
+    return result
+
+
+# Shared cache for per-user analytics results
+analytics_cache = TTLCache()
+
+# Closed-day buckets shared by all range queries
+industry_day_cache = TTLCache(INDUSTRY_DAY_CACHE_MAX_DAYS, INDUSTRY_DAY_CACHE_TTL_SECONDS)
+scan_day_cache = TTLCache(SCAN_DAY_CACHE_MAX_DAYS, SCAN_DAY_CACHE_TTL_SECONDS)
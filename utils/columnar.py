@@ -0,0 +1,82 @@
+import warnings
+from datetime import datetime, timezone
+from itertools import chain
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+UTC = timezone.utc
+
+# int64 value of NaT: missing or unparseable timestamps
+NAT = np.iinfo(np.int64).min
+
+Categorical = Tuple[np.ndarray, List[Any]]
+
+
+def categorical(values: Sequence[Hashable], categories: Sequence[Hashable] = ()) -> Categorical:
+    """
+    Encode values as int32 codes plus their labels. `categories` get the
+    first codes in the given order so callers can compare against constants.
+    """
+    # dict.fromkeys dedupes at C speed; codes are then a single map() pass
+    labels = list(dict.fromkeys(chain(categories, values)))
+    lookup: Dict[Hashable, int] = {v: i for i, v in enumerate(labels)}
+    codes = np.fromiter(map(lookup.__getitem__, values), dtype=np.int32, count=len(values))
+    return codes, labels
+
+
+def _parse_one(value: str) -> np.datetime64:
+    # Slow path: "Z" suffix, non-UTC offsets or garbage
+    try:
+        dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return np.datetime64("NaT", "us")
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(UTC).replace(tzinfo=None)
+    return np.datetime64(dt, "us")
+
+
+def epoch_us(values: Sequence[Optional[str]]) -> np.ndarray:
+    """ISO-8601 strings -> int64 microseconds since the epoch (UTC); NAT when missing."""
+    # PostgREST renders timestamptz as UTC "+00:00"; numpy parses the rest natively
+    normalized = [v.removesuffix("+00:00") if v else "NaT" for v in values]
+    try:
+        with warnings.catch_warnings():
+            # numpy converts explicit offsets to UTC but warns that it did
+            warnings.simplefilter("ignore", UserWarning)
+            parsed = np.array(normalized, dtype="datetime64[us]")
+    except ValueError:
+        parsed = np.array([_parse_one(v) for v in normalized], dtype="datetime64[us]")
+    return parsed.astype(np.int64)
+
+
+def to_epoch_us(value: Optional[str]) -> int:
+    return int(epoch_us([value])[0])
+
+
+def group_count(columns: Dict[str, Categorical], weights: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
+    """
+    Count rows per distinct combination of categorical columns in one
+    vectorized pass. Returns `{column: label, ..., "count": n}` rows.
+    """
+    names = list(columns)
+    if not names:
+        return []
+    key = np.zeros(len(columns[names[0]][0]), dtype=np.int64)
+    for name in names:
+        codes, labels = columns[name]
+        key = key * max(len(labels), 1) + codes
+    unique, inverse = np.unique(key, return_inverse=True)
+    counts = np.bincount(inverse, weights=weights, minlength=len(unique))
+
+    rows = []
+    for k, n in zip(unique.tolist(), counts.tolist()):
+        values = []
+        for name in reversed(names):
+            labels = columns[name][1]
+            k, code = divmod(k, max(len(labels), 1))
+            values.append(labels[code])
+        row = dict(zip(names, reversed(values)))
+        row["count"] = int(n)
+        rows.append(row)
+    return rows
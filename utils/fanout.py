@@ -0,0 +1,66 @@
+import contextvars
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Mapping, Optional
+
+from core.config import QUERY_FANOUT_WORKERS, QUERY_TIMEOUT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=QUERY_FANOUT_WORKERS, thread_name_prefix="query-fanout")
+    return _executor
+
+
+def fan_out(calls: Mapping[str, Callable[[], Any]], timeout: float = QUERY_TIMEOUT_SECONDS,
+            defaults: Optional[Mapping[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Run independent calls concurrently and return their results by name.
+
+    Every call gets the same `timeout` (seconds), measured from submission.
+    A call that fails or times out re-raises in the caller, unless it has an
+    entry in `defaults`: then the default is used instead and the failure is
+    logged, so one slow optional query degrades the response rather than
+    failing it.
+    """
+    defaults = defaults or {}
+    if QUERY_FANOUT_WORKERS <= 0 or len(calls) < 2:
+        return {name: _inline(name, fn, defaults) for name, fn in calls.items()}
+
+    executor = _get_executor()
+    # Each call runs in a copy of the caller's context so request-scoped
+    # context variables are visible from pool threads.
+    futures = {name: executor.submit(contextvars.copy_context().run, fn) for name, fn in calls.items()}
+    wait(futures.values(), timeout=timeout)
+
+    results: Dict[str, Any] = {}
+    for name, future in futures.items():
+        if not future.done():
+            # Still queued or running: drop it (a running call finishes in the background)
+            future.cancel()
+            results[name] = _fallback(name, TimeoutError(f"Query '{name}' timed out after {timeout}s"), defaults)
+            continue
+        try:
+            results[name] = future.result()
+        except Exception as e:
+            results[name] = _fallback(name, e, defaults)
+    return results
+
+
+def _inline(name: str, fn: Callable[[], Any], defaults: Mapping[str, Any]) -> Any:
+    try:
+        return fn()
+    except Exception as e:
+        return _fallback(name, e, defaults)
+
+
+def _fallback(name: str, error: BaseException, defaults: Mapping[str, Any]) -> Any:
+    if name not in defaults:
+        raise error
+    logger.warning("Query '%s' failed, using default: %r", name, error)
+    return defaults[name]
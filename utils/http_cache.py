@@ -0,0 +1,78 @@
+import hashlib
+import threading
+import time
+from typing import Callable, Dict, Hashable, Iterable, Optional
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+# Clients keep the body but must ask again before every reuse
+CACHE_CONTROL = "private, max-age=0, must-revalidate"
+
+
+class DataVersions:
+    """
+    Version of each owner's data, for ETags. Writes through this process
+    `bump` their owner; a version also moves on every `window` seconds, so
+    writes this process never saw (other workers, other services) are
+    picked up as late as an analytics cache entry would pick them up.
+    Versions are wall-clock based and never go back, across restarts too.
+    A `window` of 0 disables ETags.
+    """
+
+    def __init__(self, window: float, clock: Callable[[], float] = time.time):
+        self.window = window
+        self.clock = clock
+        self._written: Dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.window > 0
+
+    def bump(self, owner: Hashable) -> None:
+        with self._lock:
+            now = int(self.clock() * 1e9)
+            # two writes within one clock tick still get distinct versions
+            self._written[owner] = max(now, self._written.get(owner, 0) + 1)
+
+    def version(self, owner: Hashable) -> str:
+        with self._lock:
+            written = self._written.get(owner, 0)
+        return f"{written}.{int(self.clock() // self.window)}"
+
+    def etag(self, owner: Hashable, *parts: str) -> str:
+        digest = hashlib.sha1("\0".join((str(owner), self.version(owner)) + parts).encode()).hexdigest()
+        return f'W/"{digest[:20]}"'
+
+
+def request_key(request: Request) -> str:
+    """Path and query, with parameters in a canonical order."""
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    return f"{request.url.path}?{query}"
+
+
+def matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match against `etag`, weak comparison (RFC 9110 13.1.2)."""
+    if not if_none_match:
+        return False
+    tags: Iterable[str] = (t.strip() for t in if_none_match.split(","))
+    opaque = etag.removeprefix("W/")
+    return any(t == "*" or t.removeprefix("W/") == opaque for t in tags)
+
+
+def revalidate(request: Request, response: Response, versions: DataVersions,
+               owner: Hashable) -> Optional[Response]:
+    """
+    Conditional GET for the data of `owner`. Returns a 304 to send instead
+    of computing the response when the client's copy is current; otherwise
+    sets the ETag and Cache-Control headers on `response` and returns None.
+    """
+    if not versions.enabled:
+        return None
+    etag = versions.etag(owner, request_key(request))
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,55 @@
+import time
+
+from starlette.routing import Match
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from utils.metrics import Registry, registry as default_registry
+
+# Label for requests no route matches, so probes for random paths do not
+# create a series each
+UNMATCHED = "unmatched"
+
+
+def route_template(scope: Scope) -> str:
+    """The path template of the route serving `scope` ("/api/v1/export/{entity}")."""
+    app = scope.get("app")
+    for route in getattr(getattr(app, "router", None), "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return UNMATCHED
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording, per route template and method, the requests
+    in flight and a latency histogram labelled with the response status.
+    Latency runs until the last body chunk is sent, streams included.
+    """
+
+    def __init__(self, app: ASGIApp, registry: Registry = default_registry):
+        self.app = app
+        self.in_flight = registry.gauge("http_requests_in_flight", "Requests being served.", ("method", "route"))
+        self.duration = registry.histogram("http_request_duration_seconds", "Request latency.",
+                                           ("method", "route", "status"))
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        method, route = scope["method"], route_template(scope)
+        status = 500
+
+        async def send_status(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        self.in_flight.inc(method, route)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_status)
+        finally:
+            self.in_flight.dec(method, route)
+            self.duration.observe(time.perf_counter() - started, method, route, str(status))
@@ -0,0 +1,148 @@
+import contextvars
+import logging
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple, Type
+
+logger = logging.getLogger(__name__)
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+
+
+class QueueFull(Exception):
+    """Raised by `JobQueue.submit` when `max_pending` jobs are already waiting."""
+
+
+class Job:
+    """
+    One unit of background work. `fn` receives the job itself, so it can
+    tell whether it is on its last attempt. `future` resolves with the
+    outcome for in-process waiters.
+    """
+
+    def __init__(self, fn: Callable[["Job"], Any], owner: Hashable, max_attempts: int):
+        self.id = str(uuid.uuid4())
+        self.fn = fn
+        self.owner = owner
+        self.max_attempts = max_attempts
+        self.status = QUEUED
+        self.attempts = 0
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.future: Future = Future()
+        self.context = contextvars.copy_context()
+
+    @property
+    def final_attempt(self) -> bool:
+        return self.attempts >= self.max_attempts
+
+    @property
+    def done(self) -> bool:
+        return self.status in (SUCCEEDED, FAILED)
+
+
+class JobQueue:
+    """
+    Bounded in-process job queue served by `workers` daemon threads of its
+    own, so slow jobs never occupy the request threadpool.
+
+    At most `max_pending` jobs wait; beyond that `submit` raises QueueFull
+    instead of letting the backlog grow. A failing job is retried up to its
+    `max_attempts` with exponential backoff from `backoff` seconds, unless
+    the error is one of `permanent`. Finished jobs stay queryable for
+    `retention` seconds. Workers start on the first submit.
+    """
+
+    def __init__(self, workers: int, max_pending: int, retention: float, backoff: float,
+                 permanent: Tuple[Type[BaseException], ...] = (), name: str = "jobs"):
+        self.workers = workers
+        self.retention = retention
+        self.backoff = backoff
+        self.permanent = permanent
+        self.name = name
+        self._queue: "queue.Queue[Optional[Job]]" = queue.Queue(max_pending)
+        self._jobs: Dict[str, Job] = {}
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self.retries = 0
+
+    def submit(self, fn: Callable[[Job], Any], owner: Hashable, max_attempts: int = 1) -> Job:
+        job = Job(fn, owner, max_attempts)
+        with self._lock:
+            self._start()
+            self._prune()
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                raise QueueFull(f"{self.name}: {self._queue.maxsize} jobs already pending")
+            self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            by_status: Dict[str, int] = {}
+            for job in self._jobs.values():
+                by_status[job.status] = by_status.get(job.status, 0) + 1
+            return {"workers": len(self._threads), "pending": self._queue.qsize(),
+                    "retries": self.retries, **by_status}
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Stop the workers once the jobs already queued have run."""
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put(None)
+        for thread in threads:
+            thread.join(timeout)
+
+    def _start(self) -> None:
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._work, name=f"{self.name}-{len(self._threads)}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.retention
+        for job_id in [k for k, job in self._jobs.items() if job.done and job.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+    def _work(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            self._run(job)
+
+    def _run(self, job: Job) -> None:
+        job.status = RUNNING
+        while True:
+            job.attempts += 1
+            try:
+                job.result = job.context.run(job.fn, job)
+                break
+            except Exception as e:
+                if job.final_attempt or isinstance(e, self.permanent):
+                    logger.exception("Job %s (%s) failed after %d attempt(s)", job.id, self.name, job.attempts)
+                    job.error = e
+                    break
+                self.retries += 1
+                # The worker waits out the backoff: a failing dependency slows
+                # the queue down instead of being hammered with retries
+                time.sleep(self.backoff * 2 ** (job.attempts - 1))
+
+        job.finished_at = time.time()
+        if job.error is None:
+            job.status = SUCCEEDED
+            job.future.set_result(job.result)
+        else:
+            job.status = FAILED
+            job.future.set_exception(job.error)
@@ -0,0 +1,246 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Any, Callable, Deque, Dict, List, Optional, Union
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+# Latencies kept for the percentiles in stats()
+LATENCY_WINDOW = 1024
+
+
+class GatewayError(Exception):
+    """The gateway did not get an answer from the provider."""
+
+
+class CircuitOpen(GatewayError):
+    """The provider failed repeatedly; calls are refused until it cools down."""
+
+
+class Overloaded(GatewayError):
+    """No concurrency slot or rate-limit token freed up before the deadline."""
+
+
+class DeadlineExceeded(GatewayError):
+    """The provider did not answer within the call's deadline."""
+
+
+class GeminiProvider:
+    """
+    Google Gemini behind the gateway. The SDK is configured and the model
+    constructed once, on first use, and then shared by every call.
+    """
+
+    def __init__(self, api_key: Optional[str], model: str):
+        self.api_key = api_key
+        self.model_name = model
+        self._model = None
+        self._lock = threading.Lock()
+
+    def _client(self):
+        with self._lock:
+            if self._model is None:
+                import google.generativeai as genai
+
+                genai.configure(api_key=self.api_key)
+                self._model = genai.GenerativeModel(self.model_name)
+            return self._model
+
+    def __call__(self, prompt: str, timeout: float) -> str:
+        response = self._client().generate_content(prompt, request_options={"timeout": timeout})
+        return response.text
+
+
+class FakeProvider:
+    """
+    Local stand-in for a model provider. `responses` is a fixed reply, a
+    list of replies served in turn, or a function of the prompt; any reply
+    that is an exception is raised instead. `latency` seconds are slept
+    before answering.
+    """
+
+    def __init__(self, responses: Union[str, List[Any], Callable[[str], Any]] = "{}", latency: float = 0.0):
+        self.responses = responses
+        self.latency = latency
+        self.prompts: List[str] = []
+        self._lock = threading.Lock()
+
+    def __call__(self, prompt: str, timeout: float) -> str:
+        with self._lock:
+            self.prompts.append(prompt)
+            if callable(self.responses):
+                reply = self.responses(prompt)
+            elif isinstance(self.responses, list):
+                reply = self.responses.pop(0) if len(self.responses) > 1 else self.responses[0]
+            else:
+                reply = self.responses
+        time.sleep(min(self.latency, timeout))
+        if self.latency > timeout:
+            raise TimeoutError("Fake provider timed out")
+        if isinstance(reply, BaseException):
+            raise reply
+        return reply
+
+
+class TokenBucket:
+    """`rate` tokens per second, up to `burst` saved up."""
+
+    def __init__(self, rate: float, burst: int, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.tokens = float(burst)
+        self.updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self, deadline: float) -> bool:
+        """Take a token, waiting for one until `deadline` (clock time) at most."""
+        while True:
+            with self._lock:
+                now = self.clock()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = (1 - self.tokens) / self.rate
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class CircuitBreaker:
+    """
+    Opens after `failures` consecutive failures. After `reset_after`
+    seconds one trial call is let through (half open): its success closes
+    the circuit, its failure opens it again.
+    """
+
+    def __init__(self, failures: int, reset_after: float, clock: Callable[[], float] = time.monotonic):
+        self.failures = failures
+        self.reset_after = reset_after
+        self.clock = clock
+        self.state = CLOSED
+        self.consecutive = 0
+        self.opened_at = 0.0
+        self.trips = 0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            # Also re-admits a trial if the last one never reported back
+            if self.clock() - self.opened_at >= self.reset_after:
+                self.state = HALF_OPEN
+                self.opened_at = self.clock()
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = CLOSED
+            self.consecutive = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.consecutive += 1
+            if self.state == HALF_OPEN or self.consecutive >= self.failures:
+                if self.state != OPEN:
+                    self.trips += 1
+                self.state = OPEN
+                self.opened_at = self.clock()
+
+
+class LLMGateway:
+    """
+    Long-lived front for a model provider (`provider(prompt, timeout) -> text`).
+
+    At most `max_concurrency` calls run at once on the gateway's own
+    threads, started at no more than `rate` per second (bursts of `burst`).
+    Every call has a deadline of `timeout` seconds covering the wait for a
+    slot, a token and the answer; past it the caller gets DeadlineExceeded
+    even if the provider is still working. Provider errors and timeouts
+    count towards the circuit breaker; while it is open, calls fail with
+    CircuitOpen immediately so callers can take their fallback path.
+    """
+
+    def __init__(self, provider: Callable[[str, float], str], max_concurrency: int, rate: float, burst: int,
+                 timeout: float, breaker: CircuitBreaker, name: str = "llm"):
+        self.provider = provider
+        self.timeout = timeout
+        self.breaker = breaker
+        self.bucket = TokenBucket(rate, burst)
+        self.name = name
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._executor = ThreadPoolExecutor(max_concurrency, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.counters: Dict[str, int] = {
+            "calls": 0, "succeeded": 0, "failed": 0, "timed_out": 0, "circuit_open": 0, "overloaded": 0,
+        }
+
+    def generate(self, prompt: str, timeout: Optional[float] = None) -> str:
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        self._count("calls")
+        if not self.breaker.allow():
+            self._count("circuit_open")
+            raise CircuitOpen(f"{self.name}: provider unavailable, circuit open")
+        if not self._slots.acquire(timeout=max(0.0, deadline - time.monotonic())):
+            self._count("overloaded")
+            raise Overloaded(f"{self.name}: no concurrency slot within {timeout}s")
+        try:
+            if not self.bucket.acquire(deadline):
+                self._count("overloaded")
+                raise Overloaded(f"{self.name}: rate limit exceeded")
+            started = time.monotonic()
+            future = self._executor.submit(self.provider, prompt, max(0.0, deadline - started))
+        except BaseException:
+            self._slots.release()
+            raise
+        # The slot is held until the provider call returns, deadline or not
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            text = future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except FutureTimeout:
+            self._failed("timed_out")
+            raise DeadlineExceeded(f"{self.name}: no answer within {timeout}s")
+        except Exception:
+            self._failed("failed")
+            raise
+        self.breaker.record_success()
+        with self._lock:
+            self.counters["succeeded"] += 1
+            self._latencies.append(time.monotonic() - started)
+        return text
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            self.counters[counter] += 1
+
+    def _failed(self, counter: str) -> None:
+        self._count(counter)
+        self.breaker.record_failure()
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            counters = dict(self.counters)
+
+        def percentile(p: float) -> Optional[float]:
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 4) if latencies else None
+
+        return {
+            **counters,
+            "circuit": self.breaker.state,
+            "circuit_trips": self.breaker.trips,
+            "latency_p50_seconds": percentile(0.5),
+            "latency_p95_seconds": percentile(0.95),
+            "latency_max_seconds": round(latencies[-1], 4) if latencies else None,
+        }
@@ -0,0 +1,71 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, Iterable, Iterator, List, NamedTuple, Optional
+
+from pydantic import BaseModel
+
+from db.repository import Cursor, Row
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# fetch(limit, after) -> one keyset page of rows, as the paged repository methods
+PageFetch = Callable[[int, Optional[Cursor]], List[Row]]
+
+
+class Page(NamedTuple):
+    items: List[Any]
+    next_cursor: Optional[str]
+
+
+def encode_cursor(row: Row, sort_column: str, key_column: str) -> str:
+    """Opaque, URL-safe cursor pointing just past `row`."""
+    raw = json.dumps([row.get(sort_column), str(row[key_column])], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    """Inverse of encode_cursor; raises ValueError for anything it did not produce."""
+    try:
+        value, key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if value is not None:
+            datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(key, str):
+        raise ValueError("Invalid cursor")
+    return value, key
+
+
+def fetch_page(fetch: PageFetch, limit: int, after: Optional[Cursor],
+               sort_column: str, key_column: str) -> Page:
+    """
+    One page of rows and the cursor of the next one (None on the last page).
+    Asks for one extra row so a full last page does not yield a cursor to an
+    empty page.
+    """
+    rows = fetch(limit + 1, after)
+    if len(rows) <= limit:
+        return Page(rows, None)
+    rows = rows[:limit]
+    return Page(rows, encode_cursor(rows[-1], sort_column, key_column))
+
+
+def iter_pages(fetch: PageFetch, chunk_size: int, after: Optional[Cursor],
+               sort_column: str, key_column: str) -> Iterator[List[Row]]:
+    """Every row past `after`, one keyset page of `chunk_size` rows at a time."""
+    while True:
+        rows = fetch(chunk_size, after)
+        if rows:
+            yield rows
+        if len(rows) < chunk_size:
+            return
+        last = rows[-1]
+        after = (last.get(sort_column), str(last[key_column]))
+
+
+def ndjson(pages: Iterable[Iterable[BaseModel]]) -> Iterator[bytes]:
+    """Newline-delimited JSON, one response chunk per page of models."""
+    for page in pages:
+        yield "".join(m.model_dump_json() + "\n" for m in page).encode()
@@ -0,0 +1,173 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_results_used ON results (used_at);
+CREATE INDEX IF NOT EXISTS idx_results_created ON results (created_at);
+"""
+
+# Sets between two eviction passes
+PRUNE_EVERY = 64
+# A hit refreshes the entry's recency at most this often, so hot entries
+# are not rewritten on every read
+TOUCH_INTERVAL_SECONDS = 60.0
+
+
+def content_key(*parts: str) -> str:
+    """Stable hash of the parts; any change to one of them is a new key."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class ResultStore:
+    """
+    Persistent JSON result cache in a local SQLite file, safe to share
+    between processes on one host (WAL mode, busy timeout).
+
+    Entries older than `max_age` seconds are misses and get deleted; past
+    `max_entries` the least recently used go first. Eviction runs every
+    PRUNE_EVERY writes of this process. An empty `path` disables the
+    store. Storage errors are reported and treated as misses: the cache
+    must never fail the call it fronts. Hit counters are per process.
+    """
+
+    def __init__(self, path: str, max_entries: int, max_age: float, name: str = "results",
+                 clock: Callable[[], float] = time.time):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.name = name
+        self.clock = clock
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path) and self.max_entries > 0 and self.max_age > 0
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread; sqlite3 connections are not shared
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Return (found, value)."""
+        if not self.enabled:
+            return False, None
+        try:
+            conn = self._connection()
+            row = conn.execute("SELECT value, created_at, used_at FROM results WHERE key = ?", (key,)).fetchone()
+            now = self.clock()
+            if row is not None and row[1] > now - self.max_age:
+                if row[2] < now - TOUCH_INTERVAL_SECONDS:
+                    conn.execute("UPDATE results SET used_at = ? WHERE key = ?", (now, key))
+                self._count("hits")
+                return True, json.loads(row[0])
+        except (sqlite3.Error, ValueError) as e:
+            self._error("read", e)
+        self._count("misses")
+        return False, None
+
+    def set(self, key: str, value: Any) -> None:
+        if not self.enabled:
+            return
+        try:
+            now = self.clock()
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO results (key, value, created_at, used_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now, now),
+            )
+            with self._lock:
+                self._writes += 1
+                prune = self._writes % PRUNE_EVERY == 1
+            if prune:
+                self.prune()
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            self._error("write", e)
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        found, value = self.get(key)
+        if found:
+            return value
+        value = compute()
+        self.set(key, value)
+        return value
+
+    def prune(self) -> int:
+        """Drop expired entries, then the least recently used beyond max_entries."""
+        conn = self._connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            removed = conn.execute("DELETE FROM results WHERE created_at <= ?",
+                                   (self.clock() - self.max_age,)).rowcount
+            removed += conn.execute(
+                "DELETE FROM results WHERE key IN "
+                "(SELECT key FROM results ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            ).rowcount
+        return removed
+
+    def clear(self) -> None:
+        if self.enabled:
+            self._connection().execute("DELETE FROM results")
+        with self._lock:
+            self.hits = self.misses = self.errors = 0
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _error(self, action: str, e: Exception) -> None:
+        logger.warning("Result store %s: %s failed (%s). Treating as a miss.", self.name, action, e)
+        self._count("errors")
+
+    def stats(self) -> Dict[str, Any]:
+        entries: Optional[int] = None
+        if self.enabled:
+            try:
+                entries = self._connection().execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            except sqlite3.Error:
+                pass
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "path": self.path,
+                "entries": entries,
+                "max_entries": self.max_entries,
+                "max_age_seconds": self.max_age,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "errors": self.errors,
+            }
@@ -0,0 +1,50 @@
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key: the first caller runs the
+    computation, callers arriving while it is in flight wait for it and
+    share its result (or its exception). Nothing is kept once it finishes;
+    caching is the caller's business.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        with self._lock:
+            self.calls += 1
+            flight = self._flights.get(key)
+            if flight is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                flight = self._flights[key] = Future()
+                leader = True
+        if not leader:
+            return flight.result()
+        try:
+            value = compute()
+        except BaseException as e:
+            flight.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+        flight.set_result(value)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "coalesced": self.coalesced,
+                "coalesce_ratio": round(self.coalesced / self.calls, 4) if self.calls else 0.0,
+                "in_flight": len(self._flights),
+            }
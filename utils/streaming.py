@@ -0,0 +1,40 @@
+import csv
+import io
+import json
+import zlib
+from typing import Iterable, Iterator, List, Sequence
+
+from db.repository import Row
+
+
+def csv_chunks(pages: Iterable[List[Row]], columns: Sequence[str]) -> Iterator[bytes]:
+    """The header line, then one chunk of CSV lines per page of rows."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue().encode()
+    for page in pages:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([row.get(c) for c in columns] for row in page)
+        yield buffer.getvalue().encode()
+
+
+def json_lines(pages: Iterable[List[Row]]) -> Iterator[bytes]:
+    """One chunk of newline-delimited JSON per page of rows."""
+    encode = json.JSONEncoder(separators=(",", ":"), default=str).encode
+    for page in pages:
+        yield "".join(encode(row) + "\n" for row in page).encode()
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """
+    Compress a chunk stream into one gzip member. Each chunk is sync-flushed
+    so compressed bytes go out as rows arrive instead of at the end.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
@@ -0,0 +1,144 @@
+import re
+import threading
+from bisect import bisect_left, bisect_right, insort
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+Doc = Dict[str, Any]
+
+# Word boundaries inside a field ("ada.lovelace@example.com" -> ada, lovelace, example, com)
+WORD_SPLIT = re.compile(r"[^0-9a-z]+")
+
+# Rank tiers, best first
+EXACT, PREFIX, WORD_PREFIX, SUBSTRING = range(4)
+
+# Separators in the substring corpus: never part of a query
+FIELD_SEP, DOC_SEP = "\x1f", "\x1e"
+
+# Entries are ordered by text only: sorting on a plain string key is several
+# times faster than comparing (text, key) tuples
+TEXT = itemgetter(0)
+
+
+class TextIndex:
+    """
+    In-memory search index over a few text fields of each document.
+
+    Matches are ranked: whole field equal to the query, field prefix, word
+    prefix inside a field, then any substring. The first three tiers come
+    from sorted (text, key) lists - an inverted index over fields and words
+    that answers prefixes with a bisect and stops after `limit` hits.
+    Substrings are found with str.find over one packed corpus string, which
+    runs at C speed and jumps to the next document after each hit.
+
+    Safe to search and update from several threads.
+    """
+
+    def __init__(self, docs: Iterable[Doc], key: str, texts: Callable[[Doc], Sequence[Optional[str]]]):
+        self.key = key
+        self.texts = texts
+        self.docs: Dict[Any, Doc] = {}
+        self.fields: List[Tuple[str, Any]] = []
+        self.words: List[Tuple[str, Any]] = []
+        self.lock = threading.RLock()
+        self._corpus: Optional[Tuple[str, List[int], List[Any]]] = None
+        for doc in docs:
+            k = doc[key]
+            self.docs[k] = doc
+            fields, words = self._entries(doc)
+            self.fields.extend((f, k) for f in fields)
+            self.words.extend((w, k) for w in words)
+        self.fields.sort(key=TEXT)
+        self.words.sort(key=TEXT)
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def _entries(self, doc: Doc) -> Tuple[List[str], List[str]]:
+        fields = [t.lower() for t in self.texts(doc) if t]
+        words = {w for f in fields for w in WORD_SPLIT.split(f) if w and w != f}
+        return fields, list(words)
+
+    def upsert(self, doc: Doc) -> None:
+        with self.lock:
+            k = doc[self.key]
+            if k in self.docs:
+                self._remove(k)
+            self.docs[k] = doc
+            fields, words = self._entries(doc)
+            for f in fields:
+                insort(self.fields, (f, k), key=TEXT)
+            for w in words:
+                insort(self.words, (w, k), key=TEXT)
+            self._corpus = None
+
+    def update(self, key: Any, values: Doc) -> bool:
+        """Apply a partial update; returns False if the document is not indexed."""
+        with self.lock:
+            doc = self.docs.get(key)
+            if doc is None:
+                return False
+            updated = {**doc, **values}
+            if self._entries(updated) == self._entries(doc):
+                self.docs[key] = updated  # searchable text unchanged
+            else:
+                self.upsert(updated)
+            return True
+
+    def remove(self, key: Any) -> None:
+        with self.lock:
+            if key in self.docs:
+                self._remove(key)
+                self._corpus = None
+
+    def _remove(self, key: Any) -> None:
+        fields, words = self._entries(self.docs.pop(key))
+        for entries, texts in ((self.fields, fields), (self.words, words)):
+            for text in texts:
+                i = bisect_left(entries, text, key=TEXT)
+                while i < len(entries) and entries[i][0] == text:
+                    if entries[i][1] == key:
+                        del entries[i]
+                        break
+                    i += 1
+
+    def _packed(self) -> Tuple[str, List[int], List[Any]]:
+        # Built lazily and dropped on writes; searches share it until then
+        if self._corpus is None:
+            keys = list(self.docs)
+            haystacks = [FIELD_SEP.join(self._entries(self.docs[k])[0]) for k in keys]
+            starts, offset = [], 0
+            for h in haystacks:
+                starts.append(offset)
+                offset += len(h) + 1
+            self._corpus = (DOC_SEP.join(haystacks), starts, keys)
+        return self._corpus
+
+    def search(self, query: str, limit: int) -> List[Doc]:
+        q = query.strip().lower()
+        if not q or limit <= 0:
+            return []
+        with self.lock:
+            found: Dict[Any, int] = {}
+            # Field and word prefixes: contiguous runs in the sorted lists
+            for entries, exact, tier in ((self.fields, EXACT, PREFIX), (self.words, WORD_PREFIX, WORD_PREFIX)):
+                i = bisect_left(entries, q, key=TEXT)
+                while i < len(entries) and len(found) < limit and entries[i][0].startswith(q):
+                    text, key = entries[i]
+                    if key not in found:
+                        found[key] = exact if text == q else tier
+                    i += 1
+            if len(found) < limit:
+                self._substrings(q, limit, found)
+            ranked = sorted(found.items(), key=itemgetter(1))
+            return [self.docs[key] for key, _ in ranked[:limit]]
+
+    def _substrings(self, q: str, limit: int, found: Dict[Any, int]) -> None:
+        corpus, starts, keys = self._packed()
+        pos = corpus.find(q)
+        while pos != -1 and len(found) < limit:
+            i = bisect_right(starts, pos) - 1
+            found.setdefault(keys[i], SUBSTRING)
+            if i + 1 == len(starts):
+                break
+            pos = corpus.find(q, starts[i + 1])
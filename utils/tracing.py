@@ -0,0 +1,209 @@
+import contextvars
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Mapping, Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from utils.http_metrics import route_template
+
+logger = logging.getLogger(__name__)
+
+TRACE_HEADER = "x-trace"
+TRACE_QUERY_FLAG = "trace=1"
+SERVER_TIMING_HEADER = "Server-Timing"
+
+# Longest rendering of a single call argument in a span's filters
+MAX_ARG_LENGTH = 80
+
+
+class Span:
+    __slots__ = ("method", "table", "filters", "rows", "start", "duration", "error")
+
+    def __init__(self, method: str, table: str, filters: str, rows: int, start: float, duration: float,
+                 error: Optional[str]):
+        self.method = method
+        self.table = table
+        self.filters = filters
+        self.rows = rows
+        self.start = start
+        self.duration = duration
+        self.error = error
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "method": self.method, "table": self.table, "filters": self.filters, "rows": self.rows,
+            "start_ms": round(self.start * 1000, 3), "duration_ms": round(self.duration * 1000, 3),
+            "error": self.error,
+        }
+
+
+class Trace:
+    """Backend calls made while serving one request, in completion order."""
+
+    def __init__(self, method: str, route: str, path: str):
+        self.method = method
+        self.route = route
+        self.path = path
+        self.started = time.perf_counter()
+        self.duration: Optional[float] = None
+        self.status: Optional[int] = None
+        self.spans: List[Span] = []
+        # Things the backend did inside one call (fallback queries, retries)
+        self.notes: List[str] = []
+        self.extra_round_trips = 0
+        self._lock = threading.Lock()  # fan_out records from several threads
+
+    def record(self, method: str, table: str, args: tuple, kwargs: Mapping[str, Any], rows: int,
+               duration: float, error: Optional[BaseException]) -> None:
+        start = time.perf_counter() - duration - self.started
+        span = Span(method, table, _filters(args, kwargs), rows, start, duration,
+                    None if error is None else f"{type(error).__name__}: {error}")
+        with self._lock:
+            self.spans.append(span)
+
+    def note(self, message: str, round_trips: int) -> None:
+        with self._lock:
+            self.notes.append(message)
+            self.extra_round_trips += round_trips
+
+    @property
+    def round_trips(self) -> int:
+        return len(self.spans) + self.extra_round_trips
+
+    def duplicates(self) -> List[str]:
+        """Calls made more than once with the same arguments."""
+        seen: Dict[str, int] = {}
+        for span in self.spans:
+            key = f"{span.method}({span.filters})"
+            seen[key] = seen.get(key, 0) + 1
+        return [key for key, n in seen.items() if n > 1]
+
+    def server_timing(self) -> str:
+        entries = [f'q{i};desc="{s.table}.{s.method} rows={s.rows}{" error" if s.error else ""}";'
+                   f'dur={s.duration * 1000:.2f}'
+                   for i, s in enumerate(sorted(self.spans, key=lambda s: s.start), 1)]
+        entries.extend(f'note{i};desc="{_quoted(n)}"' for i, n in enumerate(self.notes, 1))
+        entries.append(f'db;desc="round trips={self.round_trips}";'
+                       f'dur={sum(s.duration for s in self.spans) * 1000:.2f}')
+        entries.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.2f}")
+        return ", ".join(entries)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "method": self.method, "route": self.route, "path": self.path, "status": self.status,
+            "duration_ms": None if self.duration is None else round(self.duration * 1000, 3),
+            "round_trips": self.round_trips, "duplicates": self.duplicates(), "notes": list(self.notes),
+            "spans": [s.to_dict() for s in sorted(self.spans, key=lambda s: s.start)],
+        }
+
+
+def _filters(args: tuple, kwargs: Mapping[str, Any]) -> str:
+    def short(value: Any) -> str:
+        text = repr(value)
+        return text if len(text) <= MAX_ARG_LENGTH else text[:MAX_ARG_LENGTH - 3] + "..."
+    return ", ".join([short(a) for a in args] + [f"{k}={short(v)}" for k, v in kwargs.items()])
+
+
+def _quoted(text: str) -> str:
+    # A header value: one line of latin-1
+    text = " ".join(text.split()).encode("latin-1", "replace").decode("latin-1")
+    return text.replace("\\", "\\\\").replace('"', '\\"')
+
+
+current_trace: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("current_trace", default=None)
+
+
+def record_query(event) -> None:
+    """InstrumentedRepository listener adding each call to the request's trace."""
+    trace = current_trace.get()
+    if trace is not None:
+        trace.record(event.method, event.table, event.args, event.kwargs, event.rows, event.duration, event.error)
+
+
+def note(message: str, round_trips: int = 0) -> None:
+    """
+    Add `message` to the current request's trace, if any. Backends call this
+    for work hidden inside one repository call, counting `round_trips` extra
+    calls against the budget.
+    """
+    trace = current_trace.get()
+    if trace is not None:
+        trace.note(message, round_trips)
+
+
+class TraceLog:
+    """The most recent traces worth keeping: slow, over budget, or asked for."""
+
+    def __init__(self, size: int):
+        self._traces: Deque[Trace] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, trace: Trace) -> None:
+        with self._lock:
+            self._traces.append(trace)
+
+    def recent(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            traces = list(self._traces)
+        return [t.to_dict() for t in reversed(traces)]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._traces.clear()
+
+
+class TracingMiddleware:
+    """
+    Traces the backend calls of every request (a list append per call).
+
+    Requests with an `X-Trace: 1` header or a `trace=1` query flag get the
+    timeline back in a Server-Timing header; calls made after the headers
+    went out (streamed bodies) are not in it. Requests slower than
+    `slow_seconds`, over their round-trip budget, or asked to be traced are
+    kept in `log`. Budgets are per route template, `default_budget`
+    otherwise, and None for no budget; violations are logged.
+    """
+
+    def __init__(self, app: ASGIApp, log: TraceLog, slow_seconds: float, default_budget: int,
+                 budgets: Optional[Mapping[str, Optional[int]]] = None):
+        self.app = app
+        self.log = log
+        self.slow_seconds = slow_seconds
+        self.default_budget = default_budget
+        self.budgets = budgets or {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        trace = Trace(scope["method"], route_template(scope), scope["path"])
+        requested = (dict(scope["headers"]).get(TRACE_HEADER.encode()) == b"1"
+                     or TRACE_QUERY_FLAG in scope.get("query_string", b"").decode("latin-1").split("&"))
+
+        async def send_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                trace.status = message["status"]
+                if requested:
+                    MutableHeaders(scope=message).append(SERVER_TIMING_HEADER, trace.server_timing())
+            await send(message)
+
+        token = current_trace.set(trace)
+        try:
+            await self.app(scope, receive, send_timing)
+        finally:
+            current_trace.reset(token)
+            trace.duration = time.perf_counter() - trace.started
+            self._finish(trace, requested)
+
+    def _finish(self, trace: Trace, requested: bool) -> None:
+        budget = self.budgets.get(trace.route, self.default_budget)
+        over = budget is not None and trace.round_trips > budget
+        if over:
+            logger.warning("Round-trip budget exceeded: %s %s made %d backend calls (budget %d); duplicates: %s",
+                           trace.method, trace.route, trace.round_trips, budget, trace.duplicates() or "none")
+        if requested or over or trace.duration >= self.slow_seconds:
+            self.log.add(trace)